@@ -11,6 +11,12 @@ import pandas_ta as ta
 from datetime import datetime, timedelta
 import numpy as np
 import warnings
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+import ohlcv_store
+import price_panel
+import sector_index
 
 def get_sector_trend_color(trend_text):
     import re
@@ -364,24 +370,6 @@ def get_meta_info(meta, symbol, market):
             info = meta.get('KR', {}).get(symbol, {})
         return info
 
-def get_daily_path(symbol, market):
-    base_dir = "data"
-    if market == 'KOSPI':
-        return os.path.join(base_dir, 'kr_daily', 'kospi', f"{symbol}.csv")
-    elif market == 'KOSDAQ':
-        return os.path.join(base_dir, 'kr_daily', 'kosdaq', f"{symbol}.csv")
-    else:
-        root_path = os.path.join(base_dir, 'kr_daily', f"{symbol}.csv")
-        if os.path.exists(root_path):
-            return root_path
-        kospi_path = os.path.join(base_dir, 'kr_daily', 'kospi', f"{symbol}.csv")
-        if os.path.exists(kospi_path):
-            return kospi_path
-        kosdaq_path = os.path.join(base_dir, 'kr_daily', 'kosdaq', f"{symbol}.csv")
-        if os.path.exists(kosdaq_path):
-            return kosdaq_path
-        return root_path
-
 # =============================================
 # ✅ 벡터화된 함수들 (apply → list comprehension)
 # =============================================
@@ -722,14 +710,45 @@ def format_dataframe(df, market_type):
     df[numeric_cols] = df[numeric_cols].round(2)
     return df
 
+@st.cache_resource(ttl=3600)
+def load_price_panel():
+    # 가격 패널(mmap) 1번만 열어 세션 간 공유, 없으면 None
+    return price_panel.load_panel()
+
 @st.cache_data(ttl=3600)
 def load_daily_data(symbol, market):
-    daily_path = get_daily_path(symbol, market)
-    if not os.path.exists(daily_path):
+    panel = load_price_panel()
+    df = panel.frame(symbol, market) if panel is not None else None
+    if df is None:
+        df = ohlcv_store.load_symbol(symbol, market)
+    if df is None:
         return None
-    df = pd.read_csv(daily_path, index_col=0, parse_dates=True)
     return df.rename(columns={'시가': 'Open', '고가': 'High', '저가': 'Low', '종가': 'Close', '거래량': 'Volume'})
 
+@st.cache_data(ttl=3600)
+def load_sector_index_data(symbol):
+    """종목이 속한 Sector / 업종 지수 (시가총액 가중), 없으면 빈 dict"""
+    try:
+        df_sectors = sector_index.load_sectors().set_index('종목코드')
+    except Exception:
+        return {}
+    symbol = str(symbol).zfill(6)
+    if symbol not in df_sectors.index:
+        return {}
+    info = df_sectors.loc[symbol]
+    if isinstance(info, pd.DataFrame):
+        info = info.iloc[-1]
+
+    out = {}
+    for level, column in sector_index.LEVELS.items():
+        group = info.get(column)
+        if pd.isna(group) or group in sector_index.EXCLUDED_GROUPS:
+            continue
+        df = sector_index.load(level=level, groups=[group])
+        if not df.empty:
+            out[f"{column}: {group}"] = df.set_index('date')['cap_weighted']
+    return out
+
 def show_chart(symbol, market, chart_type):
     df_chart = load_daily_data(symbol, market)
     if df_chart is None:
@@ -797,6 +816,24 @@ def show_chart(symbol, market, chart_type):
         fig.update_layout(height=350, title="OBV", template="plotly")
         st.plotly_chart(fig, width='stretch', config={'displayModeBar': False}, theme="streamlit")
 
+    elif chart_type == "업종지수":
+        # 종목 종가와 Sector / 업종 지수를 기간 첫날 = 100 으로 맞춰 비교
+        indices = load_sector_index_data(symbol)
+        if not indices or df_chart.empty:
+            st.warning("업종 지수 데이터가 없습니다.")
+            return
+        start = df_chart.index.min()
+        fig = go.Figure()
+        lines = {f"{symbol} 종가": df_chart[close_col]}
+        lines.update({name: series[series.index >= start] for name, series in indices.items()})
+        for name, series in lines.items():
+            series = series.dropna()
+            if series.empty:
+                continue
+            fig.add_trace(go.Scatter(x=series.index, y=series / series.iloc[0] * 100, name=name, line=dict(width=2)))
+        fig.update_layout(height=350, title="종목 vs 업종 지수 (기간 시작 = 100)", template="plotly")
+        st.plotly_chart(fig, width='stretch', config={'displayModeBar': False}, theme="streamlit")
+
     elif chart_type == "RSI":
         if len(df_chart) < 14:
             st.warning(f"RSI 계산에는 최소 14일이 필요합니다 (현재: {len(df_chart)}일).")
@@ -2373,7 +2410,7 @@ if st.session_state.selected_symbol and st.session_state.selected_market:
             if chart_period != st.session_state.chart_period:
                 st.session_state.chart_period = chart_period
 
-            chart_tab1, chart_tab2, chart_tab3, chart_tab4 = st.tabs(["종가", "MACD", "OBV", "RSI"])
+            chart_tab1, chart_tab2, chart_tab3, chart_tab4, chart_tab5 = st.tabs(["종가", "MACD", "OBV", "RSI", "업종지수"])
             with chart_tab1:
                 show_chart(symbol, market, "종가")
             with chart_tab2:
@@ -2382,5 +2419,7 @@ if st.session_state.selected_symbol and st.session_state.selected_market:
                 show_chart(symbol, market, "OBV")
             with chart_tab4:
                 show_chart(symbol, market, "RSI")
+            with chart_tab5:
+                show_chart(symbol, market, "업종지수")
 else:
     st.info("위 테이블에서 종목을 선택하세요.")
\ No newline at end of file
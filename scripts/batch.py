@@ -4,6 +4,16 @@ import subprocess
 from datetime import datetime
 import os
 import sys
+import traceback
+
+def run_stage(label, func, *args, **kwargs):
+    """같은 프로세스에서 단계 실행 (실패해도 다음 단계 진행, subprocess 실행 때와 동일)"""
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        print(f"🚨 {label} 실패")
+        traceback.print_exc()
+        return None
 
 def run_batch():
     print(f"배치 시작: {datetime.now()}")
@@ -13,17 +23,33 @@ def run_batch():
     # 1. 기본 데이터 수집
     subprocess.run(["python", os.path.join(SCRIPT_DIR, "fetch_data.py")])
 
+    # 2~4단계는 한 프로세스에서 실행 → 단계 사이 결과는 DataFrame 으로 전달 (CSV 는 저장만)
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    import naver_crawler_integrated
+    import process_kr_sectors
+    import download
+    import sector_index
+
     # 2. 네이버 크롤링 (통합) - 4개 CSV 생성
     print("\n📊 네이버 크롤링 시작...")
-    subprocess.run(["python", os.path.join(SCRIPT_DIR, "naver_crawler_integrated.py")])
+    tables = run_stage("네이버 크롤링", naver_crawler_integrated.crawl) or {}
 
     # 3. 섹터 데이터 처리 (리츠/인프라 업종 매핑 + Sector 분류)
+    # 크롤링 실패 시 기존 CSV 사용
     print("\n🏢 섹터 데이터 처리 시작...")
-    subprocess.run(["python", os.path.join(SCRIPT_DIR, "process_kr_sectors.py")])
+    df_sectors = run_stage("섹터 데이터 처리", process_kr_sectors.process, tables.get('sectors'))
 
-    # 4. CSV → JSON 메타 통합
+    # 4. 크롤링 결과 → JSON 메타 통합
     print("\n💾 메타 데이터 통합 시작...")
-    subprocess.run(["python", os.path.join(SCRIPT_DIR, "download.py")])
+    run_stage("메타 데이터 통합", download.merge_meta,
+              df_per_eps=tables.get('per_eps'),
+              df_foreign_inst=tables.get('trading'),
+              df_sectors=df_sectors,
+              df_sector_trend=tables.get('sector_trends'))
+
+    # 4-1. 섹터 / 업종 지수 (구성 종목 일봉 → 시가총액 가중 / 동일 가중)
+    run_stage("섹터 지수 계산", sector_index.build, df_sectors=df_sectors)
 
     # 5. 기술적 지표 계산
     print("\n📈 기술적 지표 계산 시작...")
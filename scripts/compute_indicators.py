@@ -1,5 +1,4 @@
 import pandas_ta as ta
-import pandas as pd
 import duckdb
 import os
 import json
@@ -7,6 +6,9 @@ from datetime import datetime
 from multiprocessing import Pool
 import time
 
+import ohlcv_store
+import price_panel
+
 DATA_DIR = os.getenv('DATA_DIR', './data')
 os.makedirs(DATA_DIR, exist_ok=True)
 META_DIR = os.path.join(DATA_DIR, 'meta')
@@ -23,23 +25,37 @@ def load_meta():
         print("메타 파일 없음 – fetch_data.py 먼저 실행하세요!")
         return {'KOSPI': {}, 'KOSDAQ': {}}
 
+_price_panel = None
+
+def load_daily(symbol, market):
+    """
+    일봉 조회: 가격 패널(mmap)에서 먼저 찾고, 없으면 OHLCV 저장소 조회
+    워커 프로세스마다 패널을 mmap 으로 열어 페이지 캐시 공유 (일봉을 pickle 로 넘기지 않음)
+    """
+    global _price_panel
+    if _price_panel is None:
+        _price_panel = price_panel.load_panel() or False
+
+    df = _price_panel.frame(symbol, market) if _price_panel else None
+    if df is None:
+        df = ohlcv_store.load_symbol(symbol, market)
+    return df
+
 def compute_indicators_wrapper(args):
-    symbol, market = args
-    return compute_indicators(symbol, market)
+    symbol, market, df_daily = args
+    return compute_indicators(symbol, market, df_daily)
 
-def compute_indicators(symbol, market='KOSPI'):
+def compute_indicators(symbol, market='KOSPI', df_daily=None):
     try:
-        # market 기준으로 폴더 분기
-        # KOSPI → kr_daily/kospi/
-        # KOSDAQ → kr_daily/kosdaq/
-        market_folder = market.lower()
-        daily_path = os.path.join(DATA_DIR, 'kr_daily', market_folder, f"{symbol}.csv")
+        # 일봉은 가격 패널 / OHLCV 저장소에서 로드 (패널이 없을 때만 메인에서 시장 단위로 미리 읽어 넘겨줌)
+        if df_daily is None:
+            df_daily = load_daily(symbol, market)
 
-        if not os.path.exists(daily_path):
+        if df_daily is None or df_daily.empty:
             print(f"{symbol} ({market}) 데이터 없음 – 스킵")
             return None
 
-        df_daily = pd.read_csv(daily_path, index_col=0)
+        df_daily = df_daily.copy()
 
         # 한글 컬럼 영어로 변경
         df_daily = df_daily.rename(columns={
@@ -237,11 +253,25 @@ if __name__ == '__main__':
     num_processes = 4
     print(f"멀티프로세싱 시작: {num_processes} 프로세스 사용")
 
-    # KOSPI + KOSDAQ + 구버전 KR(KOSPI 폴더로 처리) args 생성
+    # 가격 패널이 있으면 워커가 패널에서 직접 읽음 (None 전달)
+    # 없으면 KOSPI + KOSDAQ + 구버전 KR(KOSPI 폴더로 처리) 일봉을 시장 단위로 한 번에 로드
+    daily_by_market = {'KOSPI': {}, 'KOSDAQ': {}}
+    panel = price_panel.load_panel()
+    if panel is not None:
+        print(f"가격 패널 사용: {panel.shape[0]}종목 × {panel.shape[1]}거래일")
+    else:
+        for market_name in ('KOSPI', 'KOSDAQ'):
+            df_market = ohlcv_store.load_range(market=market_name)
+            daily_by_market[market_name] = {
+                symbol: ohlcv_store.to_daily_frame(group)
+                for symbol, group in df_market.groupby('symbol', sort=False)
+            }
+            print(f"{market_name} 일봉 로드: {len(daily_by_market[market_name])}종목 / {len(df_market)}행")
+
     all_args = (
-        [(ticker, 'KOSPI') for ticker in kospi_tickers] +
-        [(ticker, 'KOSDAQ') for ticker in kosdaq_tickers] +
-        [(ticker, 'KOSPI') for ticker in kr_tickers]  # 구버전 호환
+        [(ticker, 'KOSPI', daily_by_market['KOSPI'].get(ticker)) for ticker in kospi_tickers] +
+        [(ticker, 'KOSDAQ', daily_by_market['KOSDAQ'].get(ticker)) for ticker in kosdaq_tickers] +
+        [(ticker, 'KOSPI', daily_by_market['KOSPI'].get(ticker)) for ticker in kr_tickers]  # 구버전 호환
     )
 
     with Pool(num_processes) as pool:
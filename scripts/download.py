@@ -4,6 +4,8 @@ import pandas as pd
 import json
 import os
 
+import flow_store
+
 DATA_DIR = os.getenv('DATA_DIR', './data')
 data_dir = DATA_DIR
 
@@ -14,89 +16,112 @@ sector_path = os.path.join(data_dir, 'kr_stock_sectors.csv')
 sector_trend_path = os.path.join(data_dir, 'sector_etf_trends.csv')
 json_path = os.path.join(data_dir, 'meta', 'tickers_meta.json')
 
-# ============================================
-# 1. CSV 로드
-# ============================================
-print("📂 CSV 파일 로딩 중...")
 
-df_per_eps = pd.read_csv(per_eps_path, encoding='utf-8-sig')
-df_foreign_inst = pd.read_csv(foreign_institutional_path, encoding='utf-8-sig')
-df_sectors = pd.read_csv(sector_path, encoding='utf-8-sig')
+def _load_csv(df, path, label):
+    """넘겨받은 DataFrame 이 없으면 CSV 로드"""
+    if df is not None:
+        return df
+    print(f"📂 {label} CSV 로딩: {path}")
+    return pd.read_csv(path, encoding='utf-8-sig')
 
-print(f"  PER/EPS: {len(df_per_eps)}개")
-print(f"  외국인/기관: {len(df_foreign_inst)}개")
-print(f"  섹터: {len(df_sectors)}개")
 
 # ============================================
-# 2. 섹터 트렌드 CSV 로드
+# 1. 섹터 트렌드 로드
 # ============================================
-try:
-    df_sector_trend = pd.read_csv(sector_trend_path, encoding='utf-8-sig')
-    sector_trend_dict = {}
-    for _, row in df_sector_trend.iterrows():
-        key = (row['sector'], row['market'])
-        sector_trend_dict[key] = row['trend_display']
-    print(f"✅ 섹터 트렌드 {len(sector_trend_dict)}개 로드 완료")
-except FileNotFoundError:
-    print("⚠️ sector_etf_trends.csv 없음 - 섹터 트렌드 없이 진행")
-    sector_trend_dict = {}
-except Exception as e:
-    print(f"⚠️ 섹터 트렌드 로드 실패: {e}")
-    sector_trend_dict = {}
 
-# ============================================
-# 3. 데이터 딕셔너리 생성
-# ============================================
-print("\n📊 데이터 처리 중...")
-
-# 3-1. PER/EPS/기관외국인보유율 딕셔너리
-per_eps_dict = {}
-for _, row in df_per_eps.iterrows():
-    name = str(row['종목명']).strip()
-    per_eps_dict[name] = {
-        'per': row['PER'] if pd.notna(row['PER']) and str(row['PER']).strip() not in ['-', 'N/A', ''] else None,
-        'eps': row['EPS'] if pd.notna(row['EPS']) and str(row['EPS']).strip() not in ['-', 'N/A', ''] else None,
-        'ownership_foreign_institution': row['외국인보유율'] if pd.notna(row['외국인보유율']) and str(row['외국인보유율']).strip() not in ['-', 'N/A', ''] else None
-    }
-
-# 3-2. 섹터 딕셔너리 (회사명 -> Sector)
-sector_dict = {}
-for _, row in df_sectors.iterrows():
-    name = str(row['회사명']).strip()
-    sector = str(row['Sector']).strip() if pd.notna(row['Sector']) else 'N/A'
-    sector_dict[name] = sector
-
-# 3-3. 외국인/기관 순매수 딕셔너리 (종목별 최근 5일)
-df_foreign_inst['날짜'] = pd.to_datetime(df_foreign_inst['날짜'], format='%Y%m%d')
-df_foreign_inst = df_foreign_inst.sort_values(by=['종목명', '날짜'], ascending=[True, False])
-
-foreign_inst_dict = {}
-for name, group in df_foreign_inst.groupby('종목명'):
-    name = str(name).strip()
-    foreign_list = group['외국인순매수'].tolist()[:5]
-    inst_list = group['기관순매수'].tolist()[:5]
-
-    # 5개 미만이면 0으로 패딩
-    foreign_list += [0] * (5 - len(foreign_list))
-    inst_list += [0] * (5 - len(inst_list))
-
-    foreign_inst_dict[name] = {
-        'foreign_net_buy': foreign_list,
-        'institutional_net_buy': inst_list
-    }
+def build_sector_trend_dict(df_sector_trend=None):
+    """
+    (sector, market) → {'trend_display': 문구, 'return_1w' / 'return_1m' / 'return_3m': 수익률(%)}
+    수익률 컬럼이 없는 이전 형식 CSV 는 문구만 (없으면 빈 dict)
+    """
+    try:
+        df_sector_trend = _load_csv(df_sector_trend, sector_trend_path, '섹터 트렌드')
+        return_columns = [col for col in df_sector_trend.columns if col.startswith('return_')]
+        sector_trend_dict = {}
+        for _, row in df_sector_trend.iterrows():
+            key = (row['sector'], row['market'])
+            sector_trend_dict[key] = {'trend_display': row['trend_display']}
+            for col in return_columns:
+                if pd.notna(row[col]):
+                    sector_trend_dict[key][col] = float(row[col])
+        print(f"✅ 섹터 트렌드 {len(sector_trend_dict)}개 로드 완료")
+    except FileNotFoundError:
+        print("⚠️ sector_etf_trends.csv 없음 - 섹터 트렌드 없이 진행")
+        sector_trend_dict = {}
+    except Exception as e:
+        print(f"⚠️ 섹터 트렌드 로드 실패: {e}")
+        sector_trend_dict = {}
+    return sector_trend_dict
+
 
 # ============================================
-# 4. JSON 로드 및 업데이트
+# 2. 데이터 딕셔너리 생성
 # ============================================
-print("\n📝 메타 데이터 업데이트 중...")
 
-with open(json_path, 'r', encoding='utf-8') as f:
-    meta = json.load(f)
+def build_per_eps_dict(df_per_eps):
+    """종목명 → PER/EPS/기관외국인보유율"""
+    per_eps_dict = {}
+    for _, row in df_per_eps.iterrows():
+        name = str(row['종목명']).strip()
+        per_eps_dict[name] = {
+            'per': row['PER'] if pd.notna(row['PER']) and str(row['PER']).strip() not in ['-', 'N/A', ''] else None,
+            'eps': row['EPS'] if pd.notna(row['EPS']) and str(row['EPS']).strip() not in ['-', 'N/A', ''] else None,
+            'ownership_foreign_institution': row['외국인보유율'] if pd.notna(row['외국인보유율']) and str(row['외국인보유율']).strip() not in ['-', 'N/A', ''] else None
+        }
+    return per_eps_dict
+
+
+def build_sector_dict(df_sectors):
+    """회사명 → Sector"""
+    sector_dict = {}
+    for _, row in df_sectors.iterrows():
+        name = str(row['회사명']).strip()
+        sector = str(row['Sector']).strip() if pd.notna(row['Sector']) else 'N/A'
+        sector_dict[name] = sector
+    return sector_dict
+
+
+def build_foreign_inst_dict(df_foreign_inst):
+    """종목명 → 외국인/기관 순매수 최근 5일 (최신일 먼저)"""
+    df_foreign_inst = df_foreign_inst.copy()
+    df_foreign_inst['날짜'] = pd.to_datetime(df_foreign_inst['날짜'].astype(str), format='%Y%m%d')
+    df_foreign_inst = df_foreign_inst.sort_values(by=['종목명', '날짜'], ascending=[True, False])
 
-kospi_updated = 0
-kosdaq_updated = 0
+    foreign_inst_dict = {}
+    for name, group in df_foreign_inst.groupby('종목명'):
+        name = str(name).strip()
+        foreign_list = group['외국인순매수'].tolist()[:5]
+        inst_list = group['기관순매수'].tolist()[:5]
 
-def update_market_meta(market_dict, market_name):
+        # 5개 미만이면 0으로 패딩
+        foreign_list += [0] * (5 - len(foreign_list))
+        inst_list += [0] * (5 - len(inst_list))
+
+        foreign_inst_dict[name] = {
+            'foreign_net_buy': foreign_list,
+            'institutional_net_buy': inst_list
+        }
+    return foreign_inst_dict
+
+
+def build_flow_feature_dict():
+    """순매수 이력 저장소 집계 (종목코드 기준, 최근 5일 + 5/20/60일 합계 + 연속 일수)"""
+    try:
+        df_flow_features = flow_store.flow_features(flow_store.load())
+    except Exception as e:
+        print(f"⚠️ 순매수 이력 로드 실패: {e} → CSV 5일치만 사용")
+        df_flow_features = pd.DataFrame()
+    flow_feature_dict = df_flow_features.to_dict('index')
+    if flow_feature_dict:
+        print(f"✅ 순매수 이력 {len(flow_feature_dict)}종목 집계 (최신 {df_flow_features.attrs['latest_date']:%Y-%m-%d})")
+    return flow_feature_dict
+
+
+# ============================================
+# 3. 메타 업데이트
+# ============================================
+
+def update_market_meta(market_dict, per_eps_dict, sector_dict, foreign_inst_dict, flow_feature_dict, sector_trend_dict):
     """KOSPI 또는 KOSDAQ 메타 딕셔너리 업데이트"""
     updated = 0
     for code, info in market_dict.items():
@@ -126,8 +151,16 @@ def update_market_meta(market_dict, market_name):
         if meta_name in sector_dict:
             info['sector'] = sector_dict[meta_name]
 
-        # 외국인/기관 순매수 업데이트
-        if meta_name in foreign_inst_dict:
+        # 외국인/기관 순매수 업데이트 (이력 저장소 우선, 없으면 CSV)
+        if code in flow_feature_dict:
+            flow = flow_feature_dict[code]
+            info['foreign_net_buy'] = flow['foreign_recent']
+            info['institutional_net_buy'] = flow['institutional_recent']
+            for field in ('foreign', 'institutional'):
+                for w in flow_store.WINDOWS:
+                    info[f'{field}_net_buy_sum_{w}'] = int(flow[f'{field}_sum_{w}'])
+                info[f'{field}_net_buy_streak'] = int(flow[f'{field}_streak'])
+        elif meta_name in foreign_inst_dict:
             data = foreign_inst_dict[meta_name]
             info['foreign_net_buy'] = data['foreign_net_buy']
             info['institutional_net_buy'] = data['institutional_net_buy']
@@ -135,56 +168,102 @@ def update_market_meta(market_dict, market_name):
             info['foreign_net_buy'] = [0, 0, 0, 0, 0]
             info['institutional_net_buy'] = [0, 0, 0, 0, 0]
 
-        # 섹터 트렌드 추가
+        # 섹터 트렌드 추가 (표시 문구 + 섹터 ETF 1주/1개월/3개월 수익률)
         sector_val = info.get('sector', 'N/A')
+        for key in [k for k in info if k.startswith('sector_return_')]:
+            del info[key]
         if sector_val not in ('N/A', 'ETF') and (sector_val, 'KR') in sector_trend_dict:
-            info['sector_trend'] = sector_trend_dict[(sector_val, 'KR')]
+            trend = sector_trend_dict[(sector_val, 'KR')]
+            info['sector_trend'] = trend['trend_display']
+            for col, value in trend.items():
+                if col.startswith('return_'):
+                    info[f'sector_{col}'] = value
         else:
             info['sector_trend'] = 'N/A'
 
     return updated
 
-# ============================================
-# 4-1. KOSPI 종목 업데이트
-# ============================================
-if 'KOSPI' in meta:
-    kospi_updated = update_market_meta(meta['KOSPI'], 'KOSPI')
-    print(f"  KOSPI: {kospi_updated}개 업데이트")
-else:
-    print("⚠️ 메타에 KOSPI 키 없음 (스킵)")
 
-# ============================================
-# 4-2. KOSDAQ 종목 업데이트
-# ============================================
-if 'KOSDAQ' in meta:
-    kosdaq_updated = update_market_meta(meta['KOSDAQ'], 'KOSDAQ')
-    print(f"  KOSDAQ: {kosdaq_updated}개 업데이트")
-else:
-    print("⚠️ 메타에 KOSDAQ 키 없음 (스킵)")
+def merge_meta(df_per_eps=None, df_foreign_inst=None, df_sectors=None, df_sector_trend=None, meta=None):
+    """
+    크롤링 결과 → tickers_meta.json 통합
+    넘겨받지 않은(None) 입력만 CSV / JSON 파일에서 로드 (batch.py 는 크롤링 결과를 메모리로 전달)
 
-# 기존 KR 키 호환 처리 (구버전 메타 파일 대응)
-if 'KR' in meta:
-    kr_updated = update_market_meta(meta['KR'], 'KR')
-    print(f"  KR (구버전 호환): {kr_updated}개 업데이트")
+    Parameters:
+    - df_per_eps: per_eps_all.csv 형식
+    - df_foreign_inst: foreign_institutional_net_buy_daily_all.csv 형식
+    - df_sectors: kr_stock_sectors.csv 형식 (Sector 컬럼 포함)
+    - df_sector_trend: sector_etf_trends.csv 형식
+    - meta: tickers_meta.json 내용
 
-# ============================================
-# 5. JSON 저장
-# ============================================
-with open(json_path, 'w', encoding='utf-8') as f:
-    json.dump(meta, f, ensure_ascii=False, indent=4)
+    Returns:
+    - 업데이트된 meta dict (json_path 에도 저장)
+    """
+    df_per_eps = _load_csv(df_per_eps, per_eps_path, 'PER/EPS')
+    df_foreign_inst = _load_csv(df_foreign_inst, foreign_institutional_path, '외국인/기관')
+    df_sectors = _load_csv(df_sectors, sector_path, '섹터')
 
-# ============================================
-# 6. 결과 출력
-# ============================================
-print("\n" + "="*60)
-print("✅ 메타 데이터 업데이트 완료!")
-print("="*60)
-print(f"\n📌 KOSPI 종목 ({kospi_updated}개 업데이트)")
-print(f"📌 KOSDAQ 종목 ({kosdaq_updated}개 업데이트)")
-print(f"📌 전체 ({kospi_updated + kosdaq_updated}개 업데이트)")
-print("  - PER, EPS, 기관+외국인 보유율")
-print("  - Sector")
-print("  - 외국인 순매수 (5일치)")
-print("  - 기관 순매수 (5일치)")
-print("  - Sector 트렌드")
-print(f"\n💾 저장 위치: {json_path}")
\ No newline at end of file
+    print(f"  PER/EPS: {len(df_per_eps)}개")
+    print(f"  외국인/기관: {len(df_foreign_inst)}개")
+    print(f"  섹터: {len(df_sectors)}개")
+
+    sector_trend_dict = build_sector_trend_dict(df_sector_trend)
+
+    print("\n📊 데이터 처리 중...")
+    lookups = (
+        build_per_eps_dict(df_per_eps),
+        build_sector_dict(df_sectors),
+        build_foreign_inst_dict(df_foreign_inst),
+        build_flow_feature_dict(),
+        sector_trend_dict,
+    )
+
+    print("\n📝 메타 데이터 업데이트 중...")
+    if meta is None:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+    kospi_updated = 0
+    kosdaq_updated = 0
+
+    # KOSPI 종목 업데이트
+    if 'KOSPI' in meta:
+        kospi_updated = update_market_meta(meta['KOSPI'], *lookups)
+        print(f"  KOSPI: {kospi_updated}개 업데이트")
+    else:
+        print("⚠️ 메타에 KOSPI 키 없음 (스킵)")
+
+    # KOSDAQ 종목 업데이트
+    if 'KOSDAQ' in meta:
+        kosdaq_updated = update_market_meta(meta['KOSDAQ'], *lookups)
+        print(f"  KOSDAQ: {kosdaq_updated}개 업데이트")
+    else:
+        print("⚠️ 메타에 KOSDAQ 키 없음 (스킵)")
+
+    # 기존 KR 키 호환 처리 (구버전 메타 파일 대응)
+    if 'KR' in meta:
+        kr_updated = update_market_meta(meta['KR'], *lookups)
+        print(f"  KR (구버전 호환): {kr_updated}개 업데이트")
+
+    # JSON 저장
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=4)
+
+    print("\n" + "="*60)
+    print("✅ 메타 데이터 업데이트 완료!")
+    print("="*60)
+    print(f"\n📌 KOSPI 종목 ({kospi_updated}개 업데이트)")
+    print(f"📌 KOSDAQ 종목 ({kosdaq_updated}개 업데이트)")
+    print(f"📌 전체 ({kospi_updated + kosdaq_updated}개 업데이트)")
+    print("  - PER, EPS, 기관+외국인 보유율")
+    print("  - Sector")
+    print("  - 외국인 순매수 (5일치)")
+    print("  - 기관 순매수 (5일치)")
+    print(f"  - 외국인/기관 순매수 합계 ({'/'.join(str(w) for w in flow_store.WINDOWS)}일) + 연속 일수")
+    print("  - Sector 트렌드 (섹터 ETF 1주/1개월/3개월 수익률)")
+    print(f"\n💾 저장 위치: {json_path}")
+    return meta
+
+
+if __name__ == '__main__':
+    merge_meta()
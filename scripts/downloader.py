@@ -0,0 +1,206 @@
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 네이버 요청 한도 (환경변수로 조정)
+# NAVER_RPS            → 시작 초당 요청 수 (token bucket 충전 속도)
+# NAVER_MIN_RPS        → 초당 요청 수 하한 (감속해도 이 아래로는 안 내려감)
+# NAVER_MAX_RPS        → 초당 요청 수 상한
+# NAVER_WINDOW         → 시작 동시 요청 수
+# NAVER_MAX_IN_FLIGHT  → 동시 요청 수 상한 (스레드 수)
+# NAVER_BURST          → 순간적으로 몰아서 보낼 수 있는 요청 수 (bucket 크기)
+# NAVER_TARGET_LATENCY → 응답 지연(초, 지수평균)이 이 값 이하일 때만 증속
+NAVER_RPS = float(os.getenv('NAVER_RPS', '10'))
+NAVER_MIN_RPS = float(os.getenv('NAVER_MIN_RPS', '1'))
+NAVER_MAX_RPS = float(os.getenv('NAVER_MAX_RPS', '20'))
+NAVER_WINDOW = float(os.getenv('NAVER_WINDOW', '4'))
+NAVER_MAX_IN_FLIGHT = int(os.getenv('NAVER_MAX_IN_FLIGHT', '16'))
+NAVER_BURST = float(os.getenv('NAVER_BURST', '1'))
+NAVER_TARGET_LATENCY = float(os.getenv('NAVER_TARGET_LATENCY', '1.0'))
+
+# 증속 판단용 최근 구간 (초) / 이 오류율 미만일 때만 증속
+STATS_WINDOW_SEC = 10.0
+HEALTHY_ERROR_RATE = 0.05
+
+
+class TokenBucket:
+    """
+    초당 rate개 토큰을 충전하는 token bucket (스레드 안전)
+    capacity 만큼은 순간적으로 몰아서 요청 가능 (기본 NAVER_BURST)
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity if capacity is not None else NAVER_BURST))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개를 얻을 때까지 대기"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def set_rate(self, rate):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self.rate = float(rate)
+
+
+class AdaptiveController:
+    """
+    네이버 요청 공용 AIMD 제어기 (naver_http.get 이 모든 요청 전후로 호출)
+    - 성공 + 지연/오류율 양호 → 동시 요청 수(window)와 rps 를 조금씩 증가 (additive increase)
+    - 429 / 5xx / 타임아웃 / 빈 응답 → 둘 다 절반으로 감소 (multiplicative decrease)
+      동시에 진행 중이던 요청들의 실패가 연달아 들어와도 지연 1회분 동안은 한 번만 감속
+    """
+
+    def __init__(self, rps=None, window=None, min_rps=None, max_rps=None,
+                 max_window=None, target_latency=None):
+        self.min_rps = min_rps or NAVER_MIN_RPS
+        self.max_rps = max_rps or NAVER_MAX_RPS
+        self.max_window = float(max_window or NAVER_MAX_IN_FLIGHT)
+        self.target_latency = target_latency or NAVER_TARGET_LATENCY
+        self.rps = min(max(rps or NAVER_RPS, self.min_rps), self.max_rps)
+        self.window = min(max(window or NAVER_WINDOW, 1.0), self.max_window)
+
+        self._bucket = TokenBucket(self.rps)
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._latency = None
+        self._recent = deque()  # (완료 시각, 성공 여부)
+        self._last_decrease = 0.0
+        self.decreases = 0
+
+    def acquire(self):
+        """동시 요청 슬롯 + rps 토큰 확보 (요청 직전 호출)"""
+        with self._cond:
+            while self._in_flight >= int(self.window):
+                self._cond.wait()
+            self._in_flight += 1
+        self._bucket.acquire()
+
+    def release(self, ok, latency=None):
+        """요청 결과 반영 (요청 직후 호출)"""
+        with self._cond:
+            self._in_flight -= 1
+            now = time.monotonic()
+            self._recent.append((now, ok))
+            while self._recent and now - self._recent[0][0] > STATS_WINDOW_SEC:
+                self._recent.popleft()
+
+            if latency is not None:
+                self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+
+            if ok:
+                if self._latency is not None and self._latency <= self.target_latency \
+                        and self._error_rate() < HEALTHY_ERROR_RATE:
+                    self.window = min(self.max_window, self.window + 1.0 / self.window)
+                    self.rps = min(self.max_rps, self.rps + 1.0 / self.rps)
+            elif now - self._last_decrease >= max(self._latency or 0.0, 1.0):
+                self.window = max(1.0, self.window / 2)
+                self.rps = max(self.min_rps, self.rps / 2)
+                self._last_decrease = now
+                self.decreases += 1
+
+            self._bucket.set_rate(self.rps)
+            self._cond.notify_all()
+
+    def _error_rate(self):
+        if not self._recent:
+            return 0.0
+        return sum(1 for _, ok in self._recent if not ok) / len(self._recent)
+
+    def stats(self):
+        """현재 window / rps 제한 / 최근 실측 rps / 오류율 / 평균 지연"""
+        with self._cond:
+            now = time.monotonic()
+            recent = [t for t, _ in self._recent if now - t <= STATS_WINDOW_SEC]
+            span = min(STATS_WINDOW_SEC, now - recent[0]) if len(recent) > 1 else 0.0
+            return {
+                'window': self.window,
+                'in_flight': self._in_flight,
+                'rps_limit': self.rps,
+                'observed_rps': len(recent) / span if span > 0 else 0.0,
+                'error_rate': self._error_rate(),
+                'latency_ms': (self._latency or 0.0) * 1000,
+                'decreases': self.decreases,
+            }
+
+    def describe(self):
+        st = self.stats()
+        return (f"동시 {st['window']:.1f} / 제한 {st['rps_limit']:.1f}rps / 실측 {st['observed_rps']:.1f}rps"
+                f" / 오류 {st['error_rate'] * 100:.0f}% / 지연 {st['latency_ms']:.0f}ms")
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_controller():
+    """프로세스 전체에서 공유하는 AdaptiveController"""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdaptiveController()
+    return _controller
+
+
+def run_concurrent(items, task, max_in_flight=None, label='', progress_every=10):
+    """
+    items 각각에 task(item) 실행 (반환값이 truthy 면 성공으로 집계)
+    - 스레드 수: max_in_flight (기본 NAVER_MAX_IN_FLIGHT)
+    - 실제 동시 요청 수 / 초당 요청 수는 naver_http.get 안에서 공용 AdaptiveController 가 조절
+
+    Returns:
+    - (results, success_count, fail_count)
+      results: {item: task 반환값 (예외 시 None)}
+    """
+    max_in_flight = max_in_flight or NAVER_MAX_IN_FLIGHT
+    controller = get_controller()
+
+    results = {}
+    success_count = 0
+    fail_count = 0
+    total = len(items)
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        futures = {executor.submit(task, item): item for item in items}
+
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                value = future.result()
+            except Exception as e:
+                print(f"⚠️ {item} 처리 실패: {e}")
+                value = None
+
+            results[item] = value
+            if value:
+                success_count += 1
+            else:
+                fail_count += 1
+
+            done = success_count + fail_count
+            if done % progress_every == 0 or done == total:
+                print(f"{label}진행: {done}/{total} (성공: {success_count}, 실패: {fail_count}) | {controller.describe()}")
+
+    elapsed = time.monotonic() - started
+    if total:
+        print(f"{label}소요: {elapsed:.1f}초 ({total / max(elapsed, 1e-9):.1f}건/초)")
+
+    return results, success_count, fail_count
@@ -1,15 +1,20 @@
 import pandas as pd
 import os
-import requests
-from bs4 import BeautifulSoup
+import naver_http
+import naver_cache
+import naver_extract
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor
-from tqdm import tqdm
 import json
-import time
 import shutil
 import numpy as np
-import ast
+import sys
+
+import sise_parser
+import ohlcv_store
+import price_panel
+import universe
+from downloader import run_concurrent
+from ingest_journal import IngestJournal
 
 DATA_DIR = os.getenv('DATA_DIR', './data')
 os.makedirs(DATA_DIR, exist_ok=True)
@@ -21,6 +26,9 @@ RESULTS_PATH = os.path.join(META_DIR, 'backtest.db')
 SHORT_FOLDER = os.path.join(DATA_DIR, 'short_term_results')
 MID_FOLDER = os.path.join(DATA_DIR, 'screener_results')
 
+# 증분 수집 시 마지막 저장일 이전으로 다시 받는 겹침 구간 (달력일)
+INCREMENTAL_OVERLAP_DAYS = 10
+
 if os.path.exists(DB_PATH):
     os.remove(DB_PATH)
     print("universe.db 삭제 완료!")
@@ -39,185 +47,86 @@ elif today.weekday() == 6:  # 일요일
     print(f"⚠️ 일요일 → 금요일로 조정: {today.strftime('%Y-%m-%d')}")
 
 
-def load_etf_codes():
-    """
-    kr_stock_sectors.csv 가 있으면 Sector == 'ETF' 인 종목코드 set 반환
-    없으면 빈 set 반환 (전체 수집)
-    """
-    sector_path = os.path.join(DATA_DIR, 'kr_stock_sectors.csv')
-    if not os.path.exists(sector_path):
-        print("ℹ️ kr_stock_sectors.csv 없음 → ETF 필터 없이 전체 수집")
-        return set()
-
+def _get_market_tickers(market, etf_codes=set()):
+    """시장 전체 종목 조회 (ETF 제외)"""
     try:
-        df = pd.read_csv(sector_path, encoding='utf-8-sig', dtype={'종목코드': str})
-        df['종목코드'] = df['종목코드'].str.zfill(6)
-        etf_codes = set(df[df['Sector'] == 'ETF']['종목코드'].tolist())
-        print(f"ℹ️ kr_stock_sectors.csv 로드 완료 → ETF {len(etf_codes)}개 제외 예정")
-        return etf_codes
-    except Exception as e:
-        print(f"⚠️ kr_stock_sectors.csv 로드 실패: {e} → ETF 필터 없이 전체 수집")
-        return set()
-
-
-def _fetch_market_tickers(sosok):
-    """
-    네이버 금융 시가총액 페이지에서 전체 종목 수집
-    sosok=0 → KOSPI, sosok=1 → KOSDAQ
-    ETF 필터 없음 (전종목 수집)
-    """
-    market_name = 'KOSPI' if sosok == 0 else 'KOSDAQ'
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Referer': 'https://finance.naver.com/'
-    }
-
-    stocks = []
-    page = 1
-
-    while True:
-        url = f'https://finance.naver.com/sise/sise_market_sum.naver?sosok={sosok}&page={page}'
-        res = requests.get(url, headers=headers, timeout=10)
-        res.encoding = 'euc-kr'
-        soup = BeautifulSoup(res.text, 'html.parser')
-
-        pager = soup.find('td', class_='pgRR')
-        if pager is None:
-            break
-
-        last_page = int(pager.find('a')['href'].split('page=')[-1])
-
-        table = soup.find('table', class_='type_2')
-        if table is None:
-            break
-
-        for row in table.find_all('tr'):
-            link = row.find('a', class_='tltle')
-            if link is None:
-                continue
-
-            href = link.get('href', '')
-            if 'code=' not in href:
-                continue
-
-            code = href.split('code=')[-1]
-            name = link.text.strip()
-
-            tds = row.find_all('td')
-
-            close = 0
-            if len(tds) >= 3:
-                try:
-                    close_text = tds[2].text.strip().replace(',', '')
-                    close = int(close_text) if close_text.isdigit() else 0
-                except:
-                    close = 0
-
-            cap = 0
-            if len(tds) >= 7:
-                try:
-                    cap_text = tds[6].text.strip().replace(',', '')
-                    cap = int(cap_text) if cap_text.isdigit() else 0
-                except:
-                    cap = 0
-
-            if code and len(code) == 6 and code.isdigit():
-                stocks.append({
-                    'Code': code,
-                    'Name': name,
-                    'MarketCap': cap,
-                    'Close': close,
-                    'Market': market_name
-                })
-
-        print(f"  {market_name} {page}/{last_page} 페이지 수집 중...")
-
-        if page >= last_page:
-            break
+        print(f"📊 {market} 전체 종목 조회 중...")
+        df, date_str = universe.get_market_universe(market)
 
-        page += 1
-        time.sleep(0.3)
-
-    print(f"✅ {market_name} 전체 수집 완료: {len(stocks)}개")
-    return stocks
-
-
-def get_kospi_tickers(etf_codes=set()):
-    """코스피 전체 종목 조회 (ETF 제외)"""
-    try:
-        print("📊 KOSPI 전체 종목 조회 중...")
-        stocks = _fetch_market_tickers(sosok=0)
-
-        if not stocks:
-            print("🚨 KOSPI 종목 조회 실패")
+        if df.empty:
+            print(f"🚨 {market} 종목 조회 실패")
             return [], pd.DataFrame(), None
 
-        df = pd.DataFrame(stocks)
-        df['MarketCap'] = pd.to_numeric(df['MarketCap'], errors='coerce').fillna(0)
-        df['Close'] = pd.to_numeric(df['Close'], errors='coerce').fillna(0)
-        df = df.drop_duplicates('Code').reset_index(drop=True)
-
         # ETF 제외 (kr_stock_sectors.csv 있을 때만)
         if etf_codes:
             before = len(df)
             df = df[~df['Code'].isin(etf_codes)].reset_index(drop=True)
-            print(f"ℹ️ KOSPI ETF 제외: {before}개 → {len(df)}개")
+            print(f"ℹ️ {market} ETF 제외: {before}개 → {len(df)}개")
 
         tickers = df['Code'].tolist()
-        date_str = today.strftime('%Y%m%d')
 
-        print(f"✅ KOSPI: {len(tickers)}개 (날짜: {date_str})")
+        print(f"✅ {market}: {len(tickers)}개 (날짜: {date_str})")
         print(f"샘플: {tickers[:5]}")
 
         return tickers, df, date_str
 
     except Exception as e:
-        print(f"❌ KOSPI 종목 조회 실패: {e}")
+        print(f"❌ {market} 종목 조회 실패: {e}")
         import traceback
         traceback.print_exc()
         return [], pd.DataFrame(), None
 
 
+def get_kospi_tickers(etf_codes=set()):
+    """코스피 전체 종목 조회 (ETF 제외)"""
+    return _get_market_tickers('KOSPI', etf_codes)
+
+
 def get_kosdaq_tickers(etf_codes=set()):
     """코스닥 전체 종목 조회 (ETF 제외)"""
-    try:
-        print("📊 KOSDAQ 전체 종목 조회 중...")
-        stocks = _fetch_market_tickers(sosok=1)
+    return _get_market_tickers('KOSDAQ', etf_codes)
 
-        if not stocks:
-            print("🚨 KOSDAQ 종목 조회 실패")
-            return [], pd.DataFrame(), None
 
-        df = pd.DataFrame(stocks)
-        df['MarketCap'] = pd.to_numeric(df['MarketCap'], errors='coerce').fillna(0)
-        df['Close'] = pd.to_numeric(df['Close'], errors='coerce').fillna(0)
-        df = df.drop_duplicates('Code').reset_index(drop=True)
+def get_daily_csv_path(ticker, market='KOSPI'):
+    """일봉 CSV 경로 (kr_daily/kospi|kosdaq/{ticker}.csv)"""
+    return os.path.join(DATA_DIR, 'kr_daily', market.lower(), f"{ticker}.csv")
 
-        # ETF 제외 (kr_stock_sectors.csv 있을 때만)
-        if etf_codes:
-            before = len(df)
-            df = df[~df['Code'].isin(etf_codes)].reset_index(drop=True)
-            print(f"ℹ️ KOSDAQ ETF 제외: {before}개 → {len(df)}개")
-
-        tickers = df['Code'].tolist()
-        date_str = today.strftime('%Y%m%d')
 
-        print(f"✅ KOSDAQ: {len(tickers)}개 (날짜: {date_str})")
-        print(f"샘플: {tickers[:5]}")
+def load_stored_daily(ticker, market='KOSPI'):
+    """저장된 일봉 CSV 로드 (없거나 읽기 실패 시 None)"""
+    path = get_daily_csv_path(ticker, market)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_csv(path, index_col=0, parse_dates=True, encoding='utf-8-sig')
+        df = df[['Open', 'High', 'Low', 'Close', 'Volume']].sort_index()
+        return df if not df.empty else None
+    except Exception as e:
+        print(f"⚠️ {ticker} 기존 일봉 로드 실패: {e} → 전체 재수집")
+        return None
 
-        return tickers, df, date_str
 
-    except Exception as e:
-        print(f"❌ KOSDAQ 종목 조회 실패: {e}")
-        import traceback
-        traceback.print_exc()
-        return [], pd.DataFrame(), None
+def _overlap_matches(stored, fresh):
+    """
+    겹치는 구간의 OHLC 비교 (수정주가 소급 변경 감지)
+    저장된 마지막 봉은 장중 수집분일 수 있으므로 비교에서 제외
+    """
+    common = stored.index.intersection(fresh.index)
+    common = common[common < stored.index.max()]
+    if len(common) == 0:
+        return True
+    cols = ['Open', 'High', 'Low', 'Close']
+    old = stored.loc[common, cols].to_numpy(dtype=float)
+    new = fresh.loc[common, cols].to_numpy(dtype=float)
+    return bool(np.array_equal(old, new))
 
 
-def fetch_kr_single(ticker, start_date, market='KOSPI'):
+def fetch_kr_single(ticker, start_date, market='KOSPI', incremental=True):
     """
     네이버 금융 siseJson API로 KR 일봉 다운로드 (수정주가 기준)
     market: 'KOSPI' or 'KOSDAQ' → 저장 폴더 분리
+    incremental=True → 저장된 마지막 날짜 이후 봉만 받아 이어붙임
+                       (겹치는 봉이 다르면 수정주가 변경으로 보고 전체 재수집)
     """
     try:
         if not ticker or len(ticker) != 6 or not ticker.isdigit():
@@ -227,58 +136,35 @@ def fetch_kr_single(ticker, start_date, market='KOSPI'):
         start_str = start_date.replace('-', '')
         end_str = today.strftime('%Y%m%d')
 
-        url = (
-            f'https://api.finance.naver.com/siseJson.naver'
-            f'?symbol={ticker}&requestType=1'
-            f'&startTime={start_str}&endTime={end_str}&timeframe=day'
-        )
-
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Referer': 'https://finance.naver.com/'
-        }
-
-        res = requests.get(url, headers=headers, timeout=10)
-
-        if res.status_code != 200:
-            return False
-
-        text = res.text.strip()
-        if not text or text == '[]':
-            return False
+        df = None
+        stored = load_stored_daily(ticker, market) if incremental else None
 
-        raw = ast.literal_eval(text)
+        if stored is not None:
+            overlap_start = stored.index.max() - timedelta(days=INCREMENTAL_OVERLAP_DAYS)
+            fresh = sise_parser.request_daily(ticker, overlap_start.strftime('%Y%m%d'), end_str)
 
-        rows = []
-        for item in raw:
-            if not isinstance(item, list) or len(item) < 6:
-                continue
-            try:
-                date_str_item = str(item[0])
-                if len(date_str_item) != 8 or not date_str_item.isdigit():
-                    continue
-                rows.append({
-                    'Date':   pd.to_datetime(date_str_item, format='%Y%m%d'),
-                    'Open':   int(item[1]) if item[1] is not None else None,
-                    'High':   int(item[2]) if item[2] is not None else None,
-                    'Low':    int(item[3]) if item[3] is not None else None,
-                    'Close':  int(item[4]) if item[4] is not None else None,
-                    'Volume': int(item[5]) if item[5] is not None else None,
-                })
-            except:
-                continue
+            if fresh is None:
+                return False
 
-        if not rows:
-            return False
+            if _overlap_matches(stored, fresh):
+                df = pd.concat([stored[stored.index < fresh.index.min()], fresh])
+                df = df[df.index >= pd.Timestamp(start_date)]
+            else:
+                print(f"🔄 {ticker} 수정주가 변경 감지 → 전체 재수집")
 
-        df = pd.DataFrame(rows).dropna()
-        df = df.set_index('Date').sort_index()
-        df = df[['Open', 'High', 'Low', 'Close', 'Volume']]
+        if df is None:
+            df = sise_parser.request_daily(ticker, start_str, end_str)
+            if df is None:
+                return False
 
         # KOSPI / KOSDAQ 폴더 분리 저장
         daily_dir = os.path.join(DATA_DIR, 'kr_daily', market.lower())
         os.makedirs(daily_dir, exist_ok=True)
-        df.to_csv(os.path.join(daily_dir, f"{ticker}.csv"), encoding='utf-8-sig')
+        df.index.name = 'Date'
+        # 임시 파일에 쓴 뒤 교체 (중간에 죽어도 반쯤 쓴 CSV 가 남지 않음)
+        csv_path = get_daily_csv_path(ticker, market)
+        df.to_csv(csv_path + '.tmp', encoding='utf-8-sig')
+        os.replace(csv_path + '.tmp', csv_path)
 
         return True
 
@@ -287,35 +173,67 @@ def fetch_kr_single(ticker, start_date, market='KOSPI'):
         return False
 
 
-def get_kr_meta_single(ticker, df_kr):
-    """KR 메타 정보 추출 (네이버 금융 기반)"""
-    cap = 0.0
-    name = "N/A"
-    per = 0.0
-    eps = 0.0
-    close_price = 0.0
+def fetch_market_daily(tickers, market, start_date, journal, incremental=True):
+    """
+    시장 1개 일봉 동시 수집
+    저널에 오늘 완료로 기록된 종목은 건너뛰고, 성공한 종목은 바로 저널에 기록
 
-    try:
-        if ticker in df_kr['Code'].values:
-            row = df_kr[df_kr['Code'] == ticker].iloc[0]
-            name = row.get('Name', 'N/A')
+    Returns:
+    - (success_count, fail_count)  ※ 건너뛴 종목은 성공으로 집계
+    """
+    pending = [t for t in tickers if not journal.done(f"{market}:{t}")]
+    skipped = len(tickers) - len(pending)
+    if skipped:
+        print(f"⏭️ {market} 저널 기준 완료 {skipped}개 건너뜀 → 남은 {len(pending)}개 수집")
 
-            cap_col = None
-            for col_name in ['MarketCap', 'Market Cap', 'Marcap', '시가총액', 'CapSize']:
-                if col_name in df_kr.columns:
-                    cap_col = col_name
-                    break
+    def task(ticker):
+        ok = fetch_kr_single(ticker, start_date, market=market, incremental=incremental)
+        if ok:
+            journal.record(f"{market}:{ticker}")
+        return ok
 
-            if cap_col:
-                cap = float(row.get(cap_col, 0))
+    _, success_count, fail_count = run_concurrent(pending, task, label=f'{market} ')
+    return success_count + skipped, fail_count
 
-            if 'Close' in df_kr.columns:
-                close_price = float(row.get('Close', 0))
 
-    except Exception as e:
-        print(f"⚠️ {ticker} 메타 추출 실패: {e}")
+def build_kr_meta(df_kr, old_meta, market, today_str):
+    """
+    시가총액 리스트 → KR 메타 (종목코드 인덱스 join 1회)
+    - 이름이 없거나 시가총액/종가가 0 이면 기존 meta 값 사용
+    - 리스트 시가총액이 0 인 종목은 cap_failed 로 반환
+
+    Returns:
+    - (meta dict {ticker: {...}}, cap_failed 리스트)
+    """
+    listing = df_kr.drop_duplicates('Code').set_index('Code')
+    old = pd.DataFrame.from_dict(old_meta, orient='index').reindex(
+        index=listing.index, columns=['name', 'cap', 'close']
+    )
+
+    name = listing['Name'].where(listing['Name'].notna() & (listing['Name'] != 'N/A'), old['name']).fillna('N/A')
+    listing_cap = listing['MarketCap'].astype(float)
+    cap = listing_cap.where(listing_cap > 0, old['cap'].astype(float)).fillna(0.0)
+    listing_close = listing['Close'].astype(float)
+    close = listing_close.where(listing_close > 0, old['close'].astype(float)).fillna(0.0)
+
+    meta = {
+        ticker: {
+            'name':       n,
+            'cap':        c,
+            'cap_status': today_str,
+            'per':        0.0,
+            'eps':        0.0,
+            'close':      cl
+        }
+        for ticker, n, c, cl in zip(listing.index, name.tolist(), cap.tolist(), close.tolist())
+    }
 
-    return ticker, cap, name, per, eps, close_price
+    failed = listing_cap.to_numpy() == 0
+    cap_failed = [
+        {'market': market, 'symbol': ticker, 'name': n, 'date': today_str}
+        for ticker, n in zip(listing.index[failed], name[failed].tolist())
+    ]
+    return meta, cap_failed
 
 
 # ====================================================
@@ -355,42 +273,17 @@ def get_naver_stock_info(ticker):
     """
     result = {'name': 'N/A', 'close': 0.0, 'cap': 0.0}
     try:
-        import re
-        url = f"https://finance.naver.com/item/main.nhn?code={ticker}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Referer': 'https://finance.naver.com/'
-        }
-        res = requests.get(url, headers=headers, timeout=5)
+        url = f"{naver_http.FINANCE_BASE}/item/main.nhn?code={ticker}"
+        res = naver_http.get(url)
         res.raise_for_status()
-        soup = BeautifulSoup(res.text, 'html.parser')
-
-        # 종목명
-        title_tag = soup.find('title')
-        if title_tag:
-            title_text = title_tag.text.strip()
-            name_part = title_text.split(':')[0].strip()
-            if name_part:
-                result['name'] = name_part
-
-        # 현재가
-        price_tag = soup.find('p', class_='no_today')
-        if price_tag:
-            blind_tag = price_tag.find('span', class_='blind')
-            if blind_tag:
-                try:
-                    result['close'] = float(blind_tag.text.strip().replace(',', ''))
-                except:
-                    pass
-
-        # 시가총액 (억원 단위)
-        text = soup.get_text()
-        cap_match = re.search(r'시가총액\s*([\d,]+)\s*억원', text)
-        if cap_match:
-            try:
-                result['cap'] = float(cap_match.group(1).replace(',', ''))
-            except:
-                pass
+        fields = naver_extract.extract_main(res.text)
+
+        # 종목명 / 현재가 / 시가총액 (억원 단위, 'N조 M' 표기 포함)
+        if fields['name']:
+            result['name'] = fields['name']
+        if fields['price'] is not None:
+            result['close'] = fields['price']
+        result['cap'] = fields['market_cap']
 
     except Exception as e:
         print(f"⚠️ {ticker} 네이버 크롤링 실패: {e}")
@@ -439,7 +332,6 @@ def supplement_backtest_symbols(all_tickers_set, kospi_meta, kosdaq_meta, start_
         else:
             dl_fail += 1
             print(f"   ❌ {symbol} 다운로드 실패")
-        time.sleep(0.3)
 
     print(f"\n✅ 일봉 다운로드 완료: 성공 {dl_success}개 / 실패 {dl_fail}개")
 
@@ -474,7 +366,6 @@ def supplement_backtest_symbols(all_tickers_set, kospi_meta, kosdaq_meta, start_
             'sector':       old_data.get('sector', 'N/A'),
             'sector_trend': old_data.get('sector_trend', 'N/A'),
         }
-        time.sleep(0.3)
 
     print(f"\n✅ 백테스트 누락 종목 보완 완료!")
     return kospi_meta, kosdaq_meta
@@ -483,10 +374,15 @@ def supplement_backtest_symbols(all_tickers_set, kospi_meta, kosdaq_meta, start_
 if __name__ == '__main__':
     print(f"🗓️ 작업 기준일: {today.strftime('%Y-%m-%d %A')}")
 
-    # 기존 데이터 삭제 (kospi / kosdaq 폴더 각각)
+    # --full → 기존 일봉 삭제 후 전체 재수집 / 기본은 증분 수집
+    # --resume → 오늘 저널에 완료 기록된 종목은 건너뛰고 이어서 수집 (kr_daily 삭제 안 함)
+    full_refresh = '--full' in sys.argv
+    resume = '--resume' in sys.argv
+    print(f"📥 일봉 수집 모드: {'전체 재수집' if full_refresh else '증분 수집'}{' (이어서)' if resume else ''}")
+
     for folder in ['kr_daily/kospi', 'kr_daily/kosdaq']:
         path = os.path.join(DATA_DIR, folder)
-        if os.path.exists(path):
+        if full_refresh and not resume and os.path.exists(path):
             try:
                 shutil.rmtree(path)
                 print(f"🗑️ {folder} 폴더 삭제 완료")
@@ -513,10 +409,12 @@ if __name__ == '__main__':
 
     cap_failed_list = []
 
+    daily_journal = IngestJournal('fetch_daily', universe.current_trading_date(), resume=resume)
+
     # ====================================================
     # ETF 코드 로드 (kr_stock_sectors.csv 있으면 필터링)
     # ====================================================
-    etf_codes = load_etf_codes()
+    etf_codes = universe.load_etf_codes()
 
     # ====================================================
     # KOSPI 데이터 수집
@@ -528,62 +426,19 @@ if __name__ == '__main__':
 
     if kospi_tickers:
         print(f"\n📥 KOSPI 일봉 다운로드 시작 (총 {len(kospi_tickers)}개)")
-        success_count = 0
-        fail_count = 0
-
-        for i in range(0, len(kospi_tickers), 100):
-            batch = kospi_tickers[i:i+100]
-            batch_success = 0
-
-            print(f"\n배치 {i//100 + 1}: {i}~{min(i+100, len(kospi_tickers))} 처리 중...")
-
-            for ticker in batch:
-                if fetch_kr_single(ticker, start_date, market='KOSPI'):
-                    batch_success += 1
-                    success_count += 1
-                else:
-                    fail_count += 1
-
-                if (success_count + fail_count) % 10 == 0:
-                    print(f"진행: {success_count + fail_count}/{len(kospi_tickers)} (성공: {success_count}, 실패: {fail_count})")
-
-            print(f"✅ 배치 완료: {batch_success}/{len(batch)} 성공")
-            time.sleep(3)
+        success_count, fail_count = fetch_market_daily(
+            kospi_tickers, 'KOSPI', start_date, daily_journal, incremental=not full_refresh
+        )
 
         print(f"\n✅ KOSPI 일봉 완료: 성공 {success_count}개, 실패 {fail_count}개")
 
     # KOSPI 메타 업데이트
     kospi_meta = old_meta.get('KOSPI', {})
     if kospi_tickers and not df_kospi.empty:
-        print("\n📊 KOSPI 메타 수집 시작")
-        batch_size = 200
-        for i in tqdm(range(0, len(kospi_tickers), batch_size)):
-            batch_tickers = kospi_tickers[i:i+batch_size]
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                results = executor.map(
-                    lambda t: get_kr_meta_single(t, df_kospi),
-                    batch_tickers
-                )
-            for ticker, cap, name, per, eps, close_price in results:
-                old_data = kospi_meta.get(ticker, {})
-
-                if cap == 0:
-                    cap_failed_list.append({
-                        'market': 'KOSPI',
-                        'symbol': ticker,
-                        'name': name if name != "N/A" else old_data.get('name', "N/A"),
-                        'date': today_str
-                    })
-
-                kospi_meta[ticker] = {
-                    'name':       name if name != "N/A" else old_data.get('name', "N/A"),
-                    'cap':        cap if cap > 0 else old_data.get('cap', 0.0),
-                    'cap_status': today_str,
-                    'per':        per,
-                    'eps':        eps,
-                    'close':      close_price if close_price > 0 else old_data.get('close', 0.0)
-                }
-            time.sleep(5)
+        kospi_new_meta, kospi_cap_failed = build_kr_meta(df_kospi, kospi_meta, 'KOSPI', today_str)
+        kospi_meta.update(kospi_new_meta)
+        cap_failed_list.extend(kospi_cap_failed)
+        print(f"✅ KOSPI 메타 갱신: {len(kospi_new_meta)}개 (시가총액 미수집 {len(kospi_cap_failed)}개)")
 
     # ====================================================
     # KOSDAQ 데이터 수집
@@ -595,62 +450,21 @@ if __name__ == '__main__':
 
     if kosdaq_tickers:
         print(f"\n📥 KOSDAQ 일봉 다운로드 시작 (총 {len(kosdaq_tickers)}개)")
-        success_count = 0
-        fail_count = 0
-
-        for i in range(0, len(kosdaq_tickers), 100):
-            batch = kosdaq_tickers[i:i+100]
-            batch_success = 0
-
-            print(f"\n배치 {i//100 + 1}: {i}~{min(i+100, len(kosdaq_tickers))} 처리 중...")
-
-            for ticker in batch:
-                if fetch_kr_single(ticker, start_date, market='KOSDAQ'):
-                    batch_success += 1
-                    success_count += 1
-                else:
-                    fail_count += 1
-
-                if (success_count + fail_count) % 10 == 0:
-                    print(f"진행: {success_count + fail_count}/{len(kosdaq_tickers)} (성공: {success_count}, 실패: {fail_count})")
-
-            print(f"✅ 배치 완료: {batch_success}/{len(batch)} 성공")
-            time.sleep(3)
+        success_count, fail_count = fetch_market_daily(
+            kosdaq_tickers, 'KOSDAQ', start_date, daily_journal, incremental=not full_refresh
+        )
 
         print(f"\n✅ KOSDAQ 일봉 완료: 성공 {success_count}개, 실패 {fail_count}개")
 
     # KOSDAQ 메타 업데이트
     kosdaq_meta = old_meta.get('KOSDAQ', {})
     if kosdaq_tickers and not df_kosdaq.empty:
-        print("\n📊 KOSDAQ 메타 수집 시작")
-        batch_size = 200
-        for i in tqdm(range(0, len(kosdaq_tickers), batch_size)):
-            batch_tickers = kosdaq_tickers[i:i+batch_size]
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                results = executor.map(
-                    lambda t: get_kr_meta_single(t, df_kosdaq),
-                    batch_tickers
-                )
-            for ticker, cap, name, per, eps, close_price in results:
-                old_data = kosdaq_meta.get(ticker, {})
-
-                if cap == 0:
-                    cap_failed_list.append({
-                        'market': 'KOSDAQ',
-                        'symbol': ticker,
-                        'name': name if name != "N/A" else old_data.get('name', "N/A"),
-                        'date': today_str
-                    })
-
-                kosdaq_meta[ticker] = {
-                    'name':       name if name != "N/A" else old_data.get('name', "N/A"),
-                    'cap':        cap if cap > 0 else old_data.get('cap', 0.0),
-                    'cap_status': today_str,
-                    'per':        per,
-                    'eps':        eps,
-                    'close':      close_price if close_price > 0 else old_data.get('close', 0.0)
-                }
-            time.sleep(5)
+        kosdaq_new_meta, kosdaq_cap_failed = build_kr_meta(df_kosdaq, kosdaq_meta, 'KOSDAQ', today_str)
+        kosdaq_meta.update(kosdaq_new_meta)
+        cap_failed_list.extend(kosdaq_cap_failed)
+        print(f"✅ KOSDAQ 메타 갱신: {len(kosdaq_new_meta)}개 (시가총액 미수집 {len(kosdaq_cap_failed)}개)")
+
+    daily_journal.close()
 
     # ====================================================
     # ✅ 백테스트 누락 종목 보완
@@ -660,6 +474,13 @@ if __name__ == '__main__':
         all_tickers_set, kospi_meta, kosdaq_meta, start_date, today_str
     )
 
+    # ====================================================
+    # 일봉 CSV → 컬럼형 OHLCV 저장소 (시장별 Parquet) + 가격 패널 갱신
+    # ====================================================
+    print("\n📦 OHLCV 저장소 빌드 중...")
+    ohlcv_store.build_from_csv()
+    price_panel.build_panel()
+
     # ====================================================
     # 시가총액 미수집 종목 CSV 저장
     # ====================================================
@@ -695,4 +516,5 @@ if __name__ == '__main__':
     print(f"📊 KOSPI: {len(kospi_meta)}개")
     print(f"📊 KOSDAQ: {len(kosdaq_meta)}개")
     print(f"📊 전체: {len(kospi_meta) + len(kosdaq_meta)}개")
-    print("="*50)
\ No newline at end of file
+    print(f"🗄️ 네이버 {naver_cache.describe()}")
+    print("="*50)
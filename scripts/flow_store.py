@@ -0,0 +1,169 @@
+import os
+import duckdb
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.getenv('DATA_DIR', './data')
+
+# 외국인/기관 순매수 이력 저장소 (종목, 날짜) 1행
+# data/flows/investor_flow.parquet → symbol, date, foreign_net, institutional_net (주, 종목 → 날짜 순 정렬)
+# 매일 크롤링 결과를 추가 (같은 종목·날짜는 새 값으로 교체)
+FLOW_DIR = os.path.join(DATA_DIR, 'flows')
+FLOW_PATH = os.path.join(FLOW_DIR, 'investor_flow.parquet')
+
+WINDOWS = (5, 20, 60)
+RECENT_DAYS = 5
+
+
+def _sql_path(path):
+    return path.replace('\\', '/').replace("'", "''")
+
+
+def _empty_frame():
+    return pd.DataFrame({
+        'symbol': pd.Series(dtype=object),
+        'date': pd.Series(dtype='datetime64[ns]'),
+        'foreign_net': pd.Series(dtype=np.int64),
+        'institutional_net': pd.Series(dtype=np.int64),
+    })
+
+
+def from_daily_rows(df):
+    """크롤러 행 (티커, 날짜 'YYYYMMDD', 외국인순매수, 기관순매수) → 저장소 형식"""
+    if df is None or df.empty:
+        return _empty_frame()
+    out = pd.DataFrame({
+        'symbol': df['티커'].astype(str).str.zfill(6),
+        'date': pd.to_datetime(df['날짜'].astype(str), format='%Y%m%d', errors='coerce'),
+        'foreign_net': pd.to_numeric(df['외국인순매수'], errors='coerce').fillna(0).astype(np.int64),
+        'institutional_net': pd.to_numeric(df['기관순매수'], errors='coerce').fillna(0).astype(np.int64),
+    })
+    return out.dropna(subset=['date']).drop_duplicates(['symbol', 'date'], keep='last')
+
+
+def append(rows, path=FLOW_PATH):
+    """
+    이력 추가 (symbol, date 기준 중복 제거, 새 값 우선)
+    임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 항상 완전한 파일을 봄
+
+    Returns:
+    - (추가된 (종목, 날짜) 수, 전체 행 수)
+    """
+    if rows.empty:
+        return 0, 0
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    con = duckdb.connect()
+    try:
+        con.register('new_rows', rows[['symbol', 'date', 'foreign_net', 'institutional_net']])
+        sources = ["SELECT symbol, CAST(date AS DATE) AS date, foreign_net, institutional_net, 1 AS src FROM new_rows"]
+        before = 0
+        if os.path.exists(path):
+            sources.append(f"SELECT symbol, date, foreign_net, institutional_net, 0 AS src FROM read_parquet('{_sql_path(path)}')")
+            before = con.execute(f"SELECT COUNT(*) FROM read_parquet('{_sql_path(path)}')").fetchone()[0]
+
+        con.execute(f"""
+            COPY (
+                SELECT symbol, date, CAST(foreign_net AS BIGINT) AS foreign_net, CAST(institutional_net AS BIGINT) AS institutional_net
+                FROM ({' UNION ALL '.join(sources)})
+                QUALIFY row_number() OVER (PARTITION BY symbol, date ORDER BY src DESC) = 1
+                ORDER BY symbol, date
+            ) TO '{_sql_path(tmp_path)}' (FORMAT PARQUET, COMPRESSION ZSTD)
+        """)
+        total = con.execute(f"SELECT COUNT(*) FROM read_parquet('{_sql_path(tmp_path)}')").fetchone()[0]
+    finally:
+        con.close()
+    os.replace(tmp_path, path)
+    return total - before, total
+
+
+def load(symbols=None, start=None, path=FLOW_PATH):
+    """이력 조회 (long 형식: symbol, date, foreign_net, institutional_net), 없으면 빈 DataFrame"""
+    if not os.path.exists(path) or (symbols is not None and len(symbols) == 0):
+        return _empty_frame()
+
+    where = []
+    params = []
+    if symbols is not None:
+        where.append(f"symbol IN ({','.join(['?'] * len(symbols))})")
+        params.extend(str(s).zfill(6) for s in symbols)
+    if start is not None:
+        where.append("date >= ?")
+        params.append(pd.Timestamp(start).date())
+
+    sql = (f"SELECT symbol, date, foreign_net, institutional_net FROM read_parquet('{_sql_path(path)}')"
+           + (" WHERE " + " AND ".join(where) if where else "")
+           + " ORDER BY symbol, date")
+    con = duckdb.connect()
+    try:
+        df = con.execute(sql, params).fetchdf()
+    finally:
+        con.close()
+    df['date'] = pd.to_datetime(df['date']).astype('datetime64[ns]')
+    return df
+
+
+def _streak(values):
+    """
+    마지막 날부터 같은 부호가 이어진 일수 (순매수 +n, 순매도 -n, 마지막 날 0 이면 0)
+    values: [종목, 날짜] (마지막 열 = 최신)
+    """
+    signs = np.sign(values[:, ::-1])
+    same = (signs == signs[:, :1]) & (signs != 0)
+    length = np.where(same.all(axis=1), same.shape[1], same.argmin(axis=1))
+    return (length * signs[:, 0]).astype(np.int64)
+
+
+def flow_features(df, windows=WINDOWS, recent_days=RECENT_DAYS):
+    """
+    종목별 순매수 집계 (전 종목 × 거래일 행렬 1번 계산)
+    거래일 축은 종목마다 자기 날짜 기준 (마지막 열 = 종목별 최신일)
+    → 다른 종목에만 새 날짜가 생겨도 창이 밀리거나 0 인 날이 끼지 않음 (이력이 창보다 짧으면 0 채움)
+
+    Returns:
+    - DataFrame (index symbol):
+      as_of: 종목별 최신일
+      foreign_recent / institutional_recent: 최근 recent_days 일 list (최신일 먼저)
+      foreign_sum_{w} / institutional_sum_{w}: 최근 w 거래일 합계
+      foreign_streak / institutional_streak: 연속 순매수(+)/순매도(-) 일수
+    """
+    if df.empty:
+        return pd.DataFrame()
+
+    df = df.sort_values(['symbol', 'date'])
+    row_codes, symbols = pd.factorize(df['symbol'], sort=True)
+    # 종목별 최신일부터 0, 1, 2, ... → 오른쪽 정렬 열 번호
+    age = df.groupby('symbol', sort=False).cumcount(ascending=False).to_numpy()
+    n_days = int(age.max()) + 1
+    col_codes = n_days - 1 - age
+
+    out = pd.DataFrame(index=pd.Index(symbols, name='symbol'))
+    out['as_of'] = df.groupby('symbol')['date'].max().reindex(symbols).to_numpy()
+    for field in ('foreign', 'institutional'):
+        matrix = np.zeros((len(symbols), n_days), dtype=np.int64)
+        matrix[row_codes, col_codes] = df[f'{field}_net'].to_numpy(dtype=np.int64)
+
+        cumsum = np.concatenate([np.zeros((len(symbols), 1), dtype=np.int64), matrix.cumsum(axis=1)], axis=1)
+        for w in windows:
+            out[f'{field}_sum_{w}'] = cumsum[:, -1] - cumsum[:, -1 - min(w, n_days)]
+        out[f'{field}_streak'] = _streak(matrix)
+
+        recent = matrix[:, ::-1][:, :recent_days]
+        if recent.shape[1] < recent_days:
+            recent = np.pad(recent, ((0, 0), (0, recent_days - recent.shape[1])))
+        out[f'{field}_recent'] = recent.tolist()
+
+    out.attrs['latest_date'] = df['date'].max()
+    return out
+
+
+if __name__ == '__main__':
+    df = load()
+    features = flow_features(df)
+    if features.empty:
+        print("⚠️ 순매수 이력 없음")
+    else:
+        print(f"✅ 순매수 이력: {df['symbol'].nunique()}종목 / {df['date'].nunique()}거래일 / {len(df)}행 "
+              f"(최신 {features.attrs['latest_date']:%Y-%m-%d})")
+        print(features.drop(columns=['foreign_recent', 'institutional_recent']).head(10).to_string())
@@ -0,0 +1,130 @@
+import os
+import json
+import zlib
+from datetime import datetime, timedelta
+from functools import lru_cache
+import numpy as np
+
+try:
+    import holidays
+    _KR_HOLIDAYS = holidays.KR()
+except ImportError:
+    # check_holiday.py 와 같은 공휴일 목록, 패키지가 없으면 주말만 제외
+    _KR_HOLIDAYS = None
+
+DATA_DIR = os.getenv('DATA_DIR', './data')
+
+# 종목별 필드 갱신 시점 저장소 + 크롤링 페이지 계획
+# data/meta/field_freshness.json → {종목코드: {필드: {'date': 'YYYYMMDD', 'value': 값}}}
+#
+# 필드마다 TTL(거래일 기준 일수)과 해당 페이지가 있고, TTL 이 지난 필드가 있는 페이지만 요청
+# 업종은 1년에 몇 번, EPS 는 분기마다 바뀌므로 대부분의 종목은 매일 frgn.nhn(순매수)만 필요
+# TTL 은 종목마다 75~100% 사이로 분산 (같은 날 수집한 종목이 같은 날 한꺼번에 만료되지 않게)
+FRESHNESS_PATH = os.path.join(DATA_DIR, 'meta', 'field_freshness.json')
+
+FIELD_POLICY = {
+    'sector':    {'page': 'main', 'ttl_days': int(os.getenv('FIELD_TTL_SECTOR', '30'))},     # 업종명
+    'valuation': {'page': 'main', 'ttl_days': int(os.getenv('FIELD_TTL_VALUATION', '7'))},   # PER/EPS/PBR (리스트에 없을 때)
+    'ownership': {'page': 'frgn', 'ttl_days': int(os.getenv('FIELD_TTL_OWNERSHIP', '3'))},   # 외국인보유율 (리스트에 없을 때)
+    'flow':      {'page': 'frgn', 'ttl_days': 0},                                            # 외국인/기관 순매수 (매일)
+}
+PAGES = ('main', 'frgn')
+
+
+@lru_cache(maxsize=4096)
+def _days_between(older, newer):
+    """older 다음 날 ~ newer 사이 거래일 수 (주말 / 공휴일 제외)"""
+    start = datetime.strptime(older, '%Y%m%d').date() + timedelta(days=1)
+    end = datetime.strptime(newer, '%Y%m%d').date() + timedelta(days=1)
+    if end <= start:
+        return 0
+    closed = list(_KR_HOLIDAYS[start:end]) if _KR_HOLIDAYS is not None else []
+    return int(np.busday_count(start, end, holidays=closed))
+
+
+def _effective_ttl(code, ttl_days):
+    spread = (zlib.crc32(code.encode('utf-8')) % 1000) / 1000
+    return int(ttl_days * (0.75 + 0.25 * spread))
+
+
+class FreshnessStore:
+    """종목 × 필드 마지막 갱신 거래일 / 값"""
+
+    def __init__(self, path=FRESHNESS_PATH):
+        self.path = path
+        self.fields = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.fields = json.load(f)
+            except Exception as e:
+                print(f"⚠️ 필드 갱신 기록 로드 실패: {e} → 전체 페이지 크롤링")
+
+    def is_fresh(self, code, field, today):
+        entry = self.fields.get(code, {}).get(field)
+        ttl_days = FIELD_POLICY[field]['ttl_days']
+        if entry is None or ttl_days <= 0:
+            return False
+        return _days_between(entry['date'], today) < _effective_ttl(code, ttl_days)
+
+    def value(self, code, field):
+        entry = self.fields.get(code, {}).get(field)
+        return entry['value'] if entry else None
+
+    def update(self, code, field, value, today):
+        self.fields.setdefault(code, {})[field] = {'date': today, 'value': value}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.fields, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def plan_pages(store, code, today, satisfied=()):
+    """
+    종목 1개에 필요한 페이지
+    satisfied: 시가총액 리스트 / 투자자 순위 등 다른 경로로 이미 받은 필드
+
+    Returns:
+    - set: {'main', 'frgn'} 의 부분집합 (빈 set 이면 요청 없음)
+    """
+    pages = set()
+    for field, policy in FIELD_POLICY.items():
+        if field in satisfied or policy['page'] in pages:
+            continue
+        if not store.is_fresh(code, field, today):
+            pages.add(policy['page'])
+    return pages
+
+
+def record_result(store, code, data, today):
+    """실제로 받은 페이지의 필드만 갱신 시점 기록 (값이 없으면 다음 날 다시 시도)"""
+    pages = set(data.get('pages') or ())
+    if 'main' in pages:
+        if data['sector'] not in (None, 'N/A'):
+            store.update(code, 'sector', data['sector'], today)
+        if any(data[key] is not None for key in ('per', 'eps', 'pbr')):
+            store.update(code, 'valuation', {key: data[key] for key in ('per', 'eps', 'pbr')}, today)
+    if 'frgn' in pages:
+        if data['foreign_ownership'] is not None:
+            store.update(code, 'ownership', data['foreign_ownership'], today)
+        if data['foreign_dates'][0] != 'N/A':
+            store.update(code, 'flow', None, today)
+
+
+def fill_missing(store, code, data):
+    """요청하지 않은(또는 실패한) 페이지의 필드를 저장된 값으로 채움"""
+    pages = set(data.get('pages') or ())
+    if 'main' not in pages:
+        sector = store.value(code, 'sector')
+        if sector:
+            data['sector'] = sector
+        valuation = store.value(code, 'valuation') or {}
+        for key in ('per', 'eps', 'pbr'):
+            if data[key] is None:
+                data[key] = valuation.get(key)
+    if 'frgn' not in pages and data['foreign_ownership'] is None:
+        data['foreign_ownership'] = store.value(code, 'ownership')
+    return data
@@ -0,0 +1,80 @@
+import os
+import json
+import threading
+
+DATA_DIR = os.getenv('DATA_DIR', './data')
+
+# 종목 단위 작업 완료 기록 (append-only JSON Lines, 1줄 기록마다 fsync)
+# data/journal/{작업명}_{거래일}.jsonl → {"key": "KOSPI:005930", "payload": {...}}
+# 중간에 죽어도 --resume 으로 다시 실행하면 완료된 종목은 건너뜀
+JOURNAL_DIR = os.path.join(DATA_DIR, 'journal')
+
+
+class IngestJournal:
+    """
+    거래일별 작업 저널
+    - record(key, payload) → 완료 1건 기록 (스레드 안전, 디스크 flush 후 반환)
+    - done(key) / entries → 이미 완료된 작업 조회
+    """
+
+    def __init__(self, name, trading_date, resume=False, journal_dir=JOURNAL_DIR):
+        os.makedirs(journal_dir, exist_ok=True)
+        self.path = os.path.join(journal_dir, f"{name}_{trading_date}.jsonl")
+        self._lock = threading.Lock()
+
+        if not resume and os.path.exists(self.path):
+            os.remove(self.path)
+
+        self.entries = self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        # 끊긴 마지막 줄 뒤에 이어 쓰지 않도록 줄바꿈 보정
+        if self._file.tell() > 0:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._file.write('\n')
+
+    def _load(self):
+        """기존 저널 읽기 (마지막 줄이 기록 도중 끊겼으면 무시)"""
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[entry['key']] = entry.get('payload')
+        return entries
+
+    def done(self, key):
+        return key in self.entries
+
+    def record(self, key, payload=None):
+        line = json.dumps({'key': key, 'payload': payload}, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.entries[key] = payload
+
+    def record_many(self, items):
+        """여러 건 기록 (fsync 1번) — items: [(key, payload), ...]"""
+        lines = ''.join(json.dumps({'key': key, 'payload': payload}, ensure_ascii=False) + '\n' for key, payload in items)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            for key, payload in items:
+                self.entries[key] = payload
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
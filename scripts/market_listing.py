@@ -0,0 +1,219 @@
+import re
+import threading
+import numpy as np
+import pandas as pd
+from bs4 import BeautifulSoup, SoupStrainer
+
+from urllib.parse import urlencode, urlsplit
+
+import naver_http
+import naver_cache
+from downloader import run_concurrent
+
+LISTING_URL = naver_http.FINANCE_BASE + '/sise/sise_market_sum.naver?sosok={sosok}&page={page}'
+MARKET_SOSOK = {'KOSPI': 0, 'KOSDAQ': 1}
+
+# 시가총액 페이지 표시 항목 선택 (최대 6개, 현재가/전일비/등락률은 항상 표시)
+# 세션 쿠키에 저장되므로 프로세스당 1번 요청하면 이후 모든 페이지에 적용
+LISTING_FIELDS = ('market_sum', 'per', 'eps', 'pbr', 'frgn_rate', 'quant')
+FIELD_SUBMIT_URL = naver_http.FINANCE_BASE + '/sise/field_submit.naver?' + urlencode(
+    [('menu', 'market_sum'), ('returnUrl', naver_http.FINANCE_BASE + '/sise/sise_market_sum.naver')]
+    + [('fieldIds', field) for field in LISTING_FIELDS]
+)
+
+LISTING_COLUMNS = ['Code', 'Name', 'MarketCap', 'Close', 'Market', 'PER', 'EPS', 'PBR', 'ForeignRate']
+VALUATION_COLUMNS = ['PER', 'EPS', 'PBR', 'ForeignRate']
+
+# 헤더 텍스트 → 열 (선택 항목에 따라 열 위치가 바뀌므로 헤더로 찾음)
+HEADER_COLUMNS = {
+    '현재가': 'Close',
+    '시가총액': 'MarketCap',
+    'PER': 'PER',
+    'EPS': 'EPS',
+    'PBR': 'PBR',
+    '외국인비율': 'ForeignRate',
+}
+# 헤더를 못 찾았을 때 기본 화면 열 위치
+DEFAULT_POSITIONS = {'Close': 2, 'MarketCap': 6}
+
+_fields_selected = False
+_fields_lock = threading.Lock()
+
+# 맨뒤 링크: <td class="pgRR"><a href="/sise/sise_market_sum.naver?sosok=0&amp;page=48">
+_LAST_PAGE_RE = re.compile(r'class="pgRR".*?page=(\d+)', re.S)
+
+# table.type_2 만 파싱 (페이지 나머지 영역은 트리 생성 안 함)
+_TABLE_STRAINER = SoupStrainer('table', class_='type_2')
+
+
+def _to_int(text):
+    text = text.strip().replace(',', '')
+    return int(text) if text.isdigit() else 0
+
+
+def _to_float(text):
+    try:
+        return float(text.strip().replace(',', ''))
+    except ValueError:
+        return np.nan
+
+
+def _column_positions(table):
+    """헤더 행 → {열 이름: td 위치} (헤더 없으면 기본 화면 위치)"""
+    for header in table.find_all('tr'):
+        ths = header.find_all('th')
+        if not ths:
+            continue
+        positions = {}
+        for i, th in enumerate(ths):
+            text = re.sub(r'\s+', '', th.text)
+            for label, column in HEADER_COLUMNS.items():
+                if text.startswith(label):
+                    positions.setdefault(column, i)
+        if positions:
+            return positions
+    return dict(DEFAULT_POSITIONS)
+
+
+def parse_listing_page(html):
+    """
+    시가총액 페이지 1장 파싱 (열은 헤더 텍스트로 매핑)
+
+    Returns:
+    - (rows, last_page)
+      rows: [(code, name, market_cap(억원), close, per, eps, pbr, foreign_rate), ...]
+            (화면에 없는 항목은 NaN)
+      last_page: 맨뒤 페이지 번호 (없으면 None)
+    """
+    match = _LAST_PAGE_RE.search(html)
+    last_page = int(match.group(1)) if match else None
+
+    rows = []
+    table = BeautifulSoup(html, 'html.parser', parse_only=_TABLE_STRAINER)
+    positions = _column_positions(table)
+
+    def cell(tds, column, parse):
+        i = positions.get(column)
+        if i is None or i >= len(tds):
+            return parse('')
+        return parse(tds[i].text)
+
+    for row in table.find_all('tr'):
+        link = row.find('a', class_='tltle')
+        if link is None:
+            continue
+
+        href = link.get('href', '')
+        if 'code=' not in href:
+            continue
+
+        code = href.split('code=')[-1]
+        if not (len(code) == 6 and code.isdigit()):
+            continue
+
+        tds = row.find_all('td')
+        rows.append((
+            code, link.text.strip(),
+            cell(tds, 'MarketCap', _to_int), cell(tds, 'Close', _to_int),
+            cell(tds, 'PER', _to_float), cell(tds, 'EPS', _to_float),
+            cell(tds, 'PBR', _to_float), cell(tds, 'ForeignRate', _to_float),
+        ))
+
+    return rows, last_page
+
+
+def select_fields():
+    """시가총액 페이지 표시 항목 선택 (프로세스당 1번, 실패해도 기본 화면으로 계속)"""
+    global _fields_selected
+    with _fields_lock:
+        if _fields_selected:
+            return
+        _fields_selected = True
+        try:
+            naver_http.get(FIELD_SUBMIT_URL).raise_for_status()
+            # 선택 항목에 따라 표가 달라지므로 캐시 키 구분 (기본 화면 응답과 섞이지 않게)
+            naver_cache.set_variant(urlsplit(LISTING_URL).path, ','.join(LISTING_FIELDS))
+        except Exception as e:
+            print(f"⚠️ 시가총액 페이지 항목 선택 실패: {e} → 기본 항목으로 수집 (PER/EPS/PBR 일부 없음)")
+
+
+def _fetch_page(sosok, page):
+    res = naver_http.get(LISTING_URL.format(sosok=sosok, page=page))
+    res.raise_for_status()
+    res.encoding = 'euc-kr'
+    return parse_listing_page(res.text)
+
+
+def fetch_market_listing(market, max_in_flight=None):
+    """
+    네이버 금융 시가총액 페이지에서 시장 전체 종목 수집
+    1페이지에서 last_page 확인 후 나머지 페이지는 동시 요청 (공용 rate limit 적용)
+
+    Returns:
+    - DataFrame: Code(str), Name(str), MarketCap(int64, 억원), Close(int64), Market(str),
+                 PER, EPS, PBR, ForeignRate(float64, 외국인비율 %, 없으면 NaN)
+      시가총액 순(페이지 순서) 유지, 종목코드 중복 제거
+      1페이지 조회 실패 시 빈 DataFrame
+    """
+    sosok = MARKET_SOSOK[market]
+    select_fields()
+
+    try:
+        first_rows, last_page = _fetch_page(sosok, 1)
+    except Exception as e:
+        print(f"🚨 {market} 시가총액 1페이지 조회 실패: {e}")
+        return _empty_listing()
+
+    last_page = last_page or 1
+    pages = {1: first_rows}
+
+    remaining = list(range(2, last_page + 1))
+    if remaining:
+        results, _, _ = run_concurrent(
+            remaining,
+            lambda page: _fetch_page(sosok, page)[0],
+            max_in_flight=max_in_flight,
+            label=f'{market} 페이지 ', progress_every=max(len(remaining), 1)
+        )
+        # 실패한 페이지는 한 번 더 순차 재시도
+        for page in remaining:
+            rows = results.get(page)
+            if not rows:
+                try:
+                    rows = _fetch_page(sosok, page)[0]
+                except Exception as e:
+                    print(f"⚠️ {market} {page}페이지 재시도 실패: {e}")
+                    rows = []
+            pages[page] = rows
+
+    all_rows = [row for page in sorted(pages) for row in pages[page]]
+    if not all_rows:
+        return _empty_listing()
+
+    codes, names, caps, closes, pers, epss, pbrs, foreign_rates = zip(*all_rows)
+    df = pd.DataFrame({
+        'Code': pd.Series(codes, dtype=object),
+        'Name': pd.Series(names, dtype=object),
+        'MarketCap': np.asarray(caps, dtype=np.int64),
+        'Close': np.asarray(closes, dtype=np.int64),
+        'Market': market,
+        'PER': np.asarray(pers, dtype=np.float64),
+        'EPS': np.asarray(epss, dtype=np.float64),
+        'PBR': np.asarray(pbrs, dtype=np.float64),
+        'ForeignRate': np.asarray(foreign_rates, dtype=np.float64),
+    })
+    df = df.drop_duplicates('Code').reset_index(drop=True)
+
+    print(f"✅ {market} 전체 수집 완료: {len(df)}개 ({last_page}페이지)")
+    return df
+
+
+def _empty_listing():
+    return pd.DataFrame({
+        'Code': pd.Series(dtype=object),
+        'Name': pd.Series(dtype=object),
+        'MarketCap': pd.Series(dtype=np.int64),
+        'Close': pd.Series(dtype=np.int64),
+        'Market': pd.Series(dtype=object),
+        **{column: pd.Series(dtype=np.float64) for column in VALUATION_COLUMNS},
+    })
@@ -0,0 +1,266 @@
+import os
+import json
+import gzip
+import hashlib
+import threading
+from datetime import datetime
+import requests
+from requests.structures import CaseInsensitiveDict
+from urllib.parse import urlsplit
+
+import naver_record
+
+# 천천히 바뀌는 네이버 페이지 디스크 캐시 (naver_http.get 이 자동 사용)
+# NAVER_CACHE     → '0' 이면 사용 안 함
+# NAVER_CACHE_DIR → 저장 위치 (기본 data/cache/naver)
+#
+# keys/{sha1(path?query)}.json        → url, sha256, status, content_type, 저장 시각, 거래일
+# objects/{sha256[:2]}/{sha256}.gz    → 응답 본문 (내용 주소 방식, 같은 본문은 1번만 저장)
+#
+# 캐시 항목은 TTL 이내 + 같은 거래일일 때만 사용 (다음 거래일이 되면 전부 만료)
+# 장중에 값이 바뀌는 엔드포인트(INTRADAY_ENDPOINTS)는 기준 거래일 장 마감 후 받은 응답만 저장 / 사용
+NAVER_CACHE = os.getenv('NAVER_CACHE', '1') != '0'
+CACHE_DIR = os.getenv('NAVER_CACHE_DIR', os.path.join(os.getenv('DATA_DIR', './data'), 'cache', 'naver'))
+
+# 엔드포인트별 TTL (초), 목록에 없는 엔드포인트(siseJson 등)는 캐시 안 함
+ENDPOINT_TTLS = {
+    '/item/main.nhn': 12 * 3600,               # PER/EPS/PBR, 업종명, 현재가/시가총액 (장 마감 후만)
+    '/item/main.naver': 12 * 3600,             # 섹터 ETF 1개월 수익률
+    '/item/frgn.nhn': 6 * 3600,                # 외국인/기관 순매매 (장 마감 후만)
+    '/sise/sise_market_sum.naver': 6 * 3600,   # 시가총액 리스트 (장 마감 후만)
+}
+
+# 장중 시세 / 잠정 순매매가 담긴 엔드포인트 → 장 마감 전에는 캐시 없이 매번 요청
+INTRADAY_ENDPOINTS = {'/item/main.nhn', '/item/frgn.nhn', '/sise/sise_market_sum.naver'}
+# 장 마감 기준 시각 (외국인/기관 순매매 확정 이후)
+MARKET_CLOSE = os.getenv('NAVER_CACHE_MARKET_CLOSE', '18:00')
+
+stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'stores': 0, 'expired': 0}
+
+_lock = threading.Lock()
+_inflight = {}
+# 같은 URL 이라도 세션 상태(쿠키)에 따라 내용이 다른 엔드포인트 → {path: 캐시 키에 붙일 값} (set_variant)
+_variants = {}
+_pruned = False
+
+
+class _Pending:
+    def __init__(self):
+        self.event = threading.Event()
+        self.entry = None
+        self.body = None
+        self.error = None
+
+
+def ttl_for(url):
+    """URL 의 캐시 TTL (초), 캐시 대상이 아니거나 장 마감 전 장중 엔드포인트면 0"""
+    if not NAVER_CACHE:
+        return 0
+    ttl = ENDPOINT_TTLS.get(urlsplit(url).path, 0)
+    if ttl and datetime.now().timestamp() < _valid_from(url):
+        return 0
+    return ttl
+
+
+def set_variant(path, variant):
+    """
+    path 응답 내용을 바꾸는 세션 상태를 캐시 키에 포함
+    (예: 시가총액 리스트는 field_submit 쿠키로 고른 컬럼에 따라 표가 달라짐 → market_listing.select_fields)
+    """
+    with _lock:
+        _variants[path] = variant
+
+
+def _cache_key(url):
+    key = naver_record.record_key(url)
+    variant = _variants.get(urlsplit(url).path)
+    return f"{key}#{variant}" if variant else key
+
+
+def _trading_date():
+    import universe
+    return universe.current_trading_date()
+
+
+def market_close(trading_date):
+    """거래일 'YYYYMMDD' 의 장 마감 기준 시각 (datetime, MARKET_CLOSE)"""
+    return datetime.strptime(trading_date + MARKET_CLOSE, '%Y%m%d%H:%M')
+
+
+def _valid_from(url):
+    """캐시 항목이 유효해지는 시각 (timestamp): 장중 엔드포인트는 기준 거래일 장 마감, 나머지는 0"""
+    if urlsplit(url).path not in INTRADAY_ENDPOINTS:
+        return 0.0
+    return market_close(_trading_date()).timestamp()
+
+
+def _key_path(key):
+    return os.path.join(CACHE_DIR, 'keys', hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+
+def _object_path(digest):
+    return os.path.join(CACHE_DIR, 'objects', digest[:2], digest + '.gz')
+
+
+def _count(name):
+    with _lock:
+        stats[name] += 1
+
+
+def _build_response(url, entry, body):
+    """저장된 본문 → requests.Response (호출하는 쪽은 실제 응답과 구분 없이 사용)"""
+    response = requests.Response()
+    response.status_code = entry['status']
+    response._content = body
+    response.headers = CaseInsensitiveDict({'Content-Type': entry['content_type'], 'X-Naver-Cache': 'hit'})
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.url = url
+    response.reason = 'OK'
+    return response
+
+
+def _load(key, ttl):
+    path = _key_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        age = datetime.now().timestamp() - entry['stored_at']
+        if (entry['trading_date'] != _trading_date() or age > ttl
+                or entry['stored_at'] < _valid_from(entry['url'])):
+            _count('expired')
+            return None
+        with gzip.open(_object_path(entry['sha256']), 'rb') as f:
+            return entry, f.read()
+    except Exception:
+        return None
+
+
+def _store(key, url, response):
+    body = response.content
+    digest = hashlib.sha256(body).hexdigest()
+    object_path = _object_path(digest)
+    tmp_suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+
+    if not os.path.exists(object_path):
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        with gzip.open(object_path + tmp_suffix, 'wb') as f:
+            f.write(body)
+        os.replace(object_path + tmp_suffix, object_path)
+
+    entry = {
+        'url': url,
+        'sha256': digest,
+        'status': response.status_code,
+        'content_type': response.headers.get('Content-Type', 'text/html'),
+        'stored_at': datetime.now().timestamp(),
+        'trading_date': _trading_date(),
+    }
+    key_path = _key_path(key)
+    os.makedirs(os.path.dirname(key_path), exist_ok=True)
+    with open(key_path + tmp_suffix, 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+    os.replace(key_path + tmp_suffix, key_path)
+    _count('stores')
+    return entry, body
+
+
+def fetch(url, loader, is_cacheable):
+    """
+    캐시 조회 → 없으면 loader() 로 실제 요청 후 저장
+    - 같은 URL 을 여러 스레드가 동시에 요청하면 1번만 요청하고 나머지는 결과 공유
+    - is_cacheable(response) 가 False 인 응답(429/5xx 등)은 저장 안 함
+    """
+    ttl = ttl_for(url)
+    key = _cache_key(url)
+    _prune_once()
+
+    cached = _load(key, ttl)
+    if cached is not None:
+        _count('hits')
+        return _build_response(url, *cached)
+
+    with _lock:
+        pending = _inflight.get(key)
+        owner = pending is None
+        if owner:
+            pending = _inflight[key] = _Pending()
+
+    if not owner:
+        pending.event.wait()
+        _count('coalesced')
+        if pending.error is not None:
+            raise pending.error
+        return _build_response(url, pending.entry, pending.body)
+
+    _count('misses')
+    try:
+        response = loader()
+        if is_cacheable(response):
+            pending.entry, pending.body = _store(key, url, response)
+        else:
+            pending.entry = {'status': response.status_code,
+                             'content_type': response.headers.get('Content-Type', 'text/html')}
+            pending.body = response.content
+        return response
+    except Exception as e:
+        pending.error = e
+        raise
+    finally:
+        with _lock:
+            del _inflight[key]
+        pending.event.set()
+
+
+def _prune_once():
+    """프로세스 첫 사용 시 지난 거래일 항목 / 참조 없는 본문 삭제"""
+    global _pruned
+    if _pruned:
+        return
+    with _lock:
+        if _pruned:
+            return
+        _pruned = True
+    try:
+        prune()
+    except Exception as e:
+        print(f"⚠️ 네이버 캐시 정리 실패: {e}")
+
+
+def prune():
+    keys_dir = os.path.join(CACHE_DIR, 'keys')
+    objects_dir = os.path.join(CACHE_DIR, 'objects')
+    if not os.path.isdir(keys_dir):
+        return 0
+
+    today = _trading_date()
+    referenced = set()
+    removed = 0
+    for file in os.listdir(keys_dir):
+        path = os.path.join(keys_dir, file)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if entry.get('trading_date') == today:
+                referenced.add(entry['sha256'])
+                continue
+        except Exception:
+            pass
+        os.remove(path)
+        removed += 1
+
+    if removed and os.path.isdir(objects_dir):
+        for sub in os.listdir(objects_dir):
+            sub_dir = os.path.join(objects_dir, sub)
+            for file in os.listdir(sub_dir):
+                if file.endswith('.gz') and file[:-3] not in referenced:
+                    os.remove(os.path.join(sub_dir, file))
+    return removed
+
+
+def describe():
+    total = stats['hits'] + stats['misses'] + stats['coalesced']
+    rate = (stats['hits'] + stats['coalesced']) / total * 100 if total else 0.0
+    return (f"캐시 적중 {stats['hits']} / 동시요청 병합 {stats['coalesced']} / 미스 {stats['misses']}"
+            f" (적중률 {rate:.1f}%, 만료 {stats['expired']}, 저장 {stats['stores']})")
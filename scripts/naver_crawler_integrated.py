@@ -1,19 +1,18 @@
 import datetime
 import pandas as pd
 import os
-import requests
-from bs4 import BeautifulSoup
-import time
-from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import threading
-import re
+import naver_cache
+import sector_trend
+import universe
+import market_listing
+import flow_store
+import freshness
+from ingest_journal import IngestJournal
+from result_sink import ResultSink
+from downloader import get_controller, NAVER_MAX_IN_FLIGHT
+from stock_crawler import crawl_stocks, empty_result
 import json
-
-today = datetime.date.today()
-if today.weekday() >= 5:
-    days_back = today.weekday() - 4
-    today -= datetime.timedelta(days=days_back)
+import sys
 
 DATA_DIR = os.getenv('DATA_DIR', './data')
 data_dir = DATA_DIR
@@ -22,6 +21,18 @@ os.makedirs(data_dir, exist_ok=True)
 SHORT_FOLDER = os.path.join(data_dir, 'short_term_results')
 MID_FOLDER = os.path.join(data_dir, 'screener_results')
 
+PER_EPS_PATH = os.path.join(data_dir, 'per_eps_all.csv')
+TRADING_PATH = os.path.join(data_dir, 'foreign_institutional_net_buy_daily_all.csv')
+SECTOR_PATH = os.path.join(data_dir, 'kr_stock_sectors.csv')
+
+
+def trading_day():
+    """크롤링 기준 날짜 (주말이면 직전 금요일)"""
+    today = datetime.date.today()
+    if today.weekday() >= 5:
+        today -= datetime.timedelta(days=today.weekday() - 4)
+    return today
+
 # ============================================
 # ETF 판별 함수
 # ============================================
@@ -45,180 +56,6 @@ def is_etf(name):
     return False
 
 
-def crawl_naver_stock_data(code):
-    """
-    네이버 증권에서 모든 필요한 데이터 크롤링
-
-    Returns:
-    - dict: {
-        'per': float,
-        'eps': float,
-        'pbr': float,
-        'sector': str,
-        'foreign_ownership': float,
-        'foreign_net_buy': list (5일치),
-        'institutional_net_buy': list (5일치),
-        'foreign_dates': list (5일치)
-      }
-    """
-    result = {
-        'per': None,
-        'eps': None,
-        'pbr': None,
-        'sector': 'N/A',
-        'foreign_ownership': None,
-        'foreign_net_buy': [0, 0, 0, 0, 0],
-        'institutional_net_buy': [0, 0, 0, 0, 0],
-        'foreign_dates': ['N/A', 'N/A', 'N/A', 'N/A', 'N/A']
-    }
-
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-
-    # ============================================
-    # 1. 메인 페이지: PER, EPS, PBR, 업종
-    # ============================================
-    try:
-        main_url = f"https://finance.naver.com/item/main.nhn?code={code}"
-        response = requests.get(main_url, headers=headers, timeout=5)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # PER
-        per_tags = soup.find_all('em', id='_per')
-        if per_tags:
-            try:
-                result['per'] = float(per_tags[0].text.strip().replace(',', ''))
-            except:
-                pass
-
-        # EPS
-        eps_tags = soup.find_all('em', id='_eps')
-        if eps_tags:
-            try:
-                result['eps'] = float(eps_tags[0].text.strip().replace(',', ''))
-            except:
-                pass
-
-        # PBR
-        pbr_tags = soup.find_all('em', id='_pbr')
-        if pbr_tags:
-            try:
-                result['pbr'] = float(pbr_tags[0].text.strip().replace(',', ''))
-            except:
-                pass
-
-        # 업종 추출
-        try:
-            text = soup.get_text()
-            match = re.search(r'업종명\s*[:：]\s*([^\|｜]+)', text)
-            if match:
-                sector_text = match.group(1).strip()
-                sector_text = re.split(r'재무정보|분기|기준', sector_text)[0].strip()
-                sector_text = re.sub(r'[\d\s.]+', '', sector_text)
-                if sector_text and len(sector_text) > 0:
-                    result['sector'] = sector_text
-        except:
-            pass
-
-    except Exception as e:
-        pass
-
-    # ============================================
-    # 2. 외국인 페이지: 순매수거래량 (최근 5일) + 보유율
-    # ============================================
-    try:
-        foreign_url = f"https://finance.naver.com/item/frgn.nhn?code={code}"
-        response = requests.get(foreign_url, headers=headers, timeout=5)
-        response.raise_for_status()
-
-        tables = pd.read_html(response.text)
-        df_foreign = None
-
-        for table in tables:
-            if isinstance(table.columns, pd.MultiIndex):
-                if '날짜' in [col[0] for col in table.columns]:
-                    has_foreign = False
-                    for col in table.columns:
-                        if '외국인' in str(col):
-                            has_foreign = True
-                            break
-
-                    if has_foreign:
-                        df_foreign = table.copy()
-                        new_columns = []
-                        for col in df_foreign.columns:
-                            if col[0] == '날짜':
-                                new_columns.append('날짜')
-                            elif col[0] == '외국인' and '순매매량' in str(col):
-                                new_columns.append('순매수거래량')
-                            elif col[0] == '외국인' and '보유율' in str(col):
-                                new_columns.append('외국인보유율')
-                            elif col[0] == '기관' and '순매매량' in str(col):
-                                new_columns.append('기관순매매량')
-                            else:
-                                new_columns.append(col[0] if col[0] == col[1] else f"{col[0]}_{col[1]}")
-                        df_foreign.columns = new_columns
-                        break
-            else:
-                if '날짜' in table.columns:
-                    for col in table.columns:
-                        if '순매매량' in col or '순매수량' in col:
-                            df_foreign = table.copy()
-                            break
-                if df_foreign is not None:
-                    break
-
-        if df_foreign is not None and not df_foreign.empty:
-            df_foreign = df_foreign.dropna(subset=['날짜'])
-            df_foreign['날짜'] = df_foreign['날짜'].astype(str).str.replace('.', '').str.replace('-', '').str.strip()
-
-            if '순매수거래량' in df_foreign.columns:
-                df_foreign['순매수거래량'] = pd.to_numeric(
-                    df_foreign['순매수거래량'].astype(str).str.replace(',', ''),
-                    errors='coerce'
-                ).fillna(0).astype(int)
-
-                recent_rows = df_foreign.head(5)
-                result['foreign_net_buy'] = []
-                result['foreign_dates'] = []
-
-                for _, row in recent_rows.iterrows():
-                    result['foreign_net_buy'].append(int(row['순매수거래량']))
-                    result['foreign_dates'].append(row['날짜'])
-
-                while len(result['foreign_net_buy']) < 5:
-                    result['foreign_net_buy'].append(0)
-                    result['foreign_dates'].append('N/A')
-
-            if '기관순매매량' in df_foreign.columns:
-                df_foreign['기관순매매량'] = pd.to_numeric(
-                    df_foreign['기관순매매량'].astype(str).str.replace(',', ''),
-                    errors='coerce'
-                ).fillna(0).astype(int)
-
-                recent_inst = df_foreign['기관순매매량'].head(5).tolist()
-                result['institutional_net_buy'] = recent_inst
-
-                while len(result['institutional_net_buy']) < 5:
-                    result['institutional_net_buy'].append(0)
-
-            if '외국인보유율' in df_foreign.columns:
-                try:
-                    latest_rate = df_foreign['외국인보유율'].iloc[0]
-                    match = re.search(r'([\d,.]+)', str(latest_rate))
-                    if match:
-                        result['foreign_ownership'] = float(match.group(1).replace(',', ''))
-                except:
-                    result['foreign_ownership'] = None
-
-    except Exception as e:
-        pass
-
-    return result
-
-
 # ============================================
 # 백테스트 누락 종목 추가 크롤링 함수
 # ============================================
@@ -251,9 +88,9 @@ def get_backtest_missing_codes(all_codes_set):
     return missing
 
 
-def crawl_missing_and_append(missing_codes, per_eps_results, foreign_results, sector_results, df_all):
+def crawl_missing_and_append(missing_codes, sink, today):
     """
-    누락 종목 크롤링 후 기존 결과 리스트에 추가
+    누락 종목 크롤링 후 결과 sink 에 추가
     종목명은 tickers_meta.json에서 조회
     """
     if not missing_codes:
@@ -281,251 +118,193 @@ def crawl_missing_and_append(missing_codes, per_eps_results, foreign_results, se
     else:
         print("⚠️ tickers_meta.json 없음 → 종목명 N/A로 처리")
 
-    def crawl_one_missing(code):
-        data = crawl_naver_stock_data(code)
-        time.sleep(0.2)
-        return code, data
+    def on_result(code, data):
+        name = meta_all.get(code, {}).get('name', 'N/A')
 
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = {executor.submit(crawl_one_missing, code): code for code in missing_codes}
+        # ETF 여부 확인 후 업종 덮어쓰기
+        sector_val = data['sector']
+        if is_etf(name):
+            sector_val = 'ETF'
 
-        for future in tqdm(as_completed(futures), total=len(futures), desc="누락 종목 크롤링"):
-            try:
-                code, data = future.result()
-            except Exception as e:
-                print(f"❌ 에러: {e}")
-                continue
+        sink.add('per_eps', {
+            '티커': code,
+            '종목명': name,
+            'PER': data['per'],
+            'EPS': data['eps'],
+            'PBR': data['pbr'],
+            '외국인보유율': data['foreign_ownership'],
+            '날짜': today.strftime('%Y%m%d')
+        })
 
-            name = meta_all.get(code, {}).get('name', 'N/A')
-
-            # ETF 여부 확인 후 업종 덮어쓰기
-            sector_val = data['sector']
-            if is_etf(name):
-                sector_val = 'ETF'
-
-            per_eps_results.append({
-                '티커': code,
-                '종목명': name,
-                'PER': data['per'] if data['per'] is not None else '-',
-                'EPS': data['eps'] if data['eps'] is not None else '-',
-                'PBR': data['pbr'] if data['pbr'] is not None else '-',
-                '외국인보유율': data['foreign_ownership'] if data['foreign_ownership'] is not None else '-',
-                '날짜': today.strftime('%Y%m%d')
-            })
-
-            sector_results.append({
-                '회사명': name,
-                '종목코드': code,
-                '업종': sector_val
-            })
-
-            for day_idx in range(5):
-                foreign_net_buy = data['foreign_net_buy'][day_idx] if day_idx < len(data['foreign_net_buy']) else 0
-                inst_net_buy = data['institutional_net_buy'][day_idx] if day_idx < len(data['institutional_net_buy']) else 0
-                date_str = data['foreign_dates'][day_idx] if day_idx < len(data['foreign_dates']) else 'N/A'
-
-                if date_str != 'N/A':
-                    foreign_results.append({
-                        '티커': code,
-                        '종목명': name,
-                        '날짜': date_str,
-                        '외국인순매수': foreign_net_buy,
-                        '기관순매수': inst_net_buy
-                    })
-
-            print(f"   ✅ {code} ({name}) 크롤링 완료 (PER: {data['per']}, 업종: {sector_val})")
+        sink.add('sector', {
+            '회사명': name,
+            '종목코드': code,
+            '업종': sector_val
+        })
 
-    print(f"✅ 누락 종목 추가 크롤링 완료!")
+        for day_idx in range(5):
+            foreign_net_buy = data['foreign_net_buy'][day_idx] if day_idx < len(data['foreign_net_buy']) else 0
+            inst_net_buy = data['institutional_net_buy'][day_idx] if day_idx < len(data['institutional_net_buy']) else 0
+            date_str = data['foreign_dates'][day_idx] if day_idx < len(data['foreign_dates']) else 'N/A'
 
+            if date_str != 'N/A':
+                sink.add('foreign', {
+                    '티커': code,
+                    '종목명': name,
+                    '날짜': date_str,
+                    '외국인순매수': foreign_net_buy,
+                    '기관순매수': inst_net_buy
+                })
 
-# ============================================
-# 메인 실행
-# ============================================
+        print(f"   ✅ {code} ({name}) 크롤링 완료 (PER: {data['per']}, 업종: {sector_val})")
+
+    crawl_stocks(missing_codes, on_result, desc="누락 종목 크롤링")
+    sink.flush()
+
+    print(f"✅ 누락 종목 추가 크롤링 완료!")
 
-print("="*60)
-print("📊 네이버 증권 통합 크롤링 시작")
-print("수집 항목: PER, EPS, PBR, 업종, 외국인 순매수(5일)")
-print("="*60)
 
 # ============================================
 # 1. 코스피 + 코스닥 전체 종목 조회
 # ============================================
-print("\n📋 KRX 전체 종목 리스트 조회 중 (네이버 금융)...")
-
-_headers = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-    'Referer': 'https://finance.naver.com/'
-}
 
-_kospi_stocks = []
-_kosdaq_stocks = []
-
-for _sosok in [0, 1]:
-    _market_name = 'KOSPI' if _sosok == 0 else 'KOSDAQ'
-    _target_list = _kospi_stocks if _sosok == 0 else _kosdaq_stocks
-    _page = 1
-
-    while True:
-        _url = f'https://finance.naver.com/sise/sise_market_sum.naver?sosok={_sosok}&page={_page}'
-        _res = requests.get(_url, headers=_headers, timeout=10)
-        _res.encoding = 'euc-kr'
-        _soup = BeautifulSoup(_res.text, 'html.parser')
-
-        _pager = _soup.find('td', class_='pgRR')
-        if _pager is None:
-            break
-        _last_page = int(_pager.find('a')['href'].split('page=')[-1])
-
-        _table = _soup.find('table', class_='type_2')
-        if _table is None:
-            break
-
-        for _row in _table.find_all('tr'):
-            _link = _row.find('a', class_='tltle')
-            if _link is None:
-                continue
-            _href = _link.get('href', '')
-            if 'code=' not in _href:
-                continue
-            _code = _href.split('code=')[-1]
-            _name = _link.text.strip()
-            _tds = _row.find_all('td')
-            _cap = 0
-            if len(_tds) >= 7:
-                try:
-                    _cap_text = _tds[6].text.strip().replace(',', '')
-                    _cap = int(_cap_text) if _cap_text.isdigit() else 0
-                except:
-                    _cap = 0
-            if _code and len(_code) == 6 and _code.isdigit():
-                _target_list.append({
-                    'Code': _code,
-                    'Name': _name,
-                    'Marcap': _cap,
-                    'Market': _market_name
-                })
+def load_crawl_universe(df_universe=None):
+    """
+    크롤링 대상 종목 (코스피 + 코스닥, ETF 제외)
 
-        print(f"  {_market_name} {_page}/{_last_page} 페이지 수집 중...")
+    Parameters:
+    - df_universe: universe.load_universe() 결과 (None 이면 스냅샷 로드/조회)
 
-        if _page >= _last_page:
-            break
-        _page += 1
-        time.sleep(0.3)
+    Returns:
+    - (df_all, {'KOSPI': 종목 수, 'KOSDAQ': 종목 수}), 조회 실패 시 (None, None)
+    """
+    print("\n📋 KRX 전체 종목 리스트 조회 중 (네이버 금융)...")
 
-    print(f"  ✅ {_market_name} 수집 완료: {len(_target_list)}개")
+    # fetch_data.py 가 오늘 저장한 종목 스냅샷 재사용 (없거나 지난 거래일이면 새로 조회)
+    if df_universe is None:
+        df_universe, _ = universe.load_universe()
+    df_universe = df_universe.rename(columns={'MarketCap': 'Marcap'})
+    df_kospi = df_universe[df_universe['Market'] == 'KOSPI'].reset_index(drop=True)
+    df_kosdaq = df_universe[df_universe['Market'] == 'KOSDAQ'].reset_index(drop=True)
 
-if not _kospi_stocks and not _kosdaq_stocks:
-    print("🚨 KRX 데이터 조회 실패")
-    exit()
+    if df_kospi.empty and df_kosdaq.empty:
+        print("🚨 KRX 데이터 조회 실패")
+        return None, None
 
-df_kospi = pd.DataFrame(_kospi_stocks)
-df_kospi['Marcap'] = pd.to_numeric(df_kospi['Marcap'], errors='coerce').fillna(0)
-df_kospi = df_kospi.drop_duplicates('Code').reset_index(drop=True)
+    # 코스피 + 코스닥 합친 전체 df (정렬/중복 제거용)
+    df_all = pd.concat([df_kospi, df_kosdaq], ignore_index=True).drop_duplicates('Code').reset_index(drop=True)
 
-df_kosdaq = pd.DataFrame(_kosdaq_stocks)
-df_kosdaq['Marcap'] = pd.to_numeric(df_kosdaq['Marcap'], errors='coerce').fillna(0)
-df_kosdaq = df_kosdaq.drop_duplicates('Code').reset_index(drop=True)
+    # ETF 필터링 (kr_stock_sectors.csv 있으면 적용)
+    etf_codes = universe.load_etf_codes()
+    if etf_codes:
+        before = len(df_all)
+        df_all = df_all[~df_all['Code'].isin(etf_codes)].reset_index(drop=True)
+        print(f"ℹ️ ETF 제외: {before}개 → {len(df_all)}개")
 
-# 코스피 + 코스닥 합친 전체 df (정렬/중복 제거용)
-df_all = pd.concat([df_kospi, df_kosdaq], ignore_index=True).drop_duplicates('Code').reset_index(drop=True)
+    print(f"\n✅ 전체 종목 조회 완료")
+    print(f"   KOSPI: {len(df_kospi)}개 / KOSDAQ: {len(df_kosdaq)}개 / 합계(ETF 제외): {len(df_all)}개")
+    return df_all, {'KOSPI': len(df_kospi), 'KOSDAQ': len(df_kosdaq)}
 
-# ============================================
-# ETF 필터링 (kr_stock_sectors.csv 있으면 적용)
-# ============================================
-def load_etf_codes():
-    """
-    kr_stock_sectors.csv 가 있으면 Sector == 'ETF' 인 종목코드 set 반환
-    없으면 빈 set 반환 (전체 수집)
-    """
-    sector_path = os.path.join(data_dir, 'kr_stock_sectors.csv')
-    if not os.path.exists(sector_path):
-        print("ℹ️ kr_stock_sectors.csv 없음 → ETF 필터 없이 전체 크롤링")
-        return set()
-    try:
-        df = pd.read_csv(sector_path, encoding='utf-8-sig', dtype={'종목코드': str})
-        df['종목코드'] = df['종목코드'].str.zfill(6)
-        etf_codes = set(df[df['Sector'] == 'ETF']['종목코드'].tolist())
-        print(f"ℹ️ kr_stock_sectors.csv 로드 완료 → ETF {len(etf_codes)}개 크롤링 제외 예정")
-        return etf_codes
-    except Exception as e:
-        print(f"⚠️ kr_stock_sectors.csv 로드 실패: {e} → ETF 필터 없이 전체 크롤링")
-        return set()
-
-etf_codes = load_etf_codes()
-
-if etf_codes:
-    before = len(df_all)
-    df_all = df_all[~df_all['Code'].isin(etf_codes)].reset_index(drop=True)
-    print(f"ℹ️ ETF 제외: {before}개 → {len(df_all)}개")
-
-# 전체 코드 set (누락 종목 비교용)
-all_codes_set = set(df_all['Code'].astype(str).str.zfill(6).tolist())
-
-print(f"\n✅ 전체 종목 조회 완료")
-print(f"   KOSPI: {len(df_kospi)}개 / KOSDAQ: {len(df_kosdaq)}개 / 합계(ETF 제외): {len(df_all)}개")
 
 # ============================================
-# 2. 크롤링 실행 (멀티스레딩)
+# 2. 크롤링 실행 (스레드 풀)
 # ============================================
-print(f"\n🕷️ 네이버 증권 크롤링 시작 (멀티스레딩 x5)")
-print(f"⏱️ 전체 {len(df_all)}개 종목 처리 예정")
-print()
 
-per_eps_results = []
-foreign_results = []
-sector_results = []
+# 종목별 결과는 메모리 리스트 대신 SINK_BATCH_SIZE 종목마다 part 파일로 기록 (result_sink.py)
+SINK_SCHEMAS = {
+    'per_eps': {'티커': object, '종목명': object, 'PER': 'float64', 'EPS': 'float64', 'PBR': 'float64',
+                '외국인보유율': 'float64', '날짜': object},
+    'sector': {'회사명': object, '종목코드': object, '업종': object},
+    'foreign': {'티커': object, '종목명': object, '날짜': object, '외국인순매수': 'int64', '기관순매수': 'int64'},
+    'flow_history': {'티커': object, '날짜': object, '외국인순매수': 'int64', '기관순매수': 'int64'},
+}
 
-lock = threading.Lock()
 
-def crawl_one(args):
-    idx, row = args
-    code = row['Code']
-    name = row['Name']
-    data = crawl_naver_stock_data(code)
-    time.sleep(0.2)
-    return idx, code, name, data
+def pick_value(*values):
+    """앞에서부터 처음으로 값이 있는 것 (모두 없으면 None → CSV 저장 시 '-')"""
+    for value in values:
+        if value is not None and not pd.isna(value):
+            return value
+    return None
 
-rows = list(df_all.iterrows())
 
-with ThreadPoolExecutor(max_workers=5) as executor:
-    futures = {executor.submit(crawl_one, (idx, row)): idx for idx, row in rows}
+def crawl_stock_tables(df_all, today, resume=False):
+    """
+    종목별 크롤링 (필드별 페이지 계획 → 병렬 크롤링 → 백테스트 누락 종목)
 
-    completed_count = 0
-    for future in tqdm(as_completed(futures), total=len(futures), desc="크롤링 진행"):
-        try:
-            idx, code, name, data = future.result()
-        except Exception as e:
-            print(f"❌ 에러: {e}")
-            continue
+    Parameters:
+    - df_all: load_crawl_universe() 결과
+    - resume: True 면 저널/part 파일에 이미 기록된 종목은 건너뜀
 
+    Returns:
+    - dict: per_eps / sector / foreign / flow_history (결과 sink 테이블)
+    """
+    print(f"\n🕷️ 네이버 증권 크롤링 시작 (스레드 {NAVER_MAX_IN_FLIGHT}개, 요청 수 자동 조절)")
+    print(f"⏱️ 전체 {len(df_all)}개 종목 처리 예정")
+    print()
+
+    name_by_code = dict(zip(df_all['Code'], df_all['Name']))
+    all_codes_set = set(df_all['Code'].astype(str).str.zfill(6).tolist())
+
+    # PER/EPS/PBR/외국인비율: 시가총액 리스트(종목 스냅샷)에서 50종목씩 받은 값 우선 사용
+    listing_valuation = df_all.set_index('Code')[market_listing.VALUATION_COLUMNS].to_dict('index')
+    listed_count = int(df_all['PER'].notna().sum())
+    print(f"📋 시가총액 리스트 밸류에이션: PER {listed_count}/{len(df_all)}개 (나머지는 종목 페이지 값 사용)")
+
+    # 필드별 갱신 주기(freshness.FIELD_POLICY) → 종목별로 TTL 이 지난 필드의 페이지만 요청
+    crawl_date = universe.current_trading_date()
+    freshness_store = freshness.FreshnessStore()
+
+    def satisfied_fields(code):
+        """시가총액 리스트로 이미 받은 필드"""
+        listed = listing_valuation.get(code, {})
+        satisfied = set()
+        if pd.notna(listed.get('EPS')):
+            satisfied.add('valuation')
+        if pd.notna(listed.get('ForeignRate')):
+            satisfied.add('ownership')
+        return satisfied
+
+    progress = {'done': 0, 'per': 0, 'sector': 0, 'etf': 0}
+
+    def collect_result(code, name, data):
+        """크롤링 결과 1종목 → 결과 sink 테이블 4개에 추가"""
         # ETF 여부 확인 후 업종 기록
         sector_val = data['sector']
         if is_etf(name):
             sector_val = 'ETF'
 
-        per_eps_results.append({
+        freshness.record_result(freshness_store, code, data, crawl_date)
+        listed = listing_valuation.get(code, {})
+
+        per = pick_value(listed.get('PER'), data['per'])
+        crawl_sink.add('per_eps', {
             '티커': code,
             '종목명': name,
-            'PER': data['per'] if data['per'] is not None else '-',
-            'EPS': data['eps'] if data['eps'] is not None else '-',
-            'PBR': data['pbr'] if data['pbr'] is not None else '-',
-            '외국인보유율': data['foreign_ownership'] if data['foreign_ownership'] is not None else '-',
+            'PER': per,
+            'EPS': pick_value(listed.get('EPS'), data['eps']),
+            'PBR': pick_value(listed.get('PBR'), data['pbr']),
+            '외국인보유율': pick_value(listed.get('ForeignRate'), data['foreign_ownership']),
             '날짜': today.strftime('%Y%m%d')
         })
 
-        sector_results.append({
+        crawl_sink.add('sector', {
             '회사명': name,
             '종목코드': code,
             '업종': sector_val
         })
 
+        progress['per'] += per is not None
+        progress['sector'] += sector_val not in ('N/A', 'ETF')
+        progress['etf'] += sector_val == 'ETF'
+
         for day_idx in range(5):
             foreign_net_buy = data['foreign_net_buy'][day_idx] if day_idx < len(data['foreign_net_buy']) else 0
             inst_net_buy = data['institutional_net_buy'][day_idx] if day_idx < len(data['institutional_net_buy']) else 0
             date_str = data['foreign_dates'][day_idx] if day_idx < len(data['foreign_dates']) else 'N/A'
 
             if date_str != 'N/A':
-                foreign_results.append({
+                crawl_sink.add('foreign', {
                     '티커': code,
                     '종목명': name,
                     '날짜': date_str,
@@ -533,172 +312,245 @@ with ThreadPoolExecutor(max_workers=5) as executor:
                     '기관순매수': inst_net_buy
                 })
 
-        completed_count += 1
-        if completed_count % 200 == 0:
-            per_success = sum(1 for r in per_eps_results if r['PER'] != '-')
-            sector_success = sum(1 for r in sector_results if r['업종'] not in ('N/A', 'ETF'))
-            etf_count = sum(1 for r in sector_results if r['업종'] == 'ETF')
-            print(f"\n📊 진행: {completed_count}/{len(df_all)} | PER: {per_success}개 | 업종: {sector_success}개 | ETF: {etf_count}개")
+        # frgn.nhn 페이지의 5일 이전 일자는 이력 저장소에만 추가
+        history = data.get('flow_history')
+        if history:
+            for date_str, foreign_net_buy, inst_net_buy in zip(history['dates'], history['foreign'], history['institutional']):
+                crawl_sink.add('flow_history', {
+                    '티커': code,
+                    '날짜': date_str,
+                    '외국인순매수': foreign_net_buy,
+                    '기관순매수': inst_net_buy
+                })
+
+    # 종목별 크롤링 저널 + 결과 sink (resume 이면 part 파일에 이미 기록된 종목은 건너뜀)
+    crawl_journal = IngestJournal('naver_crawl', crawl_date, resume=resume)
+
+    def on_flush(codes):
+        """part 파일 기록 후 → 저널 완료 표시 + 필드 갱신 기록 저장"""
+        crawl_journal.record_many([(code, {'code': code}) for code in codes])
+        freshness_store.save()
+
+    crawl_sink = ResultSink('naver_crawl', crawl_date, SINK_SCHEMAS, resume=resume, on_flush=on_flush)
+
+    # 이전 형식 저널 (결과 dict 를 저널에 직접 기록) 호환
+    for entry in crawl_journal.entries.values():
+        if entry and 'data' in entry:
+            collect_result(entry['code'], entry['name'], entry['data'])
+    if crawl_journal.entries:
+        print(f"⏭️ 저널 기준 완료 {len(crawl_journal.entries)}개 → 남은 종목만 크롤링 ({crawl_sink.path})")
+
+    pending_codes = [code for code in df_all['Code'] if not crawl_journal.done(code)]
+    progress['done'] = len(df_all) - len(pending_codes)
+
+    page_plan = {code: freshness.plan_pages(freshness_store, code, crawl_date, satisfied_fields(code)) for code in pending_codes}
+    crawl_codes = [code for code in pending_codes if page_plan[code]]
+    main_count = sum(1 for pages in page_plan.values() if 'main' in pages)
+    frgn_count = sum(1 for pages in page_plan.values() if 'frgn' in pages)
+    print(f"🗂️ 페이지 계획: main.nhn {main_count}개 / frgn.nhn {frgn_count}개 / 요청 없음 {len(pending_codes) - len(crawl_codes)}개"
+          f" (요청 {main_count + frgn_count}건, 전체 크롤링 시 {len(pending_codes) * 2}건)")
+
+    def on_result(code, data):
+        name = name_by_code[code]
+        # 요청 안 한(또는 실패한) 페이지 필드는 마지막으로 받은 값 사용
+        freshness.fill_missing(freshness_store, code, data)
+        collect_result(code, name, data)
+        # 계획한 페이지 요청이 모두 실패한 경우는 완료 표시 안 함 (--resume 시 다시 크롤링)
+        if data['pages'] or not page_plan.get(code):
+            crawl_sink.mark(code)
+
+        progress['done'] += 1
+        if progress['done'] % 200 == 0:
+            print(f"\n📊 진행: {progress['done']}/{len(df_all)} | PER: {progress['per']}개 | 업종: {progress['sector']}개 | ETF: {progress['etf']}개")
+            print(f"   요청 제어: {get_controller().describe()}")
+
+    # 모든 필드가 아직 유효한 종목은 요청 없이 저장된 값으로 처리
+    for code in pending_codes:
+        if not page_plan[code]:
+            on_result(code, empty_result())
+
+    crawl_stocks(crawl_codes, on_result, pages=page_plan)
+    crawl_sink.flush()
+
+    # 백테스트 누락 종목 추가 크롤링
+    missing_codes = get_backtest_missing_codes(all_codes_set)
+    crawl_missing_and_append(missing_codes, crawl_sink, today)
+    crawl_sink.close()
+    crawl_journal.close()
+    freshness_store.save()
+
+    return {table: crawl_sink.read(table) for table in SINK_SCHEMAS}
 
-# ============================================
-# ✅ 백테스트 누락 종목 추가 크롤링
-# ============================================
-missing_codes = get_backtest_missing_codes(all_codes_set)
-crawl_missing_and_append(missing_codes, per_eps_results, foreign_results, sector_results, df_all)
 
 # ============================================
 # 3. 결과 저장
 # ============================================
 
-print("\n" + "="*60)
-print("💾 파일 저장 중...")
-print("="*60)
-
-# PER/EPS 저장 (파일명 변경)
-df_per_eps = pd.DataFrame(per_eps_results)
-per_eps_path = os.path.join(data_dir, 'per_eps_all.csv')
-df_per_eps.to_csv(per_eps_path, encoding='utf-8-sig', index=False)
-per_success = len(df_per_eps[df_per_eps['PER'] != '-'])
-print(f"✅ PER/EPS: {per_eps_path}")
-print(f"   성공: {per_success}/{len(df_per_eps)} ({per_success/len(df_per_eps)*100:.1f}%)")
-
-# 외국인/기관 순매수 저장 (파일명 변경, df_all 기준 정렬)
-df_trading = pd.DataFrame(foreign_results)
-df_trading = df_trading.merge(df_all[['Code', 'Marcap']], left_on='티커', right_on='Code', how='left')
-df_trading = df_trading.sort_values(by=['날짜', 'Marcap'], ascending=[False, False])
-df_trading = df_trading.drop(columns=['Code', 'Marcap'])
-trading_path = os.path.join(data_dir, 'foreign_institutional_net_buy_daily_all.csv')
-df_trading.to_csv(trading_path, encoding='utf-8-sig', index=False)
-trading_dates = sorted(df_trading['날짜'].unique(), reverse=True)
-print(f"✅ 외국인/기관 순매수: {trading_path}")
-print(f"   수집 날짜: {trading_dates}")
-
-# 섹터 저장 (누적 방식)
-df_sector_new = pd.DataFrame(sector_results)
-sector_path = os.path.join(data_dir, 'kr_stock_sectors.csv')
-
-if os.path.exists(sector_path):
-    df_sector_existing = pd.read_csv(sector_path, encoding='utf-8-sig', dtype={'종목코드': str})
-    df_sector_existing['종목코드'] = df_sector_existing['종목코드'].str.zfill(6)
+def save_per_eps(df_per_eps):
+    """PER/EPS 저장 (중간에 다시 수집된 종목은 마지막 결과 사용, 값 없음은 '-')"""
+    df_per_eps = df_per_eps.drop_duplicates(subset='티커', keep='last').reset_index(drop=True)
+    per_success = int(df_per_eps['PER'].notna().sum())
+    value_columns = ['PER', 'EPS', 'PBR', '외국인보유율']
+    df_per_eps[value_columns] = df_per_eps[value_columns].astype(object).where(df_per_eps[value_columns].notna(), '-')
+    df_per_eps.to_csv(PER_EPS_PATH, encoding='utf-8-sig', index=False)
+    print(f"✅ PER/EPS: {PER_EPS_PATH}")
+    print(f"   성공: {per_success}/{len(df_per_eps)} ({per_success/max(len(df_per_eps), 1)*100:.1f}%)")
+    return df_per_eps
+
+
+def save_trading(df_trading, df_all):
+    """외국인/기관 순매수 저장 (df_all 시가총액 기준 정렬)"""
+    # 중간에 다시 수집된 종목은 (티커, 날짜) 기준 마지막 결과 사용
+    df_trading = df_trading.assign(날짜=df_trading['날짜'].astype(str))
+    df_trading = df_trading.drop_duplicates(subset=['티커', '날짜'], keep='last')
+    df_trading = df_trading.merge(df_all[['Code', 'Marcap']], left_on='티커', right_on='Code', how='left')
+    df_trading = df_trading.sort_values(by=['날짜', 'Marcap'], ascending=[False, False])
+    df_trading = df_trading.drop(columns=['Code', 'Marcap']).reset_index(drop=True)
+    df_trading.to_csv(TRADING_PATH, encoding='utf-8-sig', index=False)
+    trading_dates = sorted(df_trading['날짜'].unique(), reverse=True)
+    print(f"✅ 외국인/기관 순매수: {TRADING_PATH}")
+    print(f"   수집 날짜: {trading_dates}")
+    return df_trading
+
+
+def append_flow_history(df_flow_history, df_trading):
+    """순매수 이력 저장소에 추가 (종목·날짜 중복은 오늘 값으로 교체)"""
+    df_flow_new = pd.concat([df_flow_history, df_trading], ignore_index=True)
+    try:
+        added, total = flow_store.append(flow_store.from_daily_rows(df_flow_new))
+        print(f"✅ 순매수 이력: 신규 {added}행 추가 (전체 {total}행) → {flow_store.FLOW_PATH}")
+    except Exception as e:
+        print(f"⚠️ 순매수 이력 저장 실패: {e}")
+
+
+def save_sectors(df_sector_new):
+    """업종 저장 (누적 방식: 오늘 수집한 종목만 교체/추가)"""
+    df_sector_new = df_sector_new.drop_duplicates(subset='종목코드', keep='last').copy()
     df_sector_new['종목코드'] = df_sector_new['종목코드'].astype(str).str.zfill(6)
 
-    existing_codes = set(df_sector_new['종목코드'].tolist())
-    df_sector_keep = df_sector_existing[~df_sector_existing['종목코드'].isin(existing_codes)]
+    if os.path.exists(SECTOR_PATH):
+        df_sector_existing = pd.read_csv(SECTOR_PATH, encoding='utf-8-sig', dtype={'종목코드': str})
+        df_sector_existing['종목코드'] = df_sector_existing['종목코드'].str.zfill(6)
 
-    df_sector = pd.concat([df_sector_keep, df_sector_new], ignore_index=True)
-    df_sector = df_sector.drop_duplicates(subset='종목코드', keep='last')
-    df_sector = df_sector.sort_values('종목코드').reset_index(drop=True)
+        existing_codes = set(df_sector_new['종목코드'].tolist())
+        df_sector_keep = df_sector_existing[~df_sector_existing['종목코드'].isin(existing_codes)]
 
-    added = len(df_sector) - len(df_sector_existing)
-    updated = len(df_sector_new)
-    print(f"   기존 종목 수: {len(df_sector_existing)}개")
-    print(f"   오늘 수집: {updated}개 (업데이트/신규 포함)")
-    print(f"   누적 종목 수: {len(df_sector)}개 (신규 추가: {max(added,0)}개)")
-else:
-    df_sector_new['종목코드'] = df_sector_new['종목코드'].astype(str).str.zfill(6)
-    df_sector = df_sector_new
-    print(f"   신규 파일 생성: {len(df_sector)}개")
+        df_sector = pd.concat([df_sector_keep, df_sector_new], ignore_index=True)
+        df_sector = df_sector.drop_duplicates(subset='종목코드', keep='last')
+        df_sector = df_sector.sort_values('종목코드').reset_index(drop=True)
+
+        added = len(df_sector) - len(df_sector_existing)
+        updated = len(df_sector_new)
+        print(f"   기존 종목 수: {len(df_sector_existing)}개")
+        print(f"   오늘 수집: {updated}개 (업데이트/신규 포함)")
+        print(f"   누적 종목 수: {len(df_sector)}개 (신규 추가: {max(added,0)}개)")
+    else:
+        df_sector = df_sector_new.reset_index(drop=True)
+        print(f"   신규 파일 생성: {len(df_sector)}개")
+
+    df_sector.to_csv(SECTOR_PATH, encoding='utf-8-sig', index=False)
+    sector_success = len(df_sector[~df_sector['업종'].isin(['N/A', 'ETF'])])
+    etf_count = len(df_sector[df_sector['업종'] == 'ETF'])
+    print(f"✅ 섹터: {SECTOR_PATH}")
+    print(f"   업종 매핑 성공: {sector_success}/{len(df_sector)} ({sector_success/max(len(df_sector), 1)*100:.1f}%)")
+    print(f"   ETF: {etf_count}개")
+    return df_sector
 
-df_sector.to_csv(sector_path, encoding='utf-8-sig', index=False)
-sector_success = len(df_sector[~df_sector['업종'].isin(['N/A', 'ETF'])])
-etf_count = len(df_sector[df_sector['업종'] == 'ETF'])
-print(f"✅ 섹터: {sector_path}")
-print(f"   업종 매핑 성공: {sector_success}/{len(df_sector)} ({sector_success/len(df_sector)*100:.1f}%)")
-print(f"   ETF: {etf_count}개")
 
 # ============================================
-# 4. 섹터 ETF 트렌드 수집 (KR만)
+# 4. 샘플 출력
 # ============================================
-print("\n📈 섹터 ETF 트렌드 수집 중 (KR)...")
-
-sector_etfs = {
-    'Information Technology': {'KR': '139260', 'kr_name': 'TIGER 200 IT'},
-    'Consumer Discretionary': {'KR': '139290', 'kr_name': 'TIGER 200 경기소비재'},
-    'Communication Services': {'KR': '228810', 'kr_name': 'TIGER 미디어컨텐츠'},
-    'Health Care':            {'KR': '143860', 'kr_name': 'TIGER 헬스케어'},
-    'Consumer Staples':       {'KR': '266410', 'kr_name': 'KODEX 필수소비재'},
-    'Financials':             {'KR': '139270', 'kr_name': 'TIGER 200 금융'},
-    'Energy':                 {'KR': '117680', 'kr_name': 'KODEX 에너지화학'},
-    'Industrials':            {'KR': '117700', 'kr_name': 'KODEX 산업재'},
-    'Materials':              {'KR': '117690', 'kr_name': 'KODEX 소재산업'},
-    'Utilities':              {'KR': '404650', 'kr_name': 'TIGER KRX 기후변화솔루션'},
-    'Real Estate':            {'KR': '329200', 'kr_name': 'TIGER 리츠부동산인프라'}
-}
 
-def get_kr_etf_trend(code, name):
-    """KR ETF 1개월 수익률 크롤링 (네이버)"""
-    try:
-        url = f"https://finance.naver.com/item/main.naver?code={code}"
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        response = requests.get(url, headers=headers, timeout=5)
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        text = soup.get_text()
-        match = re.search(r'1개월\s*수익률\s*([+\-]?[\d,.]+)%', text)
-        if match:
-            rate = float(match.group(1).replace(',', ''))
-            trend = '상승' if rate > 0 else '하락'
-            return f"{trend}({rate:+.2f}%) {name}"
-    except:
-        pass
-    return None
+def print_samples(tables, market_counts, total_count):
+    df_per_eps = tables['per_eps']
+    df_trading = tables['trading']
+    df_sector = tables['sectors']
+    df_sector_trends = tables['sector_trends']
 
-sector_trends = []
-for sector, etfs in sector_etfs.items():
-    print(f"  {sector} 수집 중...")
+    print("\n" + "="*60)
+    print("📋 샘플 데이터")
+    print("="*60)
 
-    kr_trend = get_kr_etf_trend(etfs['KR'], etfs['kr_name'])
-    if kr_trend:
-        sector_trends.append({
-            'sector': sector,
-            'market': 'KR',
-            'trend_display': kr_trend
-        })
-        print(f"    KR: {kr_trend}")
-    else:
-        print(f"    KR: ❌ 실패")
+    print("\n[PER/EPS 상위 5개]")
+    print(df_per_eps.head(5).to_string(index=False))
+
+    print("\n[외국인/기관 순매수 최신일 상위 5개]")
+    latest_date = df_trading['날짜'].max()
+    top5_trading = df_trading[df_trading['날짜'] == latest_date].head(5)
+    print(top5_trading[['종목명', '외국인순매수', '기관순매수']].to_string(index=False))
 
-    time.sleep(0.3)
+    print("\n[섹터 샘플 5개 (ETF 제외)]")
+    print(df_sector[~df_sector['업종'].isin(['N/A', 'ETF'])].head(5)[['회사명', '업종']].to_string(index=False))
+
+    print("\n[ETF 샘플 3개]")
+    print(df_sector[df_sector['업종'] == 'ETF'].head(3)[['회사명', '종목코드']].to_string(index=False))
+
+    print("\n[섹터 ETF 트렌드 샘플]")
+    print(df_sector_trends.head(6).to_string(index=False))
+
+    etf_count = len(df_sector[df_sector['업종'] == 'ETF'])
+    sector_success = len(df_sector[~df_sector['업종'].isin(['N/A', 'ETF'])])
+    print("\n" + "="*60)
+    print("✅ 모든 크롤링 완료!")
+    print("="*60)
+    print(f"\n📊 최종 결과:")
+    print(f"   KOSPI: {market_counts['KOSPI']}개 / KOSDAQ: {market_counts['KOSDAQ']}개 / 합계: {total_count}개")
+    print(f"   ETF 종목: {etf_count}개")
+    print(f"   업종 매핑 성공: {sector_success}개")
+    print(f"   네이버 {naver_cache.describe()}")
+    print("\n⚠️ 주의사항:")
+    print("1. kr_stock_sectors.csv는 '업종'만 포함 (Sector, sector_trend는 별도 추가 필요)")
+    print("2. 외국인보유율은 외국인+기관 보유율을 포함합니다")
+    print("3. 섹터 ETF 트렌드는 ETF 일봉 기준 1주/1개월/3개월 수익률입니다 (표시 문구는 1개월, KR만)")
 
-df_sector_trends = pd.DataFrame(sector_trends)
-sector_trend_path = os.path.join(data_dir, 'sector_etf_trends.csv')
-df_sector_trends.to_csv(sector_trend_path, encoding='utf-8-sig', index=False)
-print(f"\n✅ 섹터 트렌드: {sector_trend_path}")
-print(f"   수집: {len(df_sector_trends)}개 (KR)")
 
 # ============================================
-# 5. 샘플 출력
+# 메인 실행
 # ============================================
 
-print("\n" + "="*60)
-print("📋 샘플 데이터")
-print("="*60)
-
-print("\n[PER/EPS 상위 5개]")
-print(df_per_eps.head(5).to_string(index=False))
-
-print("\n[외국인/기관 순매수 최신일 상위 5개]")
-latest_date = df_trading['날짜'].max()
-top5_trading = df_trading[df_trading['날짜'] == latest_date].head(5)
-print(top5_trading[['종목명', '외국인순매수', '기관순매수']].to_string(index=False))
-
-print("\n[섹터 샘플 5개 (ETF 제외)]")
-print(df_sector[~df_sector['업종'].isin(['N/A', 'ETF'])].head(5)[['회사명', '업종']].to_string(index=False))
-
-print("\n[ETF 샘플 3개]")
-print(df_sector[df_sector['업종'] == 'ETF'].head(3)[['회사명', '종목코드']].to_string(index=False))
-
-print("\n[섹터 ETF 트렌드 샘플]")
-print(df_sector_trends.head(6).to_string(index=False))
-
-print("\n" + "="*60)
-print("✅ 모든 크롤링 완료!")
-print("="*60)
-print(f"\n📊 최종 결과:")
-print(f"   KOSPI: {len(df_kospi)}개 / KOSDAQ: {len(df_kosdaq)}개 / 합계: {len(df_all)}개")
-print(f"   ETF 종목: {etf_count}개")
-print(f"   업종 매핑 성공: {sector_success}개")
-print("\n⚠️ 주의사항:")
-print("1. kr_stock_sectors.csv는 '업종'만 포함 (Sector, sector_trend는 별도 추가 필요)")
-print("2. 외국인보유율은 외국인+기관 보유율을 포함합니다")
-print("3. 섹터 ETF 트렌드는 네이버 증권 1개월 수익률 기준입니다 (KR만)")
\ No newline at end of file
+def crawl(df_universe=None, resume=False):
+    """
+    네이버 증권 통합 크롤링 (PER/EPS/PBR, 업종, 외국인/기관 순매수, 섹터 ETF 트렌드)
+    CSV 4개도 그대로 저장 (단독 실행 / 다른 스크립트 호환)
+
+    Parameters:
+    - df_universe: universe.load_universe() 결과 (None 이면 스냅샷 로드/조회)
+    - resume: True 면 오늘 저널/part 파일에 기록된 종목은 건너뜀
+
+    Returns:
+    - dict of DataFrame (CSV 와 같은 내용), 종목 조회 실패 시 None
+      per_eps: per_eps_all.csv
+      trading: foreign_institutional_net_buy_daily_all.csv
+      sectors: kr_stock_sectors.csv (누적, Sector 컬럼은 process_kr_sectors.classify_sectors 에서 추가)
+      sector_trends: sector_etf_trends.csv
+    """
+    print("="*60)
+    print("📊 네이버 증권 통합 크롤링 시작")
+    print("수집 항목: PER, EPS, PBR, 업종, 외국인 순매수(5일)")
+    print("="*60)
+
+    df_all, market_counts = load_crawl_universe(df_universe)
+    if df_all is None:
+        return None
+
+    today = trading_day()
+    raw = crawl_stock_tables(df_all, today, resume=resume)
+
+    print("\n" + "="*60)
+    print("💾 파일 저장 중...")
+    print("="*60)
+
+    tables = {}
+    tables['per_eps'] = save_per_eps(raw['per_eps'])
+    tables['trading'] = save_trading(raw['foreign'], df_all)
+    append_flow_history(raw['flow_history'], tables['trading'])
+    tables['sectors'] = save_sectors(raw['sector'])
+    # 섹터 ETF 트렌드: ETF 일봉 증분 수집 → 1주/1개월/3개월 수익률 (sector_trend.py)
+    tables['sector_trends'] = sector_trend.collect_sector_trends()
+
+    print_samples(tables, market_counts, len(df_all))
+    return tables
+
+
+if __name__ == '__main__':
+    crawl(resume='--resume' in sys.argv)
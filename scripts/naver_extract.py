@@ -0,0 +1,347 @@
+import re
+import sys
+import gzip
+import json
+import html as html_lib
+import timeit
+import numpy as np
+
+# 네이버 종목 메인 페이지(item/main.nhn, main.naver) 필드 추출
+# 페이지 전체 트리(BeautifulSoup)나 soup.get_text() 없이 필요한 위치만 정규식으로 찾음
+#
+# <title>삼성전자 : 네이버 증권</title>
+# <p class="no_today"><em class="no_up"><span class="blind">72,300</span> ...
+# <em id="_market_sum">435조 2,360</em>억원
+# <em id="_per">14.51</em> / <em id="_eps">4,950</em> / <em id="_pbr">1.33</em>
+# 업종명 : <a href="/sise/sise_group_detail.naver?type=upjong&no=278">반도체와반도체장비</a> ｜ 재무정보 ...
+# (ETF) <th>1개월 수익률</th> <td><em> +3.25%</em></td>
+_TITLE_RE = re.compile(r'<title>([^<]*)</title>')
+_PRICE_RE = re.compile(r'<p class="no_today">.*?<span class="blind">([^<]*)</span>', re.S)
+_MARKET_SUM_RE = re.compile(r'<em[^>]*\bid="_market_sum"[^>]*>([^<]*)</em>')
+_EM_RES = {
+    field: re.compile(r'<em[^>]*\bid="_%s"[^>]*>([^<]*)</em>' % field)
+    for field in ('per', 'eps', 'pbr')
+}
+_CAP_RE = re.compile(r'(?:([\d,]+)\s*조)?\s*([\d,]*)')
+_UPJONG_LINK_RE = re.compile(r'type=upjong&(?:amp;)?no=\d+"[^>]*>([^<]+)</a>')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# 기존 soup.get_text() 정규식 (태그 제거한 주변 구간에 그대로 적용)
+_SECTOR_TEXT_RE = re.compile(r'업종명\s*[:：]\s*([^\|｜]+)')
+_RETURN_1M_RE = re.compile(r'1개월\s*수익률\s*([+\-]?[\d,.]+)%')
+
+# 외국인/기관 순매매 표 (item/frgn.nhn)
+# <table summary="외국인 기관 순매매 거래량에 관한표이며 ..." class="type2">
+# 날짜 | 종가 | 전일비 | 등락률 | 거래량 | 기관 순매매량 | 외국인 순매매량 | 외국인 보유주수 | 외국인 보유율
+# 열 수가 바뀌어도 되도록 뒤에서부터: 보유율 -1, 보유주수 -2, 외국인 순매매 -3, 기관 순매매 -4
+_TABLE_RE = re.compile(r'<table([^>]*)>(.*?)</table>', re.S)
+_ROW_RE = re.compile(r'<tr[^>]*>(.*?)</tr>', re.S)
+_CELL_RE = re.compile(r'<td[^>]*>(.*?)</td>', re.S)
+_DATE_RE = re.compile(r'(\d{4})\.(\d{2})\.(\d{2})')
+_NUMBER_RE = re.compile(r'[+\-]?[\d,]*\.?\d+')
+
+# 앵커 뒤에서 텍스트로 바꿔 볼 구간 길이 (문자 수)
+_WINDOW = 600
+
+
+def _to_float(text):
+    try:
+        return float(text.strip().replace(',', ''))
+    except (ValueError, AttributeError):
+        return None
+
+
+def _text_after(html, anchor, start=0):
+    """anchor 위치부터 _WINDOW 만큼 태그 제거한 텍스트 (anchor 없으면 None)"""
+    pos = html.find(anchor, start)
+    if pos < 0:
+        return None, -1
+    chunk = html[pos:pos + _WINDOW]
+    return html_lib.unescape(_TAG_RE.sub(' ', chunk)), pos
+
+
+def _clean_sector(sector_text):
+    """기존 크롤러와 같은 업종명 정리 (재무정보/분기/기준 앞까지, 숫자/공백/점 제거)"""
+    sector_text = re.split(r'재무정보|분기|기준', sector_text.strip())[0].strip()
+    return re.sub(r'[\d\s.]+', '', sector_text)
+
+
+def parse_market_cap(text):
+    """'435조 2,360' / '5,000' → 억원 단위 float (파싱 실패 시 0.0)"""
+    match = _CAP_RE.match(text.strip()) if text else None
+    if not match or not (match.group(1) or match.group(2)):
+        return 0.0
+    jo = int(match.group(1).replace(',', '')) if match.group(1) else 0
+    eok = int(match.group(2).replace(',', '')) if match.group(2) else 0
+    return float(jo * 10000 + eok)
+
+
+def extract_sector(html):
+    """업종명 (없으면 None)"""
+    pos = 0
+    while True:
+        text, pos = _text_after(html, '업종명', pos)
+        if text is None:
+            break
+        match = _SECTOR_TEXT_RE.search(text)
+        if match:
+            sector = _clean_sector(match.group(1))
+            if sector:
+                return sector
+        pos += 1
+
+    # '업종명 :' 표기가 없는 페이지 → 업종 상세 링크 텍스트
+    match = _UPJONG_LINK_RE.search(html)
+    if match:
+        sector = _clean_sector(html_lib.unescape(match.group(1)))
+        if sector:
+            return sector
+    return None
+
+
+def extract_main(html):
+    """
+    종목 메인 페이지 → 필드 dict
+
+    Returns:
+    - dict: {
+        'name': str 또는 None,
+        'price': float 또는 None,
+        'market_cap': float (억원, 없으면 0.0),
+        'per', 'eps', 'pbr': float 또는 None,
+        'sector': str 또는 None
+      }
+    """
+    result = {'name': None, 'price': None, 'market_cap': 0.0,
+              'per': None, 'eps': None, 'pbr': None, 'sector': None}
+
+    match = _TITLE_RE.search(html)
+    if match:
+        name = html_lib.unescape(match.group(1)).strip().split(':')[0].strip()
+        result['name'] = name or None
+
+    match = _PRICE_RE.search(html)
+    if match:
+        result['price'] = _to_float(match.group(1))
+
+    match = _MARKET_SUM_RE.search(html)
+    if match:
+        result['market_cap'] = parse_market_cap(match.group(1))
+
+    for field, pattern in _EM_RES.items():
+        match = pattern.search(html)
+        if match:
+            result[field] = _to_float(match.group(1))
+
+    result['sector'] = extract_sector(html)
+    return result
+
+
+def extract_return_1m(html):
+    """ETF 메인 페이지 1개월 수익률 (%) (없으면 None)"""
+    pos = 0
+    while True:
+        text, pos = _text_after(html, '1개월', pos)
+        if text is None:
+            return None
+        match = _RETURN_1M_RE.search(text)
+        if match:
+            return _to_float(match.group(1))
+        pos += 1
+
+
+def _find_investor_table(html):
+    """외국인/기관 순매매 표 본문 (없으면 None)"""
+    fallback = None
+    for match in _TABLE_RE.finditer(html):
+        attrs, body = match.group(1), match.group(2)
+        if '순매매' in attrs:
+            return body
+        if fallback is None and '보유율' in body and '외국인' in body and '기관' in body:
+            fallback = body
+    return fallback
+
+
+def _cell_number(cell):
+    match = _NUMBER_RE.search(_TAG_RE.sub('', cell))
+    return match.group(0).replace(',', '') if match else '0'
+
+
+def parse_investor_table(html):
+    """
+    item/frgn.nhn → 날짜별 외국인/기관 순매매 배열 (페이지 순서 = 최신일 먼저)
+
+    Returns:
+    - dict: {
+        'date': int32 배열 (YYYYMMDD),
+        'foreign_net', 'institutional_net', 'foreign_shares': int64 배열,
+        'foreign_ratio': float64 배열 (%)
+      }
+    """
+    dates, inst, foreign, shares, ratio = [], [], [], [], []
+
+    body = _find_investor_table(html)
+    if body is not None:
+        for row in _ROW_RE.findall(body):
+            cells = _CELL_RE.findall(row)
+            if len(cells) < 5:
+                continue
+            date_match = _DATE_RE.search(cells[0])
+            if not date_match:
+                continue
+            dates.append(''.join(date_match.groups()))
+            inst.append(_cell_number(cells[-4]))
+            foreign.append(_cell_number(cells[-3]))
+            shares.append(_cell_number(cells[-2]))
+            ratio.append(_cell_number(cells[-1]))
+
+    return {
+        'date': np.array(dates, dtype=np.int32),
+        'institutional_net': np.array(inst, dtype=np.float64).astype(np.int64),
+        'foreign_net': np.array(foreign, dtype=np.float64).astype(np.int64),
+        'foreign_shares': np.array(shares, dtype=np.float64).astype(np.int64),
+        'foreign_ratio': np.array(ratio, dtype=np.float64),
+    }
+
+
+def _legacy_main(html):
+    """기존 BeautifulSoup 경로 (벤치마크 비교용)"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    result = {'name': None, 'price': None, 'per': None, 'eps': None, 'pbr': None, 'sector': None}
+
+    title_tag = soup.find('title')
+    if title_tag:
+        result['name'] = title_tag.text.strip().split(':')[0].strip() or None
+    price_tag = soup.find('p', class_='no_today')
+    if price_tag and price_tag.find('span', class_='blind'):
+        result['price'] = _to_float(price_tag.find('span', class_='blind').text)
+    for field in ('per', 'eps', 'pbr'):
+        tags = soup.find_all('em', id=f'_{field}')
+        if tags:
+            result[field] = _to_float(tags[0].text)
+
+    text = soup.get_text()
+    match = re.search(r'업종명\s*[:：]\s*([^\|｜]+)', text)
+    if match:
+        result['sector'] = _clean_sector(match.group(1)) or None
+    return result
+
+
+def _sample_page(n_filler=400):
+    """벤치마크용 메인 페이지 형태 샘플 (본문 앞뒤로 큰 표/스크립트)"""
+    filler = ''.join(
+        f'<tr><th scope="row">항목{i}</th><td class="num">{i * 1234:,}</td><td><a href="/item/main.nhn?code={i:06d}">종목{i}</a></td></tr>\n'
+        for i in range(n_filler)
+    )
+    return f'''<!DOCTYPE html><html lang="ko"><head><meta charset="euc-kr">
+<title>삼성전자 : 네이버 증권</title><script>var x = {{"a": [1, 2, 3]}};</script></head><body>
+<div id="menu"><a href="/sise/sise_group.naver?type=upjong">업종</a></div>
+<table class="type2">{filler}</table>
+<div class="rate_info"><div class="today"><p class="no_today"><em class="no_up"><span class="blind">72,300</span></em></p></div></div>
+<table summary="시가총액 정보"><tr><th scope="row">시가총액</th><td><em id="_market_sum">
+\t\t\t\t435조 2,360</em>억원</td></tr></table>
+<table summary="투자정보"><tr><th>PER</th><td><em id="_per">14.51</em>배 l <em id="_eps">4,950</em>원</td></tr>
+<tr><th>PBR</th><td><em id="_pbr">1.33</em>배</td></tr></table>
+<div class="section trade_compare"><h4 class="h_sub sub_tit7"><em><a href="#">동일업종비교</a></em>
+<em class="t_nm">업종명 : <a href="/sise/sise_group_detail.naver?type=upjong&amp;no=278">반도체와반도체장비</a></em>
+<span>｜</span> 재무정보 2024.06 분기 기준</h4></div>
+<table class="type2">{filler}</table>
+</body></html>'''
+
+
+def _sample_frgn_page(n_rows=20, n_filler=200):
+    """벤치마크용 frgn.nhn 형태 샘플"""
+    filler = ''.join(f'<tr><td>항목{i}</td><td class="num">{i * 77:,}</td></tr>' for i in range(n_filler))
+    rows = ''.join(
+        f'''<tr onmouseover="mouseOver(this)"><td class="tc"><span class="tah p10 gray03">2026.{10 - i // 28:02d}.{28 - i % 28:02d}</span></td>
+<td class="num"><span class="tah p11">{72000 + i * 100:,}</span></td>
+<td class="num"><img src="x.gif" alt="상승"><span class="tah p11 red02">{i * 10:,}</span></td>
+<td class="num"><span class="tah p11 red01">+{i / 10:.2f}%</span></td>
+<td class="num"><span class="tah p11">{1000000 + i:,}</span></td>
+<td class="num"><span class="tah p11 {'red01' if i % 2 else 'nv01'}">{'+' if i % 2 else '-'}{i * 12345:,}</span></td>
+<td class="num"><span class="tah p11 {'nv01' if i % 3 else 'red01'}">{'-' if i % 3 else '+'}{i * 23456:,}</span></td>
+<td class="num"><span class="tah p11">{3000000000 + i * 1000:,}</span></td>
+<td class="num"><span class="tah p11">{50 + i / 100:.2f}%</span></td></tr>
+<tr><td colspan="9" class="blank_07"></td></tr>'''
+        for i in range(n_rows)
+    )
+    return f'''<html><head><title>삼성전자 : 네이버 증권</title></head><body>
+<table class="type2">{filler}</table>
+<table summary="외국인 기관 순매매 거래량에 관한표이며 날짜별로 정보를 제공합니다." class="type2">
+<tr><th rowspan="2">날짜</th><th rowspan="2">종가</th><th rowspan="2">전일비</th><th rowspan="2">등락률</th><th rowspan="2">거래량</th>
+<th>기관</th><th colspan="3">외국인</th></tr>
+<tr><th>순매매량</th><th>순매매량</th><th>보유주수</th><th>보유율</th></tr>
+{rows}</table>
+<table class="type2">{filler}</table></body></html>'''
+
+
+def _legacy_frgn(html):
+    """기존 pd.read_html 경로 (벤치마크 비교용, lxml 필요)"""
+    import pandas as pd
+    from io import StringIO
+    for table in pd.read_html(StringIO(html)):
+        if isinstance(table.columns, pd.MultiIndex) and '날짜' in [col[0] for col in table.columns]:
+            table = table.dropna(subset=[table.columns[0]])
+            return table
+    return None
+
+
+def _load_saved_page(path):
+    """저장된 페이지 (.html 또는 naver_record .gz) → str"""
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rb') as f:
+            header, _, body = f.read().partition(b'\n')
+        content_type = json.loads(header).get('content_type', '')
+        charset = content_type.split('charset=')[-1].strip() if 'charset=' in content_type else 'euc-kr'
+        return body.decode(charset, errors='replace')
+    with open(path, 'rb') as f:
+        raw = f.read()
+    for charset in ('utf-8', 'euc-kr'):
+        try:
+            return raw.decode(charset)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode('utf-8', errors='replace')
+
+
+if __name__ == '__main__':
+    # 사용법: python naver_extract.py [저장된 main.nhn / frgn.nhn 페이지 (.html / naver_record .gz) ...]
+    loaded = [_load_saved_page(p) for p in sys.argv[1:]]
+    frgn_pages = [p for p in loaded if _find_investor_table(p) is not None] or ([] if loaded else [_sample_frgn_page()])
+    pages = [p for p in loaded if _find_investor_table(p) is None] or ([] if loaded else [_sample_page()])
+
+    if frgn_pages:
+        n = 50
+        t_fast = timeit.timeit(lambda: [parse_investor_table(p) for p in frgn_pages], number=n) / n / len(frgn_pages)
+        sample = parse_investor_table(frgn_pages[0])
+        print(f"frgn 페이지 수: {len(frgn_pages)}, 행 수: {len(sample['date'])}")
+        try:
+            t_legacy = timeit.timeit(lambda: [_legacy_frgn(p) for p in frgn_pages], number=n) / n / len(frgn_pages)
+            print(f"기존 (pd.read_html):      {t_legacy * 1000:8.2f} ms/페이지")
+            print(f"신규 (표 직접 파싱):      {t_fast * 1000:8.2f} ms/페이지  ({t_legacy / t_fast:6.1f}x)")
+        except ImportError as e:
+            print(f"기존 (pd.read_html):      측정 불가 ({e})")
+            print(f"신규 (표 직접 파싱):      {t_fast * 1000:8.2f} ms/페이지")
+        print(f"예시: 날짜 {sample['date'][:3]} 외국인 {sample['foreign_net'][:3]} 기관 {sample['institutional_net'][:3]} 보유율 {sample['foreign_ratio'][:3]}")
+
+    if not pages:
+        sys.exit(0)
+
+    mismatches = 0
+    for page in pages:
+        legacy = _legacy_main(page)
+        fast = extract_main(page)
+        for field, value in legacy.items():
+            if value != fast[field]:
+                mismatches += 1
+                print(f"⚠️ {field} 불일치: 기존 {value!r} / 신규 {fast[field]!r}")
+
+    n = 20
+    t_legacy = timeit.timeit(lambda: [_legacy_main(p) for p in pages], number=n) / n / len(pages)
+    t_fast = timeit.timeit(lambda: [extract_main(p) for p in pages], number=n) / n / len(pages)
+
+    print(f"페이지 수: {len(pages)} (평균 {sum(len(p) for p in pages) / len(pages) / 1024:.0f} KB), 불일치: {mismatches}")
+    print(f"기존 (BeautifulSoup + get_text): {t_legacy * 1000:8.2f} ms/페이지")
+    print(f"신규 (정규식 위치 추출):          {t_fast * 1000:8.2f} ms/페이지  ({t_legacy / t_fast:6.1f}x)")
+    print(f"예시: {extract_main(pages[0])}")
@@ -0,0 +1,93 @@
+import os
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+import naver_cache
+import naver_record
+from downloader import get_controller
+
+# 네이버 요청 공통 설정 (환경변수로 조정)
+# NAVER_TIMEOUT      → 요청 타임아웃 (초)
+# NAVER_POOL_SIZE    → 호스트별 keep-alive 커넥션 수
+# NAVER_FINANCE_BASE → finance.naver.com 대신 쓸 주소 (예: 로컬 naver_standin.py)
+# NAVER_API_BASE     → api.finance.naver.com 대신 쓸 주소
+# NAVER_RECORD_DIR   → 지정 시 응답을 녹화 (naver_record.py 참고)
+# NAVER_CACHE        → '0' 이면 응답 디스크 캐시 사용 안 함 (naver_cache.py 참고)
+NAVER_TIMEOUT = float(os.getenv('NAVER_TIMEOUT', '10'))
+NAVER_POOL_SIZE = int(os.getenv('NAVER_POOL_SIZE', '32'))
+FINANCE_BASE = os.getenv('NAVER_FINANCE_BASE', 'https://finance.naver.com').rstrip('/')
+API_BASE = os.getenv('NAVER_API_BASE', 'https://api.finance.naver.com').rstrip('/')
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Referer': 'https://finance.naver.com/',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    프로세스 전체에서 공유하는 requests.Session 반환
+    호스트(finance.naver.com, api.finance.naver.com)마다 커넥션 풀 유지
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.headers.update(DEFAULT_HEADERS)
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=NAVER_POOL_SIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def is_throttled(response):
+    """감속 신호 응답 여부: 429 / 5xx / 빈 응답 (siseJson 차단 시 '[]')"""
+    if response.status_code == 429 or response.status_code >= 500:
+        return True
+    return len(response.content) <= 16 and response.text.strip() in ('', '[]')
+
+
+def get(url, timeout=None, **kwargs):
+    """
+    공유 세션으로 GET 요청 (기본 헤더/타임아웃 적용)
+    천천히 바뀌는 페이지(naver_cache.ENDPOINT_TTLS)는 디스크 캐시 우선 사용
+    """
+    if not kwargs and naver_cache.ttl_for(url):
+        return naver_cache.fetch(
+            url,
+            lambda: _request(url, timeout),
+            lambda response: response.status_code == 200 and not is_throttled(response)
+        )
+    return _request(url, timeout, **kwargs)
+
+
+def _request(url, timeout=None, **kwargs):
+    """
+    실제 네트워크 요청
+    공용 AdaptiveController 로 동시 요청 수 / 초당 요청 수 제한, 결과(지연/오류)를 되먹임
+    """
+    controller = get_controller()
+    controller.acquire()
+    started = time.monotonic()
+    try:
+        response = get_session().get(url, timeout=timeout or NAVER_TIMEOUT, **kwargs)
+    except Exception:
+        controller.release(ok=False)
+        raise
+    controller.release(ok=not is_throttled(response), latency=time.monotonic() - started)
+
+    if naver_record.RECORD_DIR and response.status_code == 200 and naver_record.should_record(url):
+        try:
+            naver_record.save(url, response)
+        except Exception as e:
+            print(f"⚠️ 응답 녹화 실패 ({url}): {e}")
+    return response
@@ -0,0 +1,66 @@
+import os
+import json
+import gzip
+import hashlib
+import threading
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+# 네이버 응답 녹화 저장소 (naver_http 녹화 모드 → naver_standin 재생)
+# NAVER_RECORD_DIR 를 지정하면 naver_http.get 의 200 응답을 모두 저장
+# {dir}/{sha1(path?query)}.gz → gzip( 메타 JSON 1줄 + '\n' + 원본 응답 바이트 )
+RECORD_DIR = os.getenv('NAVER_RECORD_DIR', '')
+
+# 녹화 대상 엔드포인트 (path 끝부분)
+RECORD_PATHS = ('/siseJson.naver', '/sise/sise_market_sum.naver', '/item/main.nhn', '/item/frgn.nhn', '/item/main.naver')
+
+_write_lock = threading.Lock()
+
+
+def record_key(url):
+    """URL → 'path?정렬된 query' (호스트/파라미터 순서와 무관하게 같은 키)"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{parts.path}?{query}" if query else parts.path
+
+
+def record_path(key, record_dir=None):
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(record_dir or RECORD_DIR, f"{digest}.gz")
+
+
+def should_record(url):
+    return urlsplit(url).path.endswith(RECORD_PATHS)
+
+
+def save(url, response, record_dir=None):
+    """응답 1건 저장 (같은 키는 덮어씀)"""
+    key = record_key(url)
+    path = record_path(key, record_dir)
+    meta = {
+        'key': key,
+        'status': response.status_code,
+        'content_type': response.headers.get('Content-Type', 'text/html'),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp_path, 'wb') as f:
+        f.write(json.dumps(meta, ensure_ascii=False).encode('utf-8') + b'\n')
+        f.write(response.content)
+    with _write_lock:
+        os.replace(tmp_path, path)
+
+
+def load(key, record_dir=None):
+    """
+    저장된 응답 조회
+
+    Returns:
+    - (meta dict, body bytes), 없으면 None
+    """
+    path = record_path(key, record_dir)
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, 'rb') as f:
+        data = f.read()
+    header, _, body = data.partition(b'\n')
+    return json.loads(header), body
@@ -0,0 +1,189 @@
+import os
+import sys
+import gzip
+import json
+import time
+import random
+import argparse
+import threading
+from collections import deque
+from urllib.parse import urlsplit, parse_qsl
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import naver_record
+
+# 로컬 네이버 대역 서버 (naver_record 로 녹화한 응답 재생)
+#
+# 1) 녹화:  NAVER_RECORD_DIR=./data/naver_record python fetch_data.py
+# 2) 재생:  python naver_standin.py --dir ./data/naver_record --port 8700 --latency-ms 80 --jitter-ms 40
+# 3) 실행:  NAVER_FINANCE_BASE=http://127.0.0.1:8700 NAVER_API_BASE=http://127.0.0.1:8700 python fetch_data.py
+#
+# 정확히 같은 path?query 가 없으면 종목/페이지 식별 파라미터만으로 재생
+# (siseJson 의 startTime/endTime 처럼 날짜마다 바뀌는 값은 무시)
+IDENTITY_PARAMS = {
+    '/siseJson.naver': ('symbol',),
+    '/sise/sise_market_sum.naver': ('sosok', 'page'),
+    '/item/main.nhn': ('code',),
+    '/item/main.naver': ('code',),
+    '/item/frgn.nhn': ('code',),
+}
+
+
+def _identity_key(path, query):
+    params = dict(parse_qsl(query, keep_blank_values=True))
+    names = IDENTITY_PARAMS.get(path)
+    if names is None:
+        return None
+    return (path,) + tuple(params.get(name, '') for name in names)
+
+
+class RecordIndex:
+    """녹화 디렉터리 색인 (정확 키 → 파일, 식별 키 → 정확 키)"""
+
+    def __init__(self, record_dir):
+        self.record_dir = record_dir
+        self.by_identity = {}
+        count = 0
+        for file in os.listdir(record_dir) if os.path.isdir(record_dir) else []:
+            if not file.endswith('.gz'):
+                continue
+            try:
+                with gzip.open(os.path.join(record_dir, file), 'rb') as f:
+                    meta = json.loads(f.readline())
+            except Exception:
+                continue
+            path, _, query = meta['key'].partition('?')
+            identity = _identity_key(path, query)
+            if identity is not None:
+                self.by_identity[identity] = meta['key']
+            count += 1
+        self.count = count
+
+    def lookup(self, raw_path):
+        """요청 경로 → (meta, body) 또는 None"""
+        key = naver_record.record_key(raw_path)
+        found = naver_record.load(key, self.record_dir)
+        if found is not None:
+            return found
+        parts = urlsplit(raw_path)
+        identity = _identity_key(parts.path, parts.query)
+        if identity in self.by_identity:
+            return naver_record.load(self.by_identity[identity], self.record_dir)
+        return None
+
+
+class StandinConfig:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, throttle_rate=0.0,
+                 empty_rate=0.0, max_rps=0.0, seed=None):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.empty_rate = empty_rate
+        self.max_rps = max_rps
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.hits = deque()
+        self.counts = {'served': 0, 'missing': 0, 'error': 0, 'throttled': 0, 'empty': 0}
+
+    def draw(self):
+        with self.lock:
+            return self.random.random()
+
+    def over_rate(self):
+        """최근 1초 요청 수가 max_rps 초과면 True"""
+        if not self.max_rps:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            self.hits.append(now)
+            while self.hits and now - self.hits[0] > 1.0:
+                self.hits.popleft()
+            return len(self.hits) > self.max_rps
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+
+def make_handler(index, config):
+    class StandinHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, content_type='text/plain; charset=utf-8'):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            delay = config.latency + config.jitter * config.draw() if config.latency or config.jitter else 0
+            if delay:
+                time.sleep(delay)
+
+            if config.over_rate() or config.draw() < config.throttle_rate:
+                config.count('throttled')
+                return self._send(429, b'Too Many Requests')
+            if config.draw() < config.error_rate:
+                config.count('error')
+                return self._send(503, b'Service Unavailable')
+
+            found = index.lookup(self.path)
+            if found is None:
+                config.count('missing')
+                return self._send(404, b'Not Recorded')
+
+            meta, body = found
+            if urlsplit(self.path).path == '/siseJson.naver' and config.draw() < config.empty_rate:
+                config.count('empty')
+                return self._send(200, b'[]', meta['content_type'])
+
+            config.count('served')
+            self._send(meta['status'], body, meta['content_type'])
+
+    return StandinHandler
+
+
+def serve(record_dir, host='127.0.0.1', port=8700, **config_kwargs):
+    index = RecordIndex(record_dir)
+    config = StandinConfig(**config_kwargs)
+    server = ThreadingHTTPServer((host, port), make_handler(index, config))
+    server.daemon_threads = True
+    return server, index, config
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='네이버 녹화 응답 재생 서버')
+    parser.add_argument('--dir', default=naver_record.RECORD_DIR or os.path.join(os.getenv('DATA_DIR', './data'), 'naver_record'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8700)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='기본 응답 지연')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='추가 지연 (0 ~ jitter 균등분포)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503 응답 비율')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='429 응답 비율')
+    parser.add_argument('--empty-rate', type=float, default=0.0, help="siseJson 빈 응답('[]') 비율")
+    parser.add_argument('--max-rps', type=float, default=0.0, help='초당 요청 수 초과 시 429 (0 = 제한 없음)')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    server, index, config = serve(
+        args.dir, args.host, args.port,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        empty_rate=args.empty_rate, max_rps=args.max_rps, seed=args.seed,
+    )
+    if index.count == 0:
+        print(f"⚠️ 녹화된 응답 없음: {args.dir}")
+    print(f"🛰️ 네이버 대역 서버: http://{args.host}:{args.port} (녹화 {index.count}건, {args.dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"종료: {config.counts}")
+        sys.exit(0)
@@ -0,0 +1,200 @@
+import os
+import duckdb
+import pandas as pd
+
+DATA_DIR = os.getenv('DATA_DIR', './data')
+
+# 일봉 원본 CSV (fetch_data.py 가 종목별로 저장)
+DAILY_CSV_DIR = os.path.join(DATA_DIR, 'kr_daily')
+# 구버전 루트 kr_daily/{종목}.csv 는 시장 폴더에 같은 종목이 없을 때 이 시장 파티션에 포함
+# (compute_indicators.py 의 구버전 KR → KOSPI 처리와 동일)
+LEGACY_MARKET = 'KOSPI'
+
+# 컬럼형 저장소: 시장별 파티션 1개 Parquet (종목, 날짜 순 정렬)
+# data/ohlcv/market=KOSPI/data.parquet
+# data/ohlcv/market=KOSDAQ/data.parquet
+STORE_DIR = os.path.join(DATA_DIR, 'ohlcv')
+MARKETS = ('KOSPI', 'KOSDAQ')
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+_CSV_COLUMNS = "{'Date': 'DATE', 'Open': 'BIGINT', 'High': 'BIGINT', 'Low': 'BIGINT', 'Close': 'BIGINT', 'Volume': 'BIGINT'}"
+
+
+def get_partition_path(market):
+    """시장 파티션 Parquet 경로"""
+    return os.path.join(STORE_DIR, f"market={market.upper()}", 'data.parquet')
+
+
+def _markets_for(market):
+    """market 인자 → 조회할 시장 목록 (None / 'KR' 구버전 → 전체)"""
+    if market is None or market.upper() not in MARKETS:
+        return list(MARKETS)
+    return [market.upper()]
+
+
+def _sql_path(path):
+    return path.replace('\\', '/').replace("'", "''")
+
+
+def _list_csv(csv_dir):
+    """폴더 안 종목 CSV 파일명 목록 (폴더 없으면 빈 목록)"""
+    if not os.path.isdir(csv_dir):
+        return []
+    return sorted(f for f in os.listdir(csv_dir) if f.endswith('.csv'))
+
+
+def _csv_files(market):
+    """
+    시장 1개의 일봉 CSV 경로 목록
+    LEGACY_MARKET 은 어느 시장 폴더에도 없는 구버전 루트 kr_daily/{종목}.csv 포함
+    """
+    files = [os.path.join(DAILY_CSV_DIR, market.lower(), f) for f in _list_csv(os.path.join(DAILY_CSV_DIR, market.lower()))]
+    if market == LEGACY_MARKET:
+        known = {f for m in MARKETS for f in _list_csv(os.path.join(DAILY_CSV_DIR, m.lower()))}
+        files += [os.path.join(DAILY_CSV_DIR, f) for f in _list_csv(DAILY_CSV_DIR) if f not in known]
+    return files
+
+
+def _csv_sql(files):
+    """종목 CSV 목록 → long 형식 SELECT (symbol 은 파일명에서 추출)"""
+    file_list = ', '.join(f"'{_sql_path(f)}'" for f in files)
+    return (
+        f"SELECT regexp_extract(filename, '(\\d{{6}})\\.csv$', 1) AS symbol, "
+        f"Date AS date, Open AS open, High AS high, Low AS low, Close AS close, Volume AS volume "
+        f"FROM read_csv([{file_list}], header=true, filename=true, columns={_CSV_COLUMNS})"
+    )
+
+
+def _source_sql(market):
+    """
+    시장 1개의 조회 원본 SQL
+    Parquet 파티션이 있으면 Parquet, 없으면 종목별 CSV 직접 스캔 (빌드 전 호환)
+    """
+    parquet_path = get_partition_path(market)
+    if os.path.exists(parquet_path):
+        return (
+            f"SELECT symbol, date, open, high, low, close, volume, '{market}' AS market "
+            f"FROM read_parquet('{_sql_path(parquet_path)}')"
+        )
+
+    files = _csv_files(market)
+    if not files:
+        return None
+    return f"SELECT *, '{market}' AS market FROM ({_csv_sql(files)})"
+
+
+def build_from_csv(markets=MARKETS):
+    """
+    kr_daily/{kospi,kosdaq}/*.csv → 시장별 Parquet 파티션 재생성
+    구버전 루트 kr_daily/*.csv 는 LEGACY_MARKET 파티션으로 옮겨 담음 (원본 파일은 그대로 둠)
+    임시 파일에 쓴 뒤 교체하므로 읽는 쪽(app 등)은 항상 완전한 파일을 봄
+    """
+    con = duckdb.connect()
+    counts = {}
+    try:
+        for market in markets:
+            files = _csv_files(market)
+            if not files:
+                print(f"⚠️ {market} 일봉 CSV 없음 → 저장소 빌드 스킵")
+                continue
+
+            legacy_count = sum(os.path.dirname(f) == DAILY_CSV_DIR for f in files)
+            if legacy_count:
+                print(f"⚠️ 구버전 루트 일봉 CSV {legacy_count}개 → {market} 파티션에 포함")
+
+            parquet_path = get_partition_path(market)
+            os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+            tmp_path = parquet_path + '.tmp'
+
+            con.execute(f"""
+                COPY (
+                    SELECT * FROM ({_csv_sql(files)})
+                    WHERE date IS NOT NULL
+                    ORDER BY symbol, date
+                ) TO '{_sql_path(tmp_path)}' (FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE 100000)
+            """)
+            os.replace(tmp_path, parquet_path)
+
+            counts[market] = con.execute(
+                f"SELECT COUNT(DISTINCT symbol), COUNT(*) FROM read_parquet('{_sql_path(parquet_path)}')"
+            ).fetchone()
+            print(f"✅ {market} 저장소 빌드: {counts[market][0]}종목 / {counts[market][1]}행 → {parquet_path}")
+    finally:
+        con.close()
+    return counts
+
+
+def _empty_frame():
+    return pd.DataFrame(columns=['symbol', 'market', 'date'] + [c.lower() for c in OHLCV_COLUMNS])
+
+
+def _query(market=None, symbols=None, start=None, end=None):
+    """공통 조회 (long 형식: symbol, market, date, OHLCV)"""
+    sources = [s for s in (_source_sql(m) for m in _markets_for(market)) if s]
+    if not sources or (symbols is not None and len(symbols) == 0):
+        return _empty_frame()
+
+    where = []
+    params = []
+    if symbols is not None:
+        where.append(f"symbol IN ({','.join(['?'] * len(symbols))})")
+        params.extend(str(s).zfill(6) for s in symbols)
+    if start is not None:
+        where.append("date >= ?")
+        params.append(pd.Timestamp(start).date())
+    if end is not None:
+        where.append("date <= ?")
+        params.append(pd.Timestamp(end).date())
+
+    sql = (
+        "SELECT symbol, market, date, open, high, low, close, volume FROM ("
+        + " UNION ALL ".join(sources) + ")"
+        + (" WHERE " + " AND ".join(where) if where else "")
+        + " ORDER BY symbol, date"
+    )
+
+    con = duckdb.connect()
+    try:
+        df = con.execute(sql, params).fetchdf()
+    finally:
+        con.close()
+    df['date'] = pd.to_datetime(df['date']).astype('datetime64[ns]')
+    return df
+
+
+def to_daily_frame(df):
+    """long 형식 → 기존 일봉 CSV 와 같은 형태 (Date 인덱스, Open~Volume)"""
+    out = df[['date', 'open', 'high', 'low', 'close', 'volume']].copy()
+    out.columns = ['Date'] + OHLCV_COLUMNS
+    return out.set_index('Date')
+
+
+def load_symbol(symbol, market=None, start=None, end=None):
+    """
+    종목 1개 일봉 (Date 인덱스, Open/High/Low/Close/Volume)
+    데이터 없으면 None
+    """
+    if symbol is None or str(symbol).strip() == '':
+        return None
+    df = _query(market, [symbol], start, end)
+    if df.empty:
+        return None
+    # 구버전 KR 등 market 미지정 시 여러 시장에 같은 종목이 있으면 MARKETS 순서상 첫 시장 사용
+    found = set(df['market'])
+    df = df[df['market'] == next(m for m in _markets_for(market) if m in found)]
+    return to_daily_frame(df)
+
+
+def load_symbols(symbols, market=None, start=None, end=None):
+    """여러 종목 일봉 (long 형식: symbol, market, date, open, high, low, close, volume)"""
+    return _query(market, list(symbols), start, end)
+
+
+def load_range(start=None, end=None, market=None):
+    """날짜 구간 전체 종목 일봉 (long 형식)"""
+    return _query(market, None, start, end)
+
+
+if __name__ == '__main__':
+    build_from_csv()
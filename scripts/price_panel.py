@@ -0,0 +1,204 @@
+import os
+import json
+import shutil
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+import ohlcv_store
+
+DATA_DIR = os.getenv('DATA_DIR', './data')
+
+# 종목 × 거래일 패널 (np.load(mmap_mode='r') 로 여러 프로세스가 페이지 캐시 공유)
+# data/panel/{버전}/open.npy, high.npy, low.npy, close.npy  → float32 [symbols, days] (없는 날은 NaN)
+# data/panel/{버전}/volume.npy                              → int64   [symbols, days] (없는 날은 0)
+# data/panel/{버전}/dates.npy                               → datetime64[D] [days]
+# data/panel/{버전}/index.json                              → symbols / markets / shape
+# data/panel/CURRENT                                        → 현재 버전 폴더 이름
+#
+# 빌드할 때마다 새 버전 폴더에 쓰고 CURRENT 만 교체
+# (app 이 mmap 으로 열고 있는 .npy 를 덮어쓰면 Windows 에서 PermissionError → 열린 파일은 건드리지 않음)
+# 지난 버전 폴더는 다음 빌드 때 삭제 (아직 열려 있으면 건너뛰고 그다음 빌드 때 다시 시도)
+PANEL_DIR = os.path.join(DATA_DIR, 'panel')
+CURRENT_FILE = 'CURRENT'
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+FIELDS = PRICE_FIELDS + ('volume',)
+
+# market 이 KOSPI/KOSDAQ 가 아닐 때 (구버전 'KR', 미지정) 찾는 시장 순서
+# compute_indicators.py 의 구버전 KR → KOSPI 처리와 같게 KOSPI 우선
+LEGACY_MARKET_ORDER = ('KOSPI', 'KOSDAQ')
+
+
+class PricePanel:
+    """
+    mmap 된 종목 × 거래일 배열 묶음
+    - panel.close[row] → 종목 1개 종가 시계열 (복사 없는 view)
+    - panel.close[:, col] → 하루치 전 종목 단면
+    """
+
+    def __init__(self, symbols, markets, dates, arrays):
+        self.symbols = symbols
+        self.markets = markets
+        self.dates = dates
+        self.open = arrays['open']
+        self.high = arrays['high']
+        self.low = arrays['low']
+        self.close = arrays['close']
+        self.volume = arrays['volume']
+        self.symbol_index = {}
+        for i, (symbol, market) in enumerate(zip(symbols, markets)):
+            self.symbol_index[(symbol, market)] = i
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+    def row(self, symbol, market=None):
+        """종목 행 번호 (market 이 KOSPI/KOSDAQ 가 아니면 LEGACY_MARKET_ORDER 순서로 조회), 없으면 None"""
+        symbol = str(symbol).zfill(6)
+        if market in ohlcv_store.MARKETS:
+            return self.symbol_index.get((symbol, market))
+        for legacy_market in LEGACY_MARKET_ORDER:
+            i = self.symbol_index.get((symbol, legacy_market))
+            if i is not None:
+                return i
+        return None
+
+    def date_slice(self, start=None, end=None):
+        """[start, end] 날짜 구간에 해당하는 열 slice"""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start).date()), 'left'))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end).date()), 'right'))
+        return slice(lo, hi)
+
+    def series(self, symbol, market=None, field='close', start=None, end=None):
+        """종목 1개 필드 시계열 view (dates, values), 종목 없으면 None"""
+        i = self.row(symbol, market)
+        if i is None:
+            return None
+        cols = self.date_slice(start, end)
+        return self.dates[cols], getattr(self, field)[i, cols]
+
+    def frame(self, symbol, market=None, start=None, end=None):
+        """종목 1개 일봉 DataFrame (기존 CSV 형태, 가격 정수, 거래 없는 날 제외)"""
+        i = self.row(symbol, market)
+        if i is None:
+            return None
+        cols = self.date_slice(start, end)
+        valid = ~np.isnan(self.close[i, cols])
+
+        def prices(arr):
+            # 패널은 NaN 표시용 float32, 원래 값은 정수 원 단위 → OHLCV 저장소 / CSV 와 같은 int64 로 복원
+            return np.rint(arr[i, cols][valid]).astype(np.int64)
+
+        df = pd.DataFrame({
+            'Open': prices(self.open),
+            'High': prices(self.high),
+            'Low': prices(self.low),
+            'Close': prices(self.close),
+            'Volume': self.volume[i, cols][valid],
+        }, index=pd.DatetimeIndex(self.dates[cols][valid].astype('datetime64[ns]'), name='Date'))
+        return df if not df.empty else None
+
+
+def _current_dir(panel_dir):
+    """CURRENT 가 가리키는 버전 폴더 (없으면 버전 폴더 도입 전 형식인 panel_dir 자체)"""
+    pointer = os.path.join(panel_dir, CURRENT_FILE)
+    if os.path.exists(pointer):
+        with open(pointer, 'r', encoding='utf-8') as f:
+            return os.path.join(panel_dir, f.read().strip())
+    return panel_dir
+
+
+def _remove_old_versions(panel_dir, keep):
+    """현재 버전 외 버전 폴더 / 버전 폴더 도입 전 파일 삭제 (mmap 으로 열려 있으면 건너뜀)"""
+    legacy_files = {f'{name}.npy' for name in FIELDS + ('dates',)} | {'index.json'}
+    for name in os.listdir(panel_dir):
+        path = os.path.join(panel_dir, name)
+        is_version = name.startswith('v') and os.path.isdir(path)
+        if name == keep or not (is_version or name in legacy_files):
+            continue
+        try:
+            shutil.rmtree(path) if is_version else os.remove(path)
+        except PermissionError as e:
+            print(f"⚠️ 지난 패널 {name} 삭제 실패 (점유 중): {e} → 다음 빌드 때 다시 시도")
+
+
+def build_panel(panel_dir=PANEL_DIR):
+    """OHLCV 저장소 → 새 버전 폴더에 종목 × 거래일 패널 파일 생성 후 CURRENT 교체"""
+    df = ohlcv_store.load_range()
+    if df.empty:
+        print("⚠️ OHLCV 데이터 없음 → 패널 빌드 스킵")
+        return None
+
+    keys = df['market'] + ':' + df['symbol']
+    row_codes, row_keys = pd.factorize(keys, sort=True)
+    col_codes, col_dates = pd.factorize(df['date'], sort=True)
+    n_rows, n_cols = len(row_keys), len(col_dates)
+
+    version = datetime.now().strftime('v%Y%m%d_%H%M%S_%f')
+    version_dir = os.path.join(panel_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    def write_array(name, dtype, fill, values):
+        arr = np.lib.format.open_memmap(os.path.join(version_dir, f'{name}.npy'), mode='w+', dtype=dtype, shape=(n_rows, n_cols))
+        arr[:] = fill
+        arr[row_codes, col_codes] = values
+        arr.flush()
+        del arr
+
+    for field in PRICE_FIELDS:
+        write_array(field, np.float32, np.nan, df[field].to_numpy(dtype=np.float32))
+    write_array('volume', np.int64, 0, df['volume'].to_numpy(dtype=np.int64))
+
+    dates = np.asarray(col_dates.values, dtype='datetime64[D]')
+    np.save(os.path.join(version_dir, 'dates.npy'), dates)
+
+    markets, symbols = zip(*(k.split(':') for k in row_keys))
+    index = {
+        'symbols': list(symbols),
+        'markets': list(markets),
+        'shape': [n_rows, n_cols],
+        'first_date': str(dates[0]),
+        'last_date': str(dates[-1]),
+    }
+    with open(os.path.join(version_dir, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+
+    # 다 쓴 뒤 CURRENT 교체 → 읽는 쪽은 항상 완전한 버전 폴더만 봄
+    pointer = os.path.join(panel_dir, CURRENT_FILE)
+    with open(pointer + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(pointer + '.tmp', pointer)
+    _remove_old_versions(panel_dir, keep=version)
+
+    print(f"✅ 가격 패널 빌드: {n_rows}종목 × {n_cols}거래일 ({index['first_date']} ~ {index['last_date']}) → {version_dir}")
+    return index
+
+
+def load_panel(panel_dir=PANEL_DIR, mmap_mode='r'):
+    """현재 버전 패널 로드 (기본 읽기 전용 mmap), 없거나 깨져 있으면 None"""
+    try:
+        version_dir = _current_dir(panel_dir)
+        index_path = os.path.join(version_dir, 'index.json')
+        if not os.path.exists(index_path):
+            return None
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        arrays = {
+            field: np.load(os.path.join(version_dir, f'{field}.npy'), mmap_mode=mmap_mode)
+            for field in FIELDS
+        }
+        dates = np.load(os.path.join(version_dir, 'dates.npy'))
+        shape = tuple(index['shape'])
+        if any(arr.shape != shape for arr in arrays.values()) or len(dates) != shape[1]:
+            print(f"⚠️ 가격 패널 크기 불일치 → 사용 안 함 ({version_dir})")
+            return None
+        return PricePanel(index['symbols'], index['markets'], dates, arrays)
+    except Exception as e:
+        print(f"⚠️ 가격 패널 로드 실패: {e}")
+        return None
+
+
+if __name__ == '__main__':
+    build_panel()
@@ -0,0 +1,113 @@
+import os
+import glob
+import shutil
+import threading
+import duckdb
+import pandas as pd
+
+from ingest_journal import JOURNAL_DIR
+
+# 크롤링 결과 스트리밍 저장 (종목이 끝날 때마다 메모리에 쌓지 않고 배치 단위로 Parquet 파일에 기록)
+# data/journal/{작업명}_{거래일}_parts/{테이블}/part-00001.parquet
+#
+# SINK_BATCH_SIZE 종목마다 part 파일을 쓰고(임시 파일 → 교체) 그 다음에 on_flush(keys) 호출
+# → 저널에는 part 파일에 들어간 종목만 완료로 기록되므로, 중간에 죽어도 --resume 시 빠지는 종목 없음
+# (part 기록 후 저널 기록 전에 죽으면 해당 종목은 다시 수집 → 읽는 쪽에서 중복 제거)
+SINK_BATCH_SIZE = int(os.getenv('SINK_BATCH_SIZE', '200'))
+
+
+def _sql_path(path):
+    return path.replace('\\', '/').replace("'", "''")
+
+
+class ResultSink:
+    """
+    테이블별 레코드 버퍼 + Parquet part 파일
+    - schemas: {테이블: {컬럼: dtype}} → part 파일마다 같은 타입으로 기록 (없는 값은 NaN/None)
+    - add(table, record) / mark(key) → 버퍼에 추가, batch_size 개 mark 되면 flush
+    - read(table) → 지금까지 기록된 part 전체 (DataFrame)
+    """
+
+    def __init__(self, name, trading_date, schemas, resume=False, batch_size=SINK_BATCH_SIZE,
+                 on_flush=None, sink_dir=JOURNAL_DIR):
+        self.path = os.path.join(sink_dir, f"{name}_{trading_date}_parts")
+        self.schemas = schemas
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self._lock = threading.Lock()
+
+        if not resume and os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+        for table in schemas:
+            os.makedirs(os.path.join(self.path, table), exist_ok=True)
+
+        self._buffers = {table: [] for table in schemas}
+        self._keys = []
+        self._part = max([self._last_part(table) for table in schemas] + [0])
+        self.counts = {table: 0 for table in schemas}
+
+    def _last_part(self, table):
+        parts = glob.glob(os.path.join(self.path, table, 'part-*.parquet'))
+        return max((int(os.path.basename(p)[5:10]) for p in parts), default=0)
+
+    def add(self, table, record):
+        with self._lock:
+            self._buffers[table].append(record)
+
+    def mark(self, key):
+        """종목 1개 레코드 추가 완료 (flush 후 on_flush 로 전달)"""
+        with self._lock:
+            self._keys.append(key)
+            full = len(self._keys) >= self.batch_size
+        if full:
+            self.flush()
+
+    def _frame(self, table, records):
+        schema = self.schemas[table]
+        df = pd.DataFrame.from_records(records, columns=list(schema))
+        return df.astype(schema)
+
+    def flush(self):
+        with self._lock:
+            buffers = {table: rows for table, rows in self._buffers.items() if rows}
+            keys = self._keys
+            self._buffers = {table: [] for table in self.schemas}
+            self._keys = []
+            if not buffers and not keys:
+                return
+            self._part += 1
+            part = self._part
+
+        con = duckdb.connect()
+        try:
+            for table, rows in buffers.items():
+                part_path = os.path.join(self.path, table, f"part-{part:05d}.parquet")
+                con.register('batch', self._frame(table, rows))
+                con.execute(f"COPY batch TO '{_sql_path(part_path + '.tmp')}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+                con.unregister('batch')
+                os.replace(part_path + '.tmp', part_path)
+                self.counts[table] += len(rows)
+        finally:
+            con.close()
+
+        if self.on_flush and keys:
+            self.on_flush(keys)
+
+    def read(self, table):
+        """part 파일 전체 → DataFrame (part 순서 = 기록 순서)"""
+        pattern = os.path.join(self.path, table, 'part-*.parquet')
+        if not glob.glob(pattern):
+            return self._frame(table, [])
+        con = duckdb.connect()
+        try:
+            df = con.execute(
+                f"SELECT * EXCLUDE (filename, file_row_number) "
+                f"FROM read_parquet('{_sql_path(pattern)}', filename=true, file_row_number=true) "
+                f"ORDER BY filename, file_row_number"
+            ).fetchdf()
+        finally:
+            con.close()
+        return df.astype(self.schemas[table])
+
+    def close(self):
+        self.flush()
@@ -8,6 +8,9 @@ from datetime import datetime, timedelta
 import time
 import traceback
 
+import ohlcv_store
+import price_panel
+
 DATA_DIR = os.getenv('DATA_DIR', './data')
 os.makedirs(DATA_DIR, exist_ok=True)
 META_DIR = os.path.join(DATA_DIR, 'meta')
@@ -59,31 +62,6 @@ def get_meta_info(meta, symbol, market):
         return info
 
 
-def get_daily_path(symbol, market):
-    """
-    market 값에 따라 일봉 CSV 경로 반환
-    - KOSPI → kr_daily/kospi/{symbol}.csv
-    - KOSDAQ → kr_daily/kosdaq/{symbol}.csv
-    - KR (구버전) → kr_daily/{symbol}.csv (기존 경로)
-    """
-    if market == 'KOSPI':
-        return os.path.join(DATA_DIR, 'kr_daily', 'kospi', f"{symbol}.csv")
-    elif market == 'KOSDAQ':
-        return os.path.join(DATA_DIR, 'kr_daily', 'kosdaq', f"{symbol}.csv")
-    else:
-        # 구버전 KR: 기존 루트 경로 → 없으면 kospi/kosdaq 순서로 fallback
-        root_path = os.path.join(DATA_DIR, 'kr_daily', f"{symbol}.csv")
-        if os.path.exists(root_path):
-            return root_path
-        kospi_path = os.path.join(DATA_DIR, 'kr_daily', 'kospi', f"{symbol}.csv")
-        if os.path.exists(kospi_path):
-            return kospi_path
-        kosdaq_path = os.path.join(DATA_DIR, 'kr_daily', 'kosdaq', f"{symbol}.csv")
-        if os.path.exists(kosdaq_path):
-            return kosdaq_path
-        return root_path  # 없어도 원래 경로 반환 (에러 메시지용)
-
-
 def add_close_price(df):
     if df.empty or 'symbol' not in df.columns or 'market' not in df.columns:
         return df
@@ -99,21 +77,33 @@ def add_close_price(df):
     return df
 
 
+_price_panel = None
+
+
+def load_daily(symbol, market, end=None):
+    """
+    일봉 조회: 가격 패널(mmap)에서 먼저 찾고, 없으면 OHLCV 저장소 조회
+    백테스트처럼 종목별 조회가 많을 때 파일 재파싱 없이 메모리에서 처리
+    """
+    global _price_panel
+    if _price_panel is None:
+        _price_panel = price_panel.load_panel() or False
+
+    df = _price_panel.frame(symbol, market, end=end) if _price_panel else None
+    if df is None:
+        df = ohlcv_store.load_symbol(symbol, market, end=end)
+    return df
+
+
 def get_historical_close(symbol, market, target_date):
-    """CSV 파일에서 특정 날짜의 종가 조회"""
+    """가격 패널/OHLCV 저장소에서 특정 날짜의 종가 조회"""
     try:
-        daily_path = get_daily_path(symbol, market)
+        df = load_daily(symbol, market, end=target_date)
 
-        if not os.path.exists(daily_path):
-            print(f"⚠️ 파일 없음: {symbol} ({market})")
+        if df is None:
+            print(f"⚠️ 데이터 없음: {symbol} ({market})")
             return None
 
-        df = pd.read_csv(daily_path, index_col=0, parse_dates=True)
-        df = df.rename(columns={
-            '시가': 'Open', '고가': 'High', '저가': 'Low',
-            '종가': 'Close', '거래량': 'Volume'
-        })
-
         target_str = target_date.strftime('%Y-%m-%d')
         df.index = pd.to_datetime(df.index).strftime('%Y-%m-%d')
 
@@ -143,20 +133,11 @@ def get_closes_in_range(symbol, market, base_date, target_date):
     반환: DataFrame with columns ['date', 'close'] (날짜 오름차순)
     """
     try:
-        daily_path = get_daily_path(symbol, market)
+        df = load_daily(symbol, market, end=target_date)
 
-        if not os.path.exists(daily_path):
+        if df is None:
             return pd.DataFrame(columns=['date', 'close'])
 
-        df = pd.read_csv(daily_path, index_col=0, parse_dates=True)
-        df = df.rename(columns={
-            '시가': 'Open', '고가': 'High', '저가': 'Low',
-            '종가': 'Close', '거래량': 'Volume'
-        })
-
-        df.index = pd.to_datetime(df.index)
-        df = df.sort_index()
-
         base_str = base_date.strftime('%Y-%m-%d')
         target_str = target_date.strftime('%Y-%m-%d')
         df_range = df[(df.index > base_str) & (df.index <= target_str)][['Close']].copy()
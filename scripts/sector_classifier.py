@@ -0,0 +1,189 @@
+import re
+import numpy as np
+import pandas as pd
+
+# 업종 → Sector(GICS 11개) 분류기 (process_kr_sectors.py 등에서 공용)
+#
+# SECTOR_RULES: 섹터별 업종 키워드 (dict 순서 = 우선순위, 업종에 키워드가 포함되면 해당 섹터)
+#   여러 섹터 키워드가 같이 들어 있으면 앞 섹터 (예: '부동산' → Financials)
+# 전체 키워드를 정규식 1개로 컴파일 → 업종 1개당 문자열 1회 스캔
+#   (?=(kw1|kw2|...)) 로 모든 위치에서 매칭, 같은 위치는 앞(우선순위 높은) 키워드가 먼저 선택됨
+#   → 찾은 키워드 중 우선순위가 가장 높은 섹터 = 기존 섹터 × 키워드 이중 루프 결과와 동일
+# 업종 종류는 수백 개뿐이므로 업종 값별로 한 번만 분류 (memo) 후 컬럼 전체에 매핑
+
+SECTOR_RULES = {
+    'Information Technology': [
+        '소프트웨어', '컴퓨터', '반도체', '전자부품', '통신장비', '전자장비',
+        '사진장비', '광학', 'IT서비스', '시스템통합', '자료처리', '호스팅',
+        '포털', '인터넷', '정보서비스', '마그네틱', '광학매체', '측정', '시험',
+        '항해', '제어', '정밀기기', '디스플레이장비', '디스플레이패널', '핸드셋',
+        '전자제품', '사무용전자제품'
+    ],
+    'Consumer Discretionary': [
+        '봉제', '의복', '신발', '가죽', '가구', '자동차', '스포츠', '유원지',
+        '오락', '여행', '창작', '예술', '영화', '비디오', '방송', '오디오',
+        '가정용기기', '액세서리', '운동', '경기용구', '섬유', '악기', '귀금속',
+        '장신용품', '편조', '가방', '개인용품', '가정용품', '무점포소매',
+        '상품전문소매', '생활용품소매', '음식료품소매', '담배소매', '떡',
+        '빵', '과자', '종합소매', '가전제품소매', '정보통신장비소매', '숙박',
+        '음식점', '호텔', '레스토랑', '레저', '백화점', '일반상점',
+        '화장품', '판매업체'
+    ],
+    'Communication Services': [
+        '전기통신', '텔레비전방송', '광고', '영상', '서적', '잡지', '인쇄물',
+        '텔레비전', '기록매체복제', '전문디자인', '시장조사', '여론조사',
+        '양방향미디어', '게임엔터테인먼트', '다각화된통신', '무선통신'
+    ],
+    'Health Care': [
+        '의약품', '의료용품', '의료용기기', '기초의약물질', '자연과학',
+        '공학연구', '과학기술', '제약', '생물공학', '건강관리장비', '건강관리업체',
+        '건강관리기술', '생명과학도구', '생명과학'
+    ],
+    'Consumer Staples': [
+        '식품', '곡물', '전분', '동물성', '식물성', '유지', '낙농', '과실',
+        '채소가공', '도축', '육류가공', '수산물가공', '알코올음료', '비알코올음료',
+        '비료', '농약', '동물용사료', '도시락', '조리식품', '음료', '작물재배',
+        '어로', '어업', '담배', '식품과기본식료품소매'
+    ],
+    'Financials': [
+        '금융', '은행', '저축기관', '보험', '신탁', '집합투자', '경영컨설팅',
+        '재보험', '연금', '증권', '창업투자', '카드', '기타금융', '손해보험',
+        '생명보험', '부동산', '자산신탁'
+    ],
+    'Energy': [
+        '기초화학물질', '석유정제', '연료용가스', '연료소매', '석유', '가스',
+        '에너지장비및서비스'
+    ],
+    'Industrials': [
+        '건물건설', '토목건설', '실내건축', '건축마무리', '전기공사', '통신공사',
+        '특수목적용기계', '일반목적용기계', '구조용금속', '전동기', '발전기',
+        '전기변환', '항공기', '우주선', '선박', '보트건조', '철도장비',
+        '운송장비', '도로화물운송', '해상운송', '운송관련', '기반조성',
+        '시설물축조', '건물설비', '육상여객운송', '항공여객운송', '운송장비임대',
+        '경비', '경호', '탐정', '사업시설유지', '산업용기계', '증기', '냉온수',
+        '공기조절', '폐기물처리', '개인용품수리', '가정용품수리', '건축기술',
+        '엔지니어링', '전문서비스', '사업지원', '교육지원', '일반교습', '교육기관',
+        '초등교육', '건축자재', '철물', '난방장치', '전문도매', '기계장비',
+        '산업용농축산물', '동식물', '이차전지', '재생', '조선', '기계', '건설',
+        '항공화물운송', '물류', '우주항공', '국방', '상업서비스', '공급품', '교육서비스',
+        '운송인프라', '도로', '철도운송', '항공사', '해운사',
+        '복합기업', '무역회사와판매업체'
+    ],
+    'Materials': [
+        '철강', '비철금속', '비금속광물', '유리', '유리제품', '시멘트',
+        '석회', '플라스터', '내화', '요업', '화학제품', '합성고무',
+        '플라스틱물질', '화학섬유', '플라스틱제품', '고무제품', '금속가공',
+        '금속주조', '종이', '판지제품', '골판지', '종이상자', '종이용기',
+        '펄프', '나무제품', '제재', '목재가공', '무기', '총포탄',
+        '섬유제품염색', '정리', '마무리가공', '방적', '가공사', '편조원단',
+        '직물직조', '직물제품', '인쇄', '인쇄관련', '화학', '포장재',
+        '건축제품'
+    ],
+    'Utilities': [
+        '전기', '전기장비', '절연선', '케이블', '전구', '조명장치',
+        '전기유틸리티', '가스유틸리티', '복합유틸리티', '전기제품'
+    ],
+    'Real Estate': [
+        '부동산'
+    ]
+}
+
+# 업종 없는(N/A) 종목 중 회사명으로 업종을 정할 수 있는 경우 (순서 = 우선순위)
+# 리츠와 인프라가 둘 다 들어 있으면 회사명 마지막 단어 기준
+NAME_RULES = {
+    '리츠': '부동산',
+    '인프라': '금융',
+    '리얼티': '부동산',
+}
+
+UNCLASSIFIED = 'N/A'
+ETF = 'ETF'
+OTHER = 'Other'
+
+
+def _compile(rules):
+    """섹터 규칙 → (정규식, 키워드 → 섹터 우선순위, 섹터 목록)"""
+    sectors = list(rules)
+    priority = {}
+    for rank, keywords in enumerate(rules.values()):
+        for keyword in keywords:
+            priority.setdefault(keyword.lower(), rank)
+    ordered = sorted(priority, key=lambda keyword: priority[keyword])
+    pattern = re.compile('(?=(' + '|'.join(re.escape(keyword) for keyword in ordered) + '))')
+    return pattern, priority, sectors
+
+
+class SectorClassifier:
+    """
+    업종 → Sector 분류 (규칙 1번 컴파일, 업종 값별 결과 memo)
+    - classify(업종) → Sector 1개
+    - classify_series(업종 Series) → Sector Series (고유 업종만 분류 후 매핑)
+    """
+
+    def __init__(self, rules=SECTOR_RULES):
+        self.rules = rules
+        self._pattern, self._priority, self._sectors = _compile(rules)
+        self._memo = {}
+
+    def _match(self, upjong):
+        ranks = [self._priority[m.group(1)] for m in self._pattern.finditer(upjong.lower())]
+        return self._sectors[min(ranks)] if ranks else OTHER
+
+    def classify(self, upjong):
+        """업종 1개 → Sector (없음/N/A → N/A, ETF → ETF, 키워드 없음 → Other)"""
+        if pd.isna(upjong) or upjong == UNCLASSIFIED or str(upjong).strip() == '':
+            return UNCLASSIFIED
+        if upjong == ETF:
+            return ETF
+        sector = self._memo.get(upjong)
+        if sector is None:
+            sector = self._memo[upjong] = self._match(str(upjong))
+        return sector
+
+    def classify_series(self, upjong):
+        codes, uniques = pd.factorize(upjong)
+        sectors = np.array([self.classify(value) for value in uniques] + [UNCLASSIFIED], dtype=object)
+        # factorize 는 NaN 을 -1 로 표시 → 마지막 칸(N/A)
+        return pd.Series(sectors[codes], index=upjong.index, name='Sector')
+
+
+_default = None
+
+
+def default_classifier():
+    """SECTOR_RULES 기본 분류기 (프로세스당 1번 컴파일)"""
+    global _default
+    if _default is None:
+        _default = SectorClassifier()
+    return _default
+
+
+def classify_sector(upjong):
+    """업종 1개 → Sector (기본 규칙)"""
+    return default_classifier().classify(upjong)
+
+
+def fill_industry_from_name(names, upjong):
+    """
+    업종 N/A 종목의 업종을 회사명으로 채움 (ETF 등 다른 업종은 그대로)
+
+    Parameters:
+    - names: 회사명 Series
+    - upjong: 업종 Series (NaN 은 N/A 로 처리)
+
+    Returns:
+    - 업종 Series
+    """
+    upjong = upjong.fillna(UNCLASSIFIED)
+    names = names.fillna('').astype(str)
+    contains = {keyword: names.str.contains(keyword, regex=False) for keyword in NAME_RULES}
+    both = contains['리츠'] & contains['인프라']
+
+    conditions = [both & names.str.endswith('리츠'), both & names.str.endswith('인프라')]
+    choices = [NAME_RULES['리츠'], NAME_RULES['인프라']]
+    for keyword, industry in NAME_RULES.items():
+        conditions.append(contains[keyword])
+        choices.append(industry)
+    by_name = np.select(conditions, choices, default=UNCLASSIFIED)
+
+    return upjong.where(upjong != UNCLASSIFIED, pd.Series(by_name, index=upjong.index))
@@ -0,0 +1,213 @@
+import os
+import duckdb
+import numpy as np
+import pandas as pd
+
+import price_panel
+import universe
+
+DATA_DIR = os.getenv('DATA_DIR', './data')
+
+# 섹터 / 업종 지수 (구성 종목 일봉으로 직접 계산, 네트워크 요청 없음)
+# data/sector_index/sector_index.parquet → level, grp, date, cap_weighted, equal_weighted, constituents
+#   level: 'sector' (Sector 11개) / 'industry' (업종)
+#   cap_weighted: 시가총액 가중 지수, equal_weighted: 동일 가중 지수 (첫 거래일 직전 = BASE_LEVEL)
+#
+# 가격 패널(종목 × 거래일 종가) 일간 수익률 행렬에 그룹 one-hot 행렬을 곱해 전 그룹을 한 번에 계산
+# 시가총액 = 종목 스냅샷 시가총액 / 종가 (주식수 비례값) × 그날 전일 종가 → 전일 시가총액 가중
+#   주식수 비례값은 오늘 스냅샷 하나를 전 기간에 적용 → 유상증자 / 자사주 소각 등으로 주식수가 바뀐 종목은
+#   과거 구간 가중치가 실제와 어긋남 (과거 주식수 이력 없음, 동일 가중 지수는 영향 없음)
+# 매일 패널 전체로 다시 계산해서 교체 (패널이 수정주가로 다시 받아져도 지수가 어긋나지 않음)
+# app.py 종목 상세의 '업종지수' 차트가 load() 로 조회
+INDEX_DIR = os.path.join(DATA_DIR, 'sector_index')
+INDEX_PATH = os.path.join(INDEX_DIR, 'sector_index.parquet')
+SECTOR_PATH = os.path.join(DATA_DIR, 'kr_stock_sectors.csv')
+
+LEVELS = {'sector': 'Sector', 'industry': '업종'}
+EXCLUDED_GROUPS = ('N/A', 'ETF', 'Other')
+BASE_LEVEL = 1000.0
+# 가격제한폭(±30%)을 넘는 일간 수익률은 데이터 오류로 보고 그날 계산에서 제외
+MAX_DAILY_RETURN = float(os.getenv('SECTOR_INDEX_MAX_DAILY_RETURN', '0.3'))
+
+
+def _sql_path(path):
+    return path.replace('\\', '/').replace("'", "''")
+
+
+def _empty_frame():
+    return pd.DataFrame({
+        'level': pd.Series(dtype=object),
+        'grp': pd.Series(dtype=object),
+        'date': pd.Series(dtype='datetime64[ns]'),
+        'cap_weighted': pd.Series(dtype=np.float64),
+        'equal_weighted': pd.Series(dtype=np.float64),
+        'constituents': pd.Series(dtype=np.int64),
+    })
+
+
+def compute_indices(close, group_codes, n_groups, shares=None):
+    """
+    그룹 지수 계산 (전 그룹 × 전 거래일 행렬 연산 1번)
+
+    Parameters:
+    - close: [종목, 거래일] 종가 (거래 없는 날 NaN)
+    - group_codes: 종목별 그룹 번호 (0 ~ n_groups-1, 제외 종목은 -1)
+    - shares: 종목별 주식수 비례값 (NaN 이면 시가총액 가중에서 제외, None 이면 동일 가중만)
+
+    Returns:
+    - dict of [그룹, 거래일] 배열: cap_weighted / equal_weighted (지수, 시작 전 NaN), constituents (종목 수)
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n_symbols, n_dates = close.shape
+    prev, cur = close[:, :-1], close[:, 1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ret = cur / prev - 1
+    valid = np.isfinite(ret) & (prev > 0) & (np.abs(ret) <= MAX_DAILY_RETURN) & (group_codes >= 0)[:, None]
+    ret = np.where(valid, ret, 0.0)
+
+    members = np.flatnonzero(group_codes >= 0)
+    onehot = np.zeros((n_groups, n_symbols))
+    onehot[group_codes[members], members] = 1.0
+
+    weights = {'equal_weighted': valid.astype(np.float64)}
+    if shares is not None:
+        shares = np.asarray(shares, dtype=np.float64)
+        has_cap = np.isfinite(shares) & (shares > 0)
+        weights['cap_weighted'] = np.where(valid & has_cap[:, None], np.nan_to_num(shares)[:, None] * np.nan_to_num(prev), 0.0)
+    else:
+        weights['cap_weighted'] = np.zeros_like(ret)
+
+    out = {'constituents': np.concatenate([np.zeros((n_groups, 1), dtype=np.int64),
+                                           (onehot @ valid).astype(np.int64)], axis=1)}
+    for name, w in weights.items():
+        total = onehot @ w
+        with np.errstate(divide='ignore', invalid='ignore'):
+            daily = np.where(total > 0, (onehot @ (w * ret)) / total, 0.0)
+        level = BASE_LEVEL * np.concatenate([np.ones((n_groups, 1)), np.cumprod(1 + daily, axis=1)], axis=1)
+
+        # 구성 종목 수익률이 처음 생긴 날의 전일 = 기준일, 그 이전은 NaN
+        active = total > 0
+        first = np.where(active.any(axis=1), active.argmax(axis=1), n_dates)
+        level[np.arange(n_dates)[None, :] < first[:, None]] = np.nan
+        out[name] = level
+    return out
+
+
+def load_sectors(path=SECTOR_PATH):
+    """kr_stock_sectors.csv (Sector 컬럼 포함, process_kr_sectors.py 이후)"""
+    df = pd.read_csv(path, encoding='utf-8-sig', dtype={'종목코드': str})
+    df['종목코드'] = df['종목코드'].str.zfill(6)
+    return df
+
+
+def build(df_sectors=None, df_universe=None, panel=None, path=INDEX_PATH):
+    """
+    섹터 / 업종 지수 계산 후 저장
+
+    Parameters:
+    - df_sectors: kr_stock_sectors.csv 형식 (회사명, 종목코드, 업종, Sector), None 이면 CSV 로드
+    - df_universe: universe.load_universe() 결과 (시가총액 가중용), None 이면 스냅샷 로드
+    - panel: price_panel.load_panel() 결과, None 이면 로드
+
+    Returns:
+    - 지수 DataFrame (long 형식), 패널이 없으면 None
+    """
+    print("\n📊 섹터 / 업종 지수 계산 중...")
+    if panel is None:
+        panel = price_panel.load_panel()
+    if panel is None:
+        print("⚠️ 가격 패널 없음 → 섹터 지수 계산 스킵")
+        return None
+
+    df_sectors = load_sectors() if df_sectors is None else df_sectors
+    df_sectors = df_sectors.assign(종목코드=df_sectors['종목코드'].astype(str).str.zfill(6))
+    df_sectors = df_sectors.drop_duplicates('종목코드', keep='last').set_index('종목코드')
+
+    if df_universe is None:
+        df_universe, _ = universe.load_universe()
+    caps = df_universe.drop_duplicates('Code').set_index('Code')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares_by_code = (caps['MarketCap'] / caps['Close'].where(caps['Close'] > 0)).replace(np.inf, np.nan)
+
+    symbols = pd.Index(panel.symbols)
+    shares = shares_by_code.reindex(symbols).to_numpy(dtype=np.float64)
+    dates = pd.DatetimeIndex(panel.dates)
+    close = np.asarray(panel.close)
+
+    frames = []
+    for level, column in LEVELS.items():
+        labels = df_sectors[column].reindex(symbols)
+        labels = labels.where(labels.notna() & ~labels.isin(EXCLUDED_GROUPS))
+        group_codes, groups = pd.factorize(labels, sort=True)
+        if len(groups) == 0:
+            continue
+
+        result = compute_indices(close, group_codes, len(groups), shares)
+        n_groups, n_dates = result['equal_weighted'].shape
+        frame = pd.DataFrame({
+            'level': level,
+            'grp': np.repeat(np.asarray(groups, dtype=object), n_dates),
+            'date': np.tile(dates.values, n_groups),
+            'cap_weighted': result['cap_weighted'].ravel(),
+            'equal_weighted': result['equal_weighted'].ravel(),
+            'constituents': result['constituents'].ravel(),
+        })
+        frames.append(frame[frame['equal_weighted'].notna()])
+        print(f"   {column}: {len(groups)}개 그룹 / 종목 {int((group_codes >= 0).sum())}개")
+
+    df = pd.concat(frames, ignore_index=True) if frames else _empty_frame()
+    if df.empty:
+        print("⚠️ 지수 계산 가능한 그룹 없음")
+        return df
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    con = duckdb.connect()
+    try:
+        con.register('indices', df)
+        con.execute(f"""
+            COPY (SELECT level, grp, CAST(date AS DATE) AS date, cap_weighted, equal_weighted, constituents
+                  FROM indices ORDER BY level, grp, date)
+            TO '{_sql_path(tmp_path)}' (FORMAT PARQUET, COMPRESSION ZSTD)
+        """)
+    finally:
+        con.close()
+    os.replace(tmp_path, path)
+    print(f"✅ 섹터 지수: {df['grp'].nunique()}개 그룹 × {df['date'].nunique()}거래일 → {path}")
+    return df
+
+
+def load(level=None, groups=None, start=None, path=INDEX_PATH):
+    """지수 조회 (long 형식), 없으면 빈 DataFrame"""
+    if not os.path.exists(path) or (groups is not None and len(groups) == 0):
+        return _empty_frame()
+
+    where = []
+    params = []
+    if level is not None:
+        where.append("level = ?")
+        params.append(level)
+    if groups is not None:
+        where.append(f"grp IN ({','.join(['?'] * len(groups))})")
+        params.extend(groups)
+    if start is not None:
+        where.append("date >= ?")
+        params.append(pd.Timestamp(start).date())
+
+    sql = (f"SELECT level, grp, date, cap_weighted, equal_weighted, constituents FROM read_parquet('{_sql_path(path)}')"
+           + (" WHERE " + " AND ".join(where) if where else "")
+           + " ORDER BY level, grp, date")
+    con = duckdb.connect()
+    try:
+        df = con.execute(sql, params).fetchdf()
+    finally:
+        con.close()
+    df['date'] = pd.to_datetime(df['date']).astype('datetime64[ns]')
+    return df
+
+
+if __name__ == '__main__':
+    df = build()
+    if df is not None and not df.empty:
+        latest = df[df['date'] == df['date'].max()]
+        print(latest[latest['level'] == 'sector'].drop(columns='level').to_string(index=False))
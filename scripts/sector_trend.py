@@ -0,0 +1,201 @@
+import os
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+
+import sise_parser
+import universe
+from downloader import run_concurrent
+
+DATA_DIR = os.getenv('DATA_DIR', './data')
+
+# 섹터 ETF 트렌드 (섹터별 대표 ETF 일봉 → 1주/1개월/3개월 수익률)
+# 일봉은 fetch_data.py 와 같은 sise_parser.request_daily (siseJson) 로 받아 data/kr_daily/etf/{코드}.csv 에 증분 저장
+# (kospi/kosdaq 폴더가 아니므로 OHLCV 저장소 / 가격 패널에는 포함되지 않음)
+# 수익률은 ETF × 거래일 종가 행렬 1개로 전 ETF 한 번에 계산 → sector_etf_trends.csv
+ETF_DAILY_DIR = os.path.join(DATA_DIR, 'kr_daily', 'etf')
+SECTOR_TREND_PATH = os.path.join(DATA_DIR, 'sector_etf_trends.csv')
+
+SECTOR_ETFS = {
+    'Information Technology': {'KR': '139260', 'kr_name': 'TIGER 200 IT'},
+    'Consumer Discretionary': {'KR': '139290', 'kr_name': 'TIGER 200 경기소비재'},
+    'Communication Services': {'KR': '228810', 'kr_name': 'TIGER 미디어컨텐츠'},
+    'Health Care':            {'KR': '143860', 'kr_name': 'TIGER 헬스케어'},
+    'Consumer Staples':       {'KR': '266410', 'kr_name': 'KODEX 필수소비재'},
+    'Financials':             {'KR': '139270', 'kr_name': 'TIGER 200 금융'},
+    'Energy':                 {'KR': '117680', 'kr_name': 'KODEX 에너지화학'},
+    'Industrials':            {'KR': '117700', 'kr_name': 'KODEX 산업재'},
+    'Materials':              {'KR': '117690', 'kr_name': 'KODEX 소재산업'},
+    'Utilities':              {'KR': '404650', 'kr_name': 'TIGER KRX 기후변화솔루션'},
+    'Real Estate':            {'KR': '329200', 'kr_name': 'TIGER 리츠부동산인프라'}
+}
+
+# 수익률 기간 (달력 기준, 기준일 이전 마지막 거래일 종가 대비 %)
+HORIZONS = {
+    '1w': pd.DateOffset(weeks=1),
+    '1m': pd.DateOffset(months=1),
+    '3m': pd.DateOffset(months=3),
+}
+# trend_display(상승/하락 문구, app/screener 표시용) 기준 기간
+DISPLAY_HORIZON = '1m'
+
+# 처음 수집 시 받을 기간 (달력일) / 증분 수집 시 겹침 구간
+HISTORY_DAYS = int(os.getenv('SECTOR_TREND_HISTORY_DAYS', '400'))
+INCREMENTAL_OVERLAP_DAYS = 10
+
+TREND_COLUMNS = (['sector', 'market', 'etf_code', 'etf_name', 'as_of']
+                 + [f'return_{h}' for h in HORIZONS] + ['trend_display'])
+
+
+def get_etf_csv_path(code):
+    return os.path.join(ETF_DAILY_DIR, f"{code}.csv")
+
+
+def load_etf_daily(code):
+    """저장된 ETF 일봉 (없거나 읽기 실패 시 None)"""
+    path = get_etf_csv_path(code)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_csv(path, index_col=0, parse_dates=True, encoding='utf-8-sig')
+        df = df[sise_parser.OHLCV_COLUMNS].sort_index()
+        return df if not df.empty else None
+    except Exception as e:
+        print(f"⚠️ {code} 기존 ETF 일봉 로드 실패: {e} → 전체 재수집")
+        return None
+
+
+def update_etf_daily(code, end_date):
+    """
+    ETF 일봉 증분 수집 (저장된 마지막 날짜 - 겹침 구간부터 요청)
+    겹치는 봉의 종가가 다르면 (분배락 수정 등) 전체 재수집
+
+    Returns:
+    - 일봉 DataFrame (요청 실패 시 저장된 일봉, 둘 다 없으면 None)
+    """
+    end_str = end_date.strftime('%Y%m%d')
+    stored = load_etf_daily(code)
+    df = None
+
+    try:
+        if stored is not None:
+            overlap_start = stored.index.max() - timedelta(days=INCREMENTAL_OVERLAP_DAYS)
+            fresh = sise_parser.request_daily(code, overlap_start.strftime('%Y%m%d'), end_str)
+            if fresh is None:
+                return stored
+            common = stored.index.intersection(fresh.index)
+            common = common[common < stored.index.max()]
+            if np.array_equal(stored.loc[common, 'Close'].to_numpy(), fresh.loc[common, 'Close'].to_numpy()):
+                df = pd.concat([stored[stored.index < fresh.index.min()], fresh])
+            else:
+                print(f"🔄 {code} 수정주가 변경 감지 → 전체 재수집")
+
+        if df is None:
+            start_str = (end_date - timedelta(days=HISTORY_DAYS)).strftime('%Y%m%d')
+            df = sise_parser.request_daily(code, start_str, end_str)
+            if df is None:
+                return stored
+    except Exception as e:
+        print(f"⚠️ {code} ETF 일봉 다운로드 실패: {e}")
+        return stored
+
+    os.makedirs(ETF_DAILY_DIR, exist_ok=True)
+    df.index.name = 'Date'
+    csv_path = get_etf_csv_path(code)
+    df.to_csv(csv_path + '.tmp', encoding='utf-8-sig')
+    os.replace(csv_path + '.tmp', csv_path)
+    return df
+
+
+def compute_returns(closes, horizons=HORIZONS):
+    """
+    기간별 수익률 (전 ETF 한 번에 계산)
+
+    Parameters:
+    - closes: DataFrame (index 거래일, columns ETF 코드, 종가)
+
+    Returns:
+    - DataFrame (index ETF 코드): as_of (ETF 별 마지막 거래일), return_{기간} (%)
+      기준일 이전 데이터가 없는 기간은 NaN
+    """
+    closes = closes.sort_index()
+    dates = closes.index.to_numpy()
+    matrix = closes.ffill().to_numpy(dtype=float)
+
+    # ETF 별 마지막 거래일 (수집 실패로 며칠 밀린 ETF 도 자기 날짜 기준)
+    valid = closes.notna().to_numpy()
+    last_idx = len(dates) - 1 - np.argmax(valid[::-1], axis=0)
+    cols = np.arange(matrix.shape[1])
+    last_close = matrix[last_idx, cols]
+    last_dates = dates[last_idx]
+
+    out = pd.DataFrame({'as_of': pd.DatetimeIndex(last_dates).strftime('%Y%m%d')}, index=closes.columns)
+    for name, offset in horizons.items():
+        targets = (pd.DatetimeIndex(last_dates) - offset).to_numpy()
+        base_idx = np.searchsorted(dates, targets, side='right') - 1
+        base_close = matrix[np.clip(base_idx, 0, None), cols]
+        ret = (last_close / base_close - 1) * 100
+        out[f'return_{name}'] = np.where((base_idx >= 0) & valid.any(axis=0), np.round(ret, 2), np.nan)
+    return out
+
+
+def trend_display(rate, name):
+    """'상승(+1.23%) TIGER 200 IT' 형식 (app.py 가 상승/하락 문구로 색 표시)"""
+    if rate is None or pd.isna(rate):
+        return None
+    trend = '상승' if rate > 0 else '하락'
+    return f"{trend}({rate:+.2f}%) {name}"
+
+
+def collect_sector_trends(end_date=None, path=SECTOR_TREND_PATH):
+    """
+    섹터 ETF 일봉 증분 수집 → 수익률 계산 → sector_etf_trends.csv
+
+    Returns:
+    - DataFrame[TREND_COLUMNS] (수익률 계산 못한 섹터 제외)
+    """
+    print("\n📈 섹터 ETF 트렌드 계산 중 (KR, 일봉 기준)...")
+    end_date = end_date or pd.Timestamp(universe.current_trading_date())
+
+    codes = [etfs['KR'] for etfs in SECTOR_ETFS.values()]
+    daily = {}
+
+    def task(code):
+        df = update_etf_daily(code, end_date)
+        if df is not None:
+            daily[code] = df
+        return df is not None
+
+    _, _, fail_count = run_concurrent(codes, task, label='섹터 ETF ', progress_every=len(codes))
+    if fail_count:
+        print(f"⚠️ 섹터 ETF 일봉 {fail_count}/{len(codes)}개 없음 → 해당 섹터 트렌드 제외")
+
+    closes = pd.DataFrame({code: df['Close'] for code, df in daily.items()})
+    if closes.empty:
+        df_trends = pd.DataFrame(columns=TREND_COLUMNS)
+    else:
+        returns = compute_returns(closes)
+        rows = []
+        for sector, etfs in SECTOR_ETFS.items():
+            code = etfs['KR']
+            if code not in returns.index:
+                continue
+            row = returns.loc[code]
+            display = trend_display(row[f'return_{DISPLAY_HORIZON}'], etfs['kr_name'])
+            if display is None:
+                continue
+            rows.append({'sector': sector, 'market': 'KR', 'etf_code': code, 'etf_name': etfs['kr_name'],
+                         **row.to_dict(), 'trend_display': display})
+        df_trends = pd.DataFrame(rows, columns=TREND_COLUMNS)
+
+    tmp_path = path + '.tmp'
+    df_trends.to_csv(tmp_path, encoding='utf-8-sig', index=False)
+    os.replace(tmp_path, path)
+    print(f"✅ 섹터 트렌드: {path}")
+    print(f"   계산: {len(df_trends)}/{len(SECTOR_ETFS)}개 (KR, {'/'.join(HORIZONS)} 수익률)")
+    return df_trends
+
+
+if __name__ == '__main__':
+    df = collect_sector_trends()
+    print(df.to_string(index=False))
@@ -0,0 +1,164 @@
+import re
+import sys
+import ast
+import timeit
+import numpy as np
+import pandas as pd
+
+import naver_http
+
+# siseJson 응답 한 줄: ["20240807", 73000, 76000, 72800, 74700, 32710428, 55.07]
+# 헤더 줄(['날짜', '시가', ...])과 null 이 섞인 줄은 매칭되지 않음 (기존 dropna 와 동일)
+_ROW_RE = re.compile(
+    r'\[\s*["\'](\d{8})["\']\s*,'
+    r'\s*(-?\d+)\s*,\s*(-?\d+)\s*,\s*(-?\d+)\s*,\s*(-?\d+)\s*,\s*(-?\d+)'
+)
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def parse_sise_json(text):
+    """
+    siseJson 응답 텍스트 → NumPy 배열 (텍스트 1회 스캔)
+
+    Returns:
+    - dict: {
+        'date': int32 배열 (YYYYMMDD),
+        'open', 'high', 'low', 'close', 'volume': int64 배열
+      }
+      날짜 오름차순 정렬, 같은 날짜는 마지막 값 사용
+    """
+    rows = _ROW_RE.findall(text)
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return {'date': np.empty(0, dtype=np.int32), 'open': empty, 'high': empty,
+                'low': empty, 'close': empty, 'volume': empty}
+
+    values = np.array(rows, dtype=np.int64)
+
+    # 날짜 정렬 + 중복 제거 (응답은 보통 이미 오름차순)
+    dates = values[:, 0]
+    if not np.all(dates[1:] > dates[:-1]):
+        order = np.argsort(dates, kind='stable')
+        values = values[order]
+        dates = values[:, 0]
+        keep = np.append(dates[1:] != dates[:-1], True)
+        values = values[keep]
+
+    return {
+        'date':   values[:, 0].astype(np.int32),
+        'open':   values[:, 1].copy(),
+        'high':   values[:, 2].copy(),
+        'low':    values[:, 3].copy(),
+        'close':  values[:, 4].copy(),
+        'volume': values[:, 5].copy(),
+    }
+
+
+def yyyymmdd_to_datetime(dates):
+    """int YYYYMMDD 배열 → DatetimeIndex (문자열 변환 없이)"""
+    dates = np.asarray(dates, dtype=np.int64)
+    return pd.DatetimeIndex(pd.to_datetime({
+        'year': dates // 10000,
+        'month': (dates // 100) % 100,
+        'day': dates % 100,
+    }), name='Date')
+
+
+def to_frame(arrays):
+    """parse_sise_json 결과 → 기존 일봉 CSV 와 같은 형태의 DataFrame (Date 인덱스)"""
+    return pd.DataFrame({
+        'Open':   arrays['open'],
+        'High':   arrays['high'],
+        'Low':    arrays['low'],
+        'Close':  arrays['close'],
+        'Volume': arrays['volume'],
+    }, index=yyyymmdd_to_datetime(arrays['date']))
+
+
+def request_daily(symbol, start_str, end_str):
+    """
+    siseJson 일봉 요청 → DataFrame (fetch_data.py 종목 일봉 / sector_trend.py ETF 일봉 공용)
+    실패/빈 응답 시 None
+    """
+    url = (
+        f'{naver_http.API_BASE}/siseJson.naver'
+        f'?symbol={symbol}&requestType=1'
+        f'&startTime={start_str}&endTime={end_str}&timeframe=day'
+    )
+
+    res = naver_http.get(url)
+
+    if res.status_code != 200:
+        return None
+
+    text = res.text.strip()
+    if not text or text == '[]':
+        return None
+
+    arrays = parse_sise_json(text)
+    if len(arrays['date']) == 0:
+        return None
+
+    return to_frame(arrays)
+
+
+def _parse_legacy(text):
+    """기존 fetch_kr_single 파싱 경로 (벤치마크 비교용)"""
+    raw = ast.literal_eval(text.strip())
+    rows = []
+    for item in raw:
+        if not isinstance(item, list) or len(item) < 6:
+            continue
+        try:
+            date_str_item = str(item[0])
+            if len(date_str_item) != 8 or not date_str_item.isdigit():
+                continue
+            rows.append({
+                'Date':   pd.to_datetime(date_str_item, format='%Y%m%d'),
+                'Open':   int(item[1]) if item[1] is not None else None,
+                'High':   int(item[2]) if item[2] is not None else None,
+                'Low':    int(item[3]) if item[3] is not None else None,
+                'Close':  int(item[4]) if item[4] is not None else None,
+                'Volume': int(item[5]) if item[5] is not None else None,
+            })
+        except:
+            continue
+    df = pd.DataFrame(rows).dropna()
+    df = df.set_index('Date').sort_index()
+    return df[OHLCV_COLUMNS]
+
+
+def _sample_payload(n_rows=500):
+    """벤치마크용 siseJson 형식 샘플 생성"""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2024-01-02', periods=n_rows).strftime('%Y%m%d')
+    close = 50000 + rng.integers(-500, 500, n_rows).cumsum()
+    lines = ["\n [['날짜', '시가', '고가', '저가', '종가', '거래량', '외국인소진율'],"]
+    for d, c in zip(dates, close):
+        lines.append(f'\n["{d}", {c - 100}, {c + 300}, {c - 400}, {c}, {rng.integers(1e5, 1e7)}, 52.31],')
+    lines.append('\n]\n')
+    return ''.join(lines)
+
+
+if __name__ == '__main__':
+    # 사용법: python sise_parser.py [저장된 siseJson 응답 파일]
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'r', encoding='utf-8') as f:
+            payload = f.read()
+    else:
+        payload = _sample_payload()
+
+    legacy_df = _parse_legacy(payload)
+    fast_df = to_frame(parse_sise_json(payload))
+    pd.testing.assert_frame_equal(legacy_df.astype('int64'), fast_df, check_freq=False)
+
+    n = 50
+    t_legacy = timeit.timeit(lambda: _parse_legacy(payload), number=n) / n
+    t_arrays = timeit.timeit(lambda: parse_sise_json(payload), number=n) / n
+    t_frame = timeit.timeit(lambda: to_frame(parse_sise_json(payload)), number=n) / n
+
+    print(f"행 수: {len(fast_df)}")
+    print(f"기존 (literal_eval + dict): {t_legacy * 1000:8.2f} ms")
+    print(f"신규 (NumPy 배열):          {t_arrays * 1000:8.2f} ms  ({t_legacy / t_arrays:5.1f}x)")
+    print(f"신규 (DataFrame 포함):      {t_frame * 1000:8.2f} ms  ({t_legacy / t_frame:5.1f}x)")
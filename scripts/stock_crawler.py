@@ -0,0 +1,139 @@
+from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import naver_http
+import naver_extract
+from downloader import NAVER_MAX_IN_FLIGHT
+
+# 종목별 네이버 페이지(main.nhn + frgn.nhn) 크롤러
+# 공유 requests 세션 + 디스크 캐시를 그대로 쓰기 위해 스레드 풀(NAVER_MAX_IN_FLIGHT 개)에서 종목 1개씩 처리
+# → 동시 요청 수는 스레드 수가 상한, 그 안에서 naver_http.get 의 공용 AdaptiveController 가 자동 조절
+
+ALL_PAGES = ('main', 'frgn')
+
+
+def main_page_url(code):
+    return f"{naver_http.FINANCE_BASE}/item/main.nhn?code={code}"
+
+
+def frgn_page_url(code):
+    return f"{naver_http.FINANCE_BASE}/item/frgn.nhn?code={code}"
+
+
+def empty_result():
+    return {
+        'per': None,
+        'eps': None,
+        'pbr': None,
+        'sector': 'N/A',
+        'foreign_ownership': None,
+        'foreign_net_buy': [0, 0, 0, 0, 0],
+        'institutional_net_buy': [0, 0, 0, 0, 0],
+        'foreign_dates': ['N/A', 'N/A', 'N/A', 'N/A', 'N/A'],
+        'flow_history': None,
+        'pages': []
+    }
+
+
+def parse_main_page(html, result):
+    """메인 페이지: PER, EPS, PBR, 업종 → result 에 채움"""
+    fields = naver_extract.extract_main(html)
+    result['per'] = fields['per']
+    result['eps'] = fields['eps']
+    result['pbr'] = fields['pbr']
+    if fields['sector']:
+        result['sector'] = fields['sector']
+
+
+def parse_frgn_page(html, result):
+    """외국인 페이지: 순매수거래량 (최근 5일) + 기관 순매매량 + 보유율 → result 에 채움"""
+    table = naver_extract.parse_investor_table(html)
+    if len(table['date']) == 0:
+        return
+
+    n = min(5, len(table['date']))
+    result['foreign_net_buy'] = table['foreign_net'][:n].tolist() + [0] * (5 - n)
+    result['foreign_dates'] = [str(d) for d in table['date'][:n]] + ['N/A'] * (5 - n)
+    result['institutional_net_buy'] = table['institutional_net'][:n].tolist() + [0] * (5 - n)
+    result['foreign_ownership'] = float(table['foreign_ratio'][0])
+    # 페이지에 있는 전체 일자 (순매수 이력 저장소용)
+    result['flow_history'] = {
+        'dates': [str(d) for d in table['date']],
+        'foreign': table['foreign_net'].tolist(),
+        'institutional': table['institutional_net'].tolist(),
+    }
+
+
+def parse_stock_pages(main_html, frgn_html):
+    """
+    main.nhn / frgn.nhn HTML → 크롤링 결과 dict (요청 실패한 페이지는 None)
+
+    Returns:
+    - dict: {
+        'per': float, 'eps': float, 'pbr': float, 'sector': str,
+        'foreign_ownership': float,
+        'foreign_net_buy': list (5일치),
+        'institutional_net_buy': list (5일치),
+        'foreign_dates': list (5일치),
+        'flow_history': frgn.nhn 페이지 전체 일자 {'dates', 'foreign', 'institutional'} (없으면 None),
+        'pages': 받아서 파싱한 페이지 ['main', 'frgn']
+      }
+    """
+    result = empty_result()
+    if main_html is not None:
+        try:
+            parse_main_page(main_html, result)
+            result['pages'].append('main')
+        except Exception:
+            pass
+    if frgn_html is not None:
+        try:
+            parse_frgn_page(frgn_html, result)
+            result['pages'].append('frgn')
+        except Exception:
+            pass
+    return result
+
+
+def _fetch_text(url):
+    """페이지 요청 → HTML (실패 시 None)"""
+    try:
+        response = naver_http.get(url)
+        response.raise_for_status()
+        return response.text
+    except Exception:
+        return None
+
+
+def crawl_naver_stock_data(code):
+    """종목 1개 동기 크롤링 (main.nhn → frgn.nhn 순서대로)"""
+    return parse_stock_pages(_fetch_text(main_page_url(code)), _fetch_text(frgn_page_url(code)))
+
+
+def _crawl_one(code, pages):
+    """종목 1개: 필요한 페이지만 요청 → 파싱"""
+    main_html = _fetch_text(main_page_url(code)) if 'main' in pages else None
+    frgn_html = _fetch_text(frgn_page_url(code)) if 'frgn' in pages else None
+    return parse_stock_pages(main_html, frgn_html)
+
+
+def crawl_stocks(codes, on_result, max_in_flight=None, desc="크롤링 진행", pages=None):
+    """
+    여러 종목 main.nhn + frgn.nhn 병렬 크롤링
+    종목 1개가 끝날 때마다 on_result(code, data) 호출 (호출한 스레드에서 순서대로)
+    pages: {종목코드: {'main', 'frgn'} 중 요청할 페이지} (없는 종목은 둘 다, 요청 안 한 페이지 필드는 기본값)
+    """
+    codes = list(codes)
+    if not codes:
+        return
+    pages = pages or {}
+
+    with ThreadPoolExecutor(max_workers=max_in_flight or NAVER_MAX_IN_FLIGHT, thread_name_prefix='naver-crawl') as executor:
+        futures = {executor.submit(_crawl_one, code, pages.get(code, ALL_PAGES)): code for code in codes}
+        for future in tqdm(as_completed(futures), total=len(futures), desc=desc):
+            try:
+                data = future.result()
+            except Exception as e:
+                print(f"❌ 에러: {e}")
+                continue
+            on_result(futures[future], data)
@@ -0,0 +1,149 @@
+import os
+import json
+from datetime import datetime, timedelta
+import pandas as pd
+
+import market_listing
+import naver_cache
+
+DATA_DIR = os.getenv('DATA_DIR', './data')
+META_DIR = os.path.join(DATA_DIR, 'meta')
+
+# 거래일 1회 조회한 KOSPI + KOSDAQ 시가총액 리스트 (fetch_data.py / 크롤러 공용)
+# data/meta/universe_snapshot.csv   → Code, Name, MarketCap, Close, Market, PER, EPS, PBR, ForeignRate
+# data/meta/universe_snapshot.json  → trading_date, fetched_at, counts (마지막에 기록 = 완료 표시)
+# fetched_at 이 기준 거래일 장 마감(naver_cache.MARKET_CLOSE) 전이면 장 마감 후에는 다시 조회
+SNAPSHOT_PATH = os.path.join(META_DIR, 'universe_snapshot.csv')
+STAMP_PATH = os.path.join(META_DIR, 'universe_snapshot.json')
+
+SECTOR_PATH = os.path.join(DATA_DIR, 'kr_stock_sectors.csv')
+
+
+def current_trading_date(now=None):
+    """기준 거래일 (주말이면 직전 금요일) → 'YYYYMMDD'"""
+    day = (now or datetime.now()).date()
+    if day.weekday() >= 5:
+        day -= timedelta(days=day.weekday() - 4)
+    return day.strftime('%Y%m%d')
+
+
+def _read_stamp():
+    if not os.path.exists(STAMP_PATH):
+        return None
+    try:
+        with open(STAMP_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _read_snapshot():
+    df = pd.read_csv(SNAPSHOT_PATH, encoding='utf-8-sig', dtype={'Code': str, 'Name': str, 'Market': str})
+    df['Code'] = df['Code'].str.zfill(6)
+    df['MarketCap'] = df['MarketCap'].fillna(0).astype('int64')
+    df['Close'] = df['Close'].fillna(0).astype('int64')
+    # 밸류에이션 열 추가 전 스냅샷 호환
+    for column in market_listing.VALUATION_COLUMNS:
+        if column not in df.columns:
+            df[column] = float('nan')
+    return df
+
+
+def _write_snapshot(df, trading_date):
+    os.makedirs(META_DIR, exist_ok=True)
+    tmp_path = SNAPSHOT_PATH + '.tmp'
+    df.to_csv(tmp_path, encoding='utf-8-sig', index=False)
+    os.replace(tmp_path, SNAPSHOT_PATH)
+
+    stamp = {
+        'trading_date': trading_date,
+        'fetched_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'counts': df['Market'].value_counts().to_dict(),
+    }
+    tmp_path = STAMP_PATH + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(stamp, f, ensure_ascii=False)
+    os.replace(tmp_path, STAMP_PATH)
+
+
+def _is_final(stamp, trading_date, now=None):
+    """
+    스냅샷을 그대로 써도 되는지: 기준 거래일 장 마감(naver_cache.MARKET_CLOSE) 이후에 받은 스냅샷
+    아직 장 마감 전이면 장중 스냅샷도 사용 (장 마감 후 실행에서 다시 조회)
+    """
+    close_time = naver_cache.market_close(trading_date)
+    try:
+        fetched_at = datetime.strptime(stamp.get('fetched_at', ''), '%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        return False
+    return fetched_at >= close_time or (now or datetime.now()) < close_time
+
+
+def load_universe(refresh=False):
+    """
+    KOSPI + KOSDAQ 전체 종목 리스트 (ETF 포함, 시가총액 순)
+    오늘 거래일 스냅샷이 있으면 재사용, 없거나 refresh=True 면 네이버에서 새로 조회 후 저장
+    장 마감 전에 받은 스냅샷은 장 마감 후 실행에서 다시 조회 (종가 / 시가총액 / PER 가 장중 값)
+    조회 실패 시 이전 스냅샷이 있으면 그대로 사용
+
+    Returns:
+    - (DataFrame[Code, Name, MarketCap, Close, Market, PER, EPS, PBR, ForeignRate], trading_date 'YYYYMMDD')
+    """
+    trading_date = current_trading_date()
+    stamp = _read_stamp()
+
+    reusable = not refresh and stamp and stamp.get('trading_date') == trading_date and os.path.exists(SNAPSHOT_PATH)
+    if reusable and not _is_final(stamp, trading_date):
+        print(f"🔄 종목 스냅샷이 장 마감 전 조회분 ({stamp.get('fetched_at')}) → 새로 조회")
+    elif reusable:
+        try:
+            df = _read_snapshot()
+            print(f"📂 종목 스냅샷 재사용 ({trading_date}, {stamp.get('fetched_at')}): {len(df)}개")
+            return df, trading_date
+        except Exception as e:
+            print(f"⚠️ 종목 스냅샷 로드 실패: {e} → 새로 조회")
+
+    frames = [market_listing.fetch_market_listing(market) for market in market_listing.MARKET_SOSOK]
+    if all(not df.empty for df in frames):
+        df = pd.concat(frames, ignore_index=True).drop_duplicates('Code').reset_index(drop=True)
+        _write_snapshot(df, trading_date)
+        print(f"💾 종목 스냅샷 저장 ({trading_date}): {len(df)}개 → {SNAPSHOT_PATH}")
+        return df, trading_date
+
+    # 일부 시장 조회 실패 → 불완전한 스냅샷은 저장하지 않음
+    if stamp and os.path.exists(SNAPSHOT_PATH):
+        print(f"⚠️ 종목 조회 실패 → 이전 스냅샷 사용 ({stamp.get('trading_date')})")
+        return _read_snapshot(), stamp.get('trading_date')
+
+    df = pd.concat(frames, ignore_index=True)
+    return df, trading_date
+
+
+def get_market_universe(market, refresh=False):
+    """시장 1개 종목 리스트 (스냅샷 기준)"""
+    df, trading_date = load_universe(refresh)
+    return df[df['Market'] == market].reset_index(drop=True), trading_date
+
+
+def load_etf_codes():
+    """
+    kr_stock_sectors.csv 가 있으면 Sector == 'ETF' 인 종목코드 set 반환
+    없으면 빈 set 반환 (전체 수집)
+    """
+    if not os.path.exists(SECTOR_PATH):
+        print("ℹ️ kr_stock_sectors.csv 없음 → ETF 필터 없이 전체 수집")
+        return set()
+
+    try:
+        df = pd.read_csv(SECTOR_PATH, encoding='utf-8-sig', dtype={'종목코드': str})
+        df['종목코드'] = df['종목코드'].str.zfill(6)
+        etf_codes = set(df[df['Sector'] == 'ETF']['종목코드'].tolist())
+        print(f"ℹ️ kr_stock_sectors.csv 로드 완료 → ETF {len(etf_codes)}개 제외 예정")
+        return etf_codes
+    except Exception as e:
+        print(f"⚠️ kr_stock_sectors.csv 로드 실패: {e} → ETF 필터 없이 전체 수집")
+        return set()
+
+
+if __name__ == '__main__':
+    load_universe(refresh=True)